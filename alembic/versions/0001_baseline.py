@@ -0,0 +1,62 @@
+"""Baseline schema: tasks and workers.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-01 00:00:00
+
+"""
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TASK_STATUSES = ("PENDING", "SCHEDULED", "RUNNING", "PAUSED", "COMPLETED", "FAILED")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workers",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("last_heartbeat", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_workers_id", "workers", ["id"])
+    op.create_table(
+        "tasks",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.Enum(*TASK_STATUSES, name="taskstatus"), nullable=False),
+        sa.Column("priority", sa.String(20), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "worker_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("workers.id"),
+            nullable=True,
+        ),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_tasks_id", "tasks", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_id", table_name="tasks")
+    op.drop_table("tasks")
+    op.drop_index("ix_workers_id", table_name="workers")
+    op.drop_table("workers")
+    sa.Enum(name="taskstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,176 @@
+"""Queues, dependencies, recurring tasks, claim order, timeouts and retries.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-06-01 00:00:00
+
+"""
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+MISFIRE_POLICIES = ("SKIP", "FIRE_ONCE", "CATCH_UP")
+
+# Existing PENDING and SCHEDULED tasks get the sort key strict mode would have
+# given them (see app/services/ordering.py), so they keep their claim order
+# relative to tasks enqueued after the upgrade
+BACKFILL_SORT_KEYS = """
+UPDATE tasks SET sort_key =
+    EXTRACT(EPOCH FROM GREATEST(created_at, COALESCE(scheduled_at, created_at)))
+    - CASE priority
+        WHEN 'LOW' THEN 1 WHEN 'MEDIUM' THEN 2 WHEN 'HIGH' THEN 3 ELSE 4
+      END * 1e10
+WHERE status IN ('PENDING', 'SCHEDULED')
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # A new enum value can't be added inside a transaction before
+        # PostgreSQL 12
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE taskstatus ADD VALUE IF NOT EXISTS 'BLOCKED'")
+
+    op.create_table(
+        "task_queues",
+        sa.Column("name", sa.String(255), primary_key=True),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("last_tag", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "recurring_tasks",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("queue", sa.String(255), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.String(20), nullable=False),
+        sa.Column("cron", sa.String(255), nullable=True),
+        sa.Column("interval_seconds", sa.Integer(), nullable=True),
+        sa.Column(
+            "misfire_policy",
+            sa.Enum(*MISFIRE_POLICIES, name="misfirepolicy"),
+            nullable=False,
+        ),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("next_fire_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_fire_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_recurring_tasks_id", "recurring_tasks", ["id"])
+    op.create_index(
+        "ix_recurring_tasks_enabled_next_fire_at",
+        "recurring_tasks",
+        ["enabled", "next_fire_at"],
+    )
+
+    # Server defaults fill the new columns of existing rows; the application
+    # always sets them itself
+    with op.batch_alter_table("tasks") as batch:
+        batch.add_column(
+            sa.Column("queue", sa.String(255), nullable=False, server_default="default")
+        )
+        batch.add_column(sa.Column("timeout_seconds", sa.Float(), nullable=True))
+        batch.add_column(
+            sa.Column("retries", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch.add_column(
+            sa.Column(
+                "recurring_task_id",
+                postgresql.UUID(as_uuid=False),
+                sa.ForeignKey(
+                    "recurring_tasks.id",
+                    name="fk_tasks_recurring_task_id",
+                    ondelete="SET NULL",
+                ),
+                nullable=True,
+            )
+        )
+        batch.add_column(
+            sa.Column(
+                "remaining_dependencies",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+        batch.add_column(
+            sa.Column("sort_key", sa.Float(), nullable=False, server_default="0")
+        )
+        batch.add_column(
+            sa.Column("partition", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch.create_unique_constraint(
+            "uq_tasks_recurring_run", ["recurring_task_id", "scheduled_at"]
+        )
+    if bind.dialect.name == "postgresql":
+        op.execute(BACKFILL_SORT_KEYS)
+
+    op.create_index("ix_tasks_queue", "tasks", ["queue"])
+    op.create_index("ix_tasks_ready", "tasks", ["status", "sort_key"])
+    op.create_index(
+        "ix_tasks_ready_partition", "tasks", ["status", "partition", "sort_key"]
+    )
+    op.create_index("ix_tasks_worker_status", "tasks", ["worker_id", "status"])
+    op.create_index("ix_tasks_status_scheduled_at", "tasks", ["status", "scheduled_at"])
+
+    op.create_table(
+        "task_dependencies",
+        sa.Column(
+            "task_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "depends_on_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+    )
+    op.create_index(
+        "ix_task_dependencies_depends_on_id", "task_dependencies", ["depends_on_id"]
+    )
+
+
+def downgrade() -> None:
+    # BLOCKED stays in the taskstatus type: PostgreSQL can't drop enum values
+    op.drop_index("ix_task_dependencies_depends_on_id", table_name="task_dependencies")
+    op.drop_table("task_dependencies")
+    for index in (
+        "ix_tasks_status_scheduled_at",
+        "ix_tasks_worker_status",
+        "ix_tasks_ready_partition",
+        "ix_tasks_ready",
+        "ix_tasks_queue",
+    ):
+        op.drop_index(index, table_name="tasks")
+    with op.batch_alter_table("tasks") as batch:
+        batch.drop_constraint("uq_tasks_recurring_run", type_="unique")
+        batch.drop_constraint("fk_tasks_recurring_task_id", type_="foreignkey")
+        for column in (
+            "partition",
+            "sort_key",
+            "remaining_dependencies",
+            "recurring_task_id",
+            "retries",
+            "timeout_seconds",
+            "queue",
+        ):
+            batch.drop_column(column)
+    op.drop_index(
+        "ix_recurring_tasks_enabled_next_fire_at", table_name="recurring_tasks"
+    )
+    op.drop_index("ix_recurring_tasks_id", table_name="recurring_tasks")
+    op.drop_table("recurring_tasks")
+    op.drop_table("task_queues")
+    sa.Enum(name="misfirepolicy").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,103 @@
+"""Store task payloads and results as compressed JSON.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-09-01 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+from app.core.config import settings
+from app.db.compression import decode, encode
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("payload", "result")
+BATCH_SIZE = 1000
+
+
+def compress_large_values() -> None:
+    """Rewrite values over the threshold in their compressed form.
+
+    Plain JSON stays readable, so this only saves space and can be
+    interrupted; it walks the table in primary key order, one batch at a time.
+    """
+    bind = op.get_bind()
+    tasks = sa.table(
+        "tasks",
+        sa.column("id", sa.String),
+        *(sa.column(name, sa.LargeBinary) for name in COLUMNS),
+    )
+    threshold = settings.PAYLOAD_COMPRESSION_THRESHOLD
+    after = None
+    while True:
+        query = sa.select(tasks).order_by(tasks.c.id).limit(BATCH_SIZE)
+        if after is not None:
+            query = query.where(tasks.c.id > after)
+        rows = bind.execute(query).all()
+        if not rows:
+            return
+        for row in rows:
+            values = {}
+            for name in COLUMNS:
+                stored = getattr(row, name)
+                if stored is None or len(stored) < threshold:
+                    continue
+                compressed = encode(
+                    decode(stored), settings.PAYLOAD_COMPRESSION, threshold
+                )
+                if compressed != bytes(stored):
+                    values[name] = compressed
+            if values:
+                bind.execute(
+                    tasks.update().where(tasks.c.id == row.id).values(**values)
+                )
+        after = str(rows[-1].id)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for name in COLUMNS:
+            op.execute(
+                f"ALTER TABLE tasks ALTER COLUMN {name} TYPE bytea "
+                f"USING convert_to({name}::text, 'UTF8')"
+            )
+    else:
+        with op.batch_alter_table("tasks") as batch:
+            for name in COLUMNS:
+                batch.alter_column(name, type_=sa.LargeBinary())
+    if settings.PAYLOAD_COMPRESSION != "none":
+        compress_large_values()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    tasks = sa.table(
+        "tasks",
+        sa.column("id", sa.String),
+        *(sa.column(name, sa.LargeBinary) for name in COLUMNS),
+    )
+    # Back to plain JSON text first, so the type change can cast it
+    for row in bind.execute(sa.select(tasks)).all():
+        values = {
+            name: encode(decode(getattr(row, name)), "none", 0)
+            for name in COLUMNS
+            if getattr(row, name) is not None
+        }
+        bind.execute(tasks.update().where(tasks.c.id == row.id).values(**values))
+    if bind.dialect.name == "postgresql":
+        for name in COLUMNS:
+            op.execute(
+                f"ALTER TABLE tasks ALTER COLUMN {name} TYPE json "
+                f"USING convert_from({name}, 'UTF8')::json"
+            )
+    else:
+        with op.batch_alter_table("tasks") as batch:
+            for name in COLUMNS:
+                batch.alter_column(name, type_=sa.JSON())
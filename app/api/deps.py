@@ -0,0 +1,50 @@
+"""Shared dependencies for the API endpoints."""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.db.database import ReplicaSessionLocal, shard_map
+from app.db.replica import (
+    LAST_WRITE_COOKIE,
+    parse_last_write,
+    replica_monitor,
+    should_read_from_replica,
+)
+from app.services.backends import DatabaseBackend, TaskQueueBackend, open_backend
+
+
+async def get_task_queue() -> AsyncIterator[TaskQueueBackend]:
+    """Dependency for getting the configured task queue backend."""
+    async with open_backend() as backend:
+        yield backend
+
+
+async def get_read_task_queue(request: Request) -> AsyncIterator[TaskQueueBackend]:
+    """Dependency for read-only endpoints.
+
+    Reads are served by the replica when one is configured, its lag is
+    acceptable and it has replayed the client's last write; otherwise they go
+    to the primary like any other request.
+    """
+    if (
+        ReplicaSessionLocal is not None
+        and replica_monitor is not None
+        and settings.QUEUE_BACKEND == "database"
+        and shard_map is None
+    ):
+        lag = await replica_monitor.lag()
+        last_write = parse_last_write(request.cookies.get(LAST_WRITE_COOKIE))
+        if should_read_from_replica(lag, last_write, time.time()):
+            async with ReplicaSessionLocal() as session:
+                yield DatabaseBackend(session, replica=True)
+            return
+
+    async with open_backend() as backend:
+        yield backend
+
+
+# For endpoints that only open a backend when they can't answer from memory
+open_read_task_queue = asynccontextmanager(get_read_task_queue)
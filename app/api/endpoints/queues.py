@@ -0,0 +1,64 @@
+"""API endpoints for queue scheduling settings and statistics."""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+
+from app.api.deps import get_task_queue, open_read_task_queue
+from app.core.config import settings
+from app.schemas.task import (
+    QueueStats,
+    QueueWeight,
+    ScalingRecommendation,
+    TaskQueue,
+)
+from app.services.backends import TaskQueueBackend
+from app.services.scaling import recommend, scaling_cache
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=List[QueueStats])
+async def get_queue_stats(backend: TaskQueueBackend = Depends(get_task_queue)):  # noqa
+    """Get per-queue backlog and wait time statistics."""
+    return await backend.get_queue_stats()
+
+
+@router.get("/scaling", response_model=ScalingRecommendation)
+async def get_scaling(
+    request: Request,
+    group_by: str = Query("queue", pattern="^(queue|priority)$"),  # noqa
+    target_wait: Optional[float] = Query(None, gt=0),  # noqa
+):
+    """Recommend a worker count keeping ready tasks' wait under a target.
+
+    Based on arrival rates, backlog and service times; see
+    app/services/scaling.py. Results are cached for a few seconds, and a
+    cached result is served without opening a database session.
+    """
+    if target_wait is None:
+        target_wait = settings.SCALING_TARGET_WAIT_SECONDS
+
+    async def compute():
+        async with open_read_task_queue(request) as backend:
+            load_stats = await backend.get_load_stats(group_by)
+        return {
+            "group_by": group_by,
+            **recommend(
+                load_stats,
+                settings.QUEUE_STATS_WINDOW_SECONDS,
+                target_wait,
+                settings.WORKER_MAX_TASKS,
+            ),
+        }
+
+    return await scaling_cache.get_or_compute((group_by, target_wait), compute)
+
+
+@router.put("/{queue}/weight", response_model=TaskQueue)
+async def set_queue_weight(
+    weight: QueueWeight,
+    queue: str = Path(..., description="The name of the queue"),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Set a queue's share of the workers in fair scheduling mode."""
+    return await backend.set_queue_weight(queue, weight.weight)
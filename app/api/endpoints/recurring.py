@@ -0,0 +1,81 @@
+"""API endpoints for recurring task management."""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+
+from app.api.deps import get_task_queue
+from app.schemas.task import (
+    RecurringTask,
+    RecurringTaskCreate,
+    RecurringTaskList,
+    RecurringTaskUpdate,
+)
+from app.services.backends import TaskQueueBackend
+
+router = APIRouter()
+
+
+@router.post("/", response_model=RecurringTask, status_code=201)
+async def create_recurring_task(
+    recurring_task: RecurringTaskCreate,
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Create a new recurring task."""
+    return await backend.create_recurring_task(recurring_in=recurring_task)
+
+
+@router.get("/", response_model=RecurringTaskList)
+async def get_recurring_tasks(
+    skip: int = 0,
+    limit: int = 100,
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Get all recurring tasks with pagination."""
+    recurring_tasks = await backend.get_recurring_tasks(skip=skip, limit=limit)
+    total = await backend.get_recurring_tasks_count()
+    return {"items": recurring_tasks, "total": total}
+
+
+@router.get("/{recurring_task_id}", response_model=RecurringTask)
+async def get_recurring_task(
+    recurring_task_id: UUID = Path(
+        ..., description="The UUID of the recurring task to retrieve"
+    ),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Get a recurring task by ID."""
+    db_recurring = await backend.get_recurring_task(recurring_task_id)
+    if db_recurring is None:
+        raise HTTPException(status_code=404, detail="Recurring task not found")
+    return db_recurring
+
+
+@router.put("/{recurring_task_id}", response_model=RecurringTask)
+async def update_recurring_task(
+    recurring_task: RecurringTaskUpdate,
+    recurring_task_id: UUID = Path(
+        ..., description="The UUID of the recurring task to update"
+    ),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Update a recurring task by ID."""
+    db_recurring = await backend.update_recurring_task(
+        recurring_task_id, recurring_in=recurring_task
+    )
+    if db_recurring is None:
+        raise HTTPException(status_code=404, detail="Recurring task not found")
+    return db_recurring
+
+
+@router.delete("/{recurring_task_id}", status_code=204)
+async def delete_recurring_task(
+    recurring_task_id: UUID = Path(
+        ..., description="The UUID of the recurring task to delete"
+    ),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Delete a recurring task and its runs that have not started yet."""
+    success = await backend.delete_recurring_task(recurring_task_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Recurring task not found")
+    return None
@@ -1,22 +1,60 @@
 """API endpoints for task management."""
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.db.database import get_db
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_read_task_queue, get_task_queue
+from app.core.config import settings
 from app.db.models import TaskStatus
-from app.schemas.task import Task, TaskCreate, TaskList, TaskUpdate
-from app.services.task_queue import TaskQueueService
+from app.schemas.task import (
+    BulkAction,
+    BulkResult,
+    Task,
+    TaskCreate,
+    TaskFilter,
+    TaskList,
+    TaskUpdate,
+)
+from app.services.backends import TaskQueueBackend
+from app.services.enqueue import enqueue_coalescer
+from app.services.events import Subscription, broker, start_listener
+from app.services.task_cache import (
+    TERMINAL_STATUSES,
+    cache_control,
+    etag_matches,
+    task_cache,
+    task_etag,
+)
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Task, status_code=201)
-async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):  # noqa
-    """Create a new task in the queue."""
-    return await TaskQueueService.create_task(db=db, task_in=task)
+async def create_task(
+    task: TaskCreate, backend: TaskQueueBackend = Depends(get_task_queue)
+):  # noqa
+    """Create a new task in the queue.
+
+    With ``ENQUEUE_BATCH_ENABLED``, tasks without dependencies are created in
+    batches shared with concurrent requests.
+    """
+    if enqueue_coalescer is not None and not task.depends_on:
+        return await enqueue_coalescer.create_task(task)
+    db_task = await backend.create_task(task_in=task)
+    if db_task is None:
+        raise HTTPException(status_code=400, detail="Unknown task in depends_on")
+    return db_task
 
 
 @router.get("/", response_model=TaskList)
@@ -24,14 +62,14 @@ async def get_tasks(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = Query(None, description="Filter tasks by status"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_read_task_queue),  # noqa
 ):
     """Get all tasks with pagination and optional status filtering."""
     if status:
         try:
             task_status = TaskStatus[status.upper()]
-            tasks = await TaskQueueService.get_tasks_by_status(
-                db=db, status=task_status, skip=skip, limit=limit
+            tasks = await backend.get_tasks_by_status(
+                status=task_status, skip=skip, limit=limit
             )
             total = len(
                 tasks
@@ -42,31 +80,115 @@ async def get_tasks(
                 status_code=400, detail=f"Invalid status: {status}"
             ) from exc
 
-    tasks = await TaskQueueService.get_tasks(db=db, skip=skip, limit=limit)
-    total = await TaskQueueService.get_tasks_count(db=db)
+    tasks = await backend.get_tasks(skip=skip, limit=limit)
+    total = await backend.get_tasks_count()
     return {"items": tasks, "total": total}
 
 
-@router.get("/{task_id}", response_model=Task)
+async def _stream_events(
+    request: Request, subscription: Subscription
+) -> AsyncIterator[str]:
+    """Format a subscription as a Server-Sent Events stream."""
+    try:
+        while not await request.is_disconnected():
+            task_event = await subscription.get(
+                timeout=settings.EVENTS_KEEPALIVE_INTERVAL
+            )
+            if subscription.evicted:
+                yield "event: evicted\ndata: {}\n\n"
+                break
+            if task_event is None:
+                # Comment lines keep proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {task_event.event.value}\ndata: {task_event.to_json()}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def stream_task_events(
+    request: Request,
+    status: Optional[List[str]] = Query(None, description="Filter by status"),  # noqa
+    name: Optional[List[str]] = Query(None, description="Filter by task name"),  # noqa
+    queue: Optional[List[str]] = Query(None, description="Filter by queue"),  # noqa
+):
+    """Stream task state changes as Server-Sent Events."""
+    statuses = None
+    if status:
+        try:
+            statuses = [TaskStatus[value.upper()].value for value in status]
+        except KeyError as exc:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid status: {exc.args[0]}"
+            ) from exc
+
+    await start_listener()
+    subscription = broker.subscribe(statuses=statuses, names=name, queues=queue)
+    return StreamingResponse(
+        _stream_events(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{task_id}",
+    response_model=Task,
+    responses={304: {"description": "The task matches If-None-Match"}},
+)
 async def get_task(
     task_id: UUID = Path(..., description="The UUID of the task to retrieve"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    if_none_match: Optional[str] = Header(None),  # noqa
+    backend: TaskQueueBackend = Depends(get_read_task_queue),  # noqa
 ):
-    """Get a task by ID."""
-    db_task = await TaskQueueService.get_task(db=db, task_id=task_id)
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return db_task
+    """Get a task by ID.
+
+    Finished tasks are served from an in-process cache, filled from primary
+    reads only. Responses carry an ETag; a matching ``If-None-Match`` gets a
+    304 without a body.
+    """
+    # Cached entries are only invalidated by events this process receives
+    await start_listener()
+    cached = task_cache.get(str(task_id))
+    if cached is not None:
+        etag, cache_control_value, body = cached
+    else:
+        generation = task_cache.generation()
+        db_task = await backend.get_task(task_id=task_id)
+        if db_task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        etag = task_etag(db_task)
+        cache_control_value = cache_control(db_task)
+        if etag_matches(if_none_match, etag):
+            body = b""
+        else:
+            body = Task.model_validate(db_task).model_dump_json().encode()
+            # A lagging replica may return a version older than the last
+            # event, which no later event would evict
+            if db_task.status in TERMINAL_STATUSES and not backend.replica:
+                task_cache.put(
+                    str(task_id),
+                    etag,
+                    cache_control_value,
+                    body,
+                    generation=generation,
+                )
+
+    headers = {"ETag": etag, "Cache-Control": cache_control_value}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.put("/{task_id}", response_model=Task)
 async def update_task(
     task: TaskUpdate,
     task_id: UUID = Path(..., description="The UUID of the task to update"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
 ):
     """Update a task by ID."""
-    db_task = await TaskQueueService.update_task(db=db, task_id=task_id, task_in=task)
+    db_task = await backend.update_task(task_id=task_id, task_in=task)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
@@ -75,10 +197,10 @@ async def update_task(
 @router.delete("/{task_id}", status_code=204)
 async def delete_task(
     task_id: UUID = Path(..., description="The UUID of the task to delete"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
 ):
     """Delete a task by ID."""
-    success = await TaskQueueService.delete_task(db=db, task_id=task_id)
+    success = await backend.delete_task(task_id=task_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
     return None
@@ -87,10 +209,10 @@ async def delete_task(
 @router.patch("/{task_id}/pause", response_model=Task)
 async def pause_task(
     task_id: UUID = Path(..., description="The UUID of the task to pause"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
 ):
     """Pause a task by ID."""
-    db_task = await TaskQueueService.pause_task(db=db, task_id=task_id)
+    db_task = await backend.pause_task(task_id=task_id)
     if db_task is None:
         raise HTTPException(
             status_code=404,
@@ -105,13 +227,29 @@ async def pause_task(
 @router.patch("/{task_id}/resume", response_model=Task)
 async def resume_task(
     task_id: UUID = Path(..., description="The UUID of the task to resume"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
 ):
     """Resume a paused task by ID."""
-    db_task = await TaskQueueService.resume_task(db=db, task_id=task_id)
+    db_task = await backend.resume_task(task_id=task_id)
     if db_task is None:
         raise HTTPException(
             status_code=404,
             detail="Task not found or cannot be resumed (must be in PAUSED state)",
         )
     return db_task
+
+
+@router.post("/bulk/{action}", response_model=BulkResult)
+async def bulk_action(
+    task_filter: TaskFilter,
+    action: BulkAction = Path(..., description="The transition to apply"),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Pause, resume, delete or requeue every task matching a filter.
+
+    Only tasks the transition applies to are affected: pausing covers
+    PENDING, SCHEDULED and RUNNING tasks, resuming PAUSED ones and requeueing
+    FAILED ones. Returns the number of affected tasks.
+    """
+    affected = await backend.bulk_action(action=action, task_filter=task_filter)
+    return {"action": action, "affected": affected}
@@ -1,22 +1,56 @@
 """API endpoints for worker management."""
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
 
-from app.db.database import get_db
-from app.schemas.task import Worker, WorkerCreate
-from app.services.worker import WorkerService
+from app.api.deps import get_read_task_queue, get_task_queue
+from app.schemas.task import (
+    Task,
+    TaskAck,
+    TaskAckResult,
+    Worker,
+    WorkerCreate,
+    WorkerList,
+    WorkerSummary,
+)
+from app.services.backends import TaskQueueBackend
+from app.services.events import broker, start_listener
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Worker, status_code=201)
 async def create_worker(
-    worker: WorkerCreate, db: AsyncSession = Depends(get_db)
+    worker: WorkerCreate, backend: TaskQueueBackend = Depends(get_task_queue)
 ):  # noqa
     """Create a new worker."""
-    return await WorkerService.create_worker(db=db, name=worker.name)
+    return await backend.create_worker(worker_in=worker)
+
+
+@router.get("/", response_model=WorkerList)
+async def list_workers(
+    after: Optional[UUID] = Query(
+        None, description="Return workers whose ID sorts after this one"
+    ),  # noqa
+    limit: int = Query(100, ge=1, le=1000),  # noqa
+    stats: bool = Query(False, description="Include each worker's load"),  # noqa
+    backend: TaskQueueBackend = Depends(get_read_task_queue),  # noqa
+):
+    """List workers in ID order, a page at a time.
+
+    Pages are keyed on the last worker ID of the previous page, so they stay
+    consistent while workers register and cost the same however deep.
+    """
+    page = await backend.list_workers(after=after, limit=limit, with_stats=stats)
+    items = [
+        WorkerSummary.model_validate(
+            {**Worker.model_validate(worker).model_dump(), "stats": load}
+        )
+        for worker, load in page
+    ]
+    next_after = items[-1].id if len(items) == limit else None
+    return {"items": items, "next_after": next_after}
 
 
 @router.get("/{worker_id}", response_model=Worker)
@@ -24,10 +58,10 @@ async def get_worker(
     worker_id: UUID = Path(
         ..., description="The UUID of the worker to retrieve"
     ),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_read_task_queue),  # noqa
 ):
     """Get a worker by ID."""
-    db_worker = await WorkerService.get_worker(db=db, worker_id=worker_id)
+    db_worker = await backend.get_worker(worker_id=worker_id)
     if db_worker is None:
         raise HTTPException(status_code=404, detail="Worker not found")
     return db_worker
@@ -36,10 +70,10 @@ async def get_worker(
 @router.patch("/{worker_id}/heartbeat", response_model=Worker)
 async def update_heartbeat(
     worker_id: UUID = Path(..., description="The UUID of the worker to update"),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
 ):
     """Update the heartbeat of a worker."""
-    db_worker = await WorkerService.update_heartbeat(db=db, worker_id=worker_id)
+    db_worker = await backend.update_heartbeat(worker_id=worker_id)
     if db_worker is None:
         raise HTTPException(status_code=404, detail="Worker not found")
     return db_worker
@@ -49,12 +83,90 @@ async def update_heartbeat(
 async def set_worker_status(
     worker_id: UUID = Path(..., description="The UUID of the worker to update"),  # noqa
     status: str = Body(..., embed=True),  # noqa
-    db: AsyncSession = Depends(get_db),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
 ):
     """Set the status of a worker."""
-    db_worker = await WorkerService.set_worker_status(
-        db=db, worker_id=worker_id, status=status
-    )
+    db_worker = await backend.set_worker_status(worker_id=worker_id, status=status)
     if db_worker is None:
         raise HTTPException(status_code=404, detail="Worker not found")
     return db_worker
+
+
+@router.post("/{worker_id}/lease", response_model=List[Task])
+async def lease_tasks(
+    worker_id: UUID = Path(..., description="The UUID of the leasing worker"),  # noqa
+    n: int = Query(1, ge=1, le=100, description="Maximum number of tasks"),  # noqa
+    wait: float = Query(
+        0, ge=0, le=60, description="Seconds to wait for a task if none is ready"
+    ),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Claim up to ``n`` ready tasks for a worker.
+
+    With ``wait`` set, an empty lease is held open until a task becomes
+    PENDING or the wait is over.
+    """
+    db_worker = await backend.get_worker(worker_id=worker_id)
+    if db_worker is None:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    if not wait:
+        return await backend.claim_tasks(worker_id=worker_id, limit=n)
+
+    # Subscribe before claiming so that no task slips in between the two
+    await start_listener()
+    subscription = broker.subscribe(statuses=["pending"])
+    try:
+        tasks = await backend.claim_tasks(worker_id=worker_id, limit=n)
+        if tasks:
+            return tasks
+        await subscription.get(timeout=wait)
+        return await backend.claim_tasks(worker_id=worker_id, limit=n)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.post("/{worker_id}/ack", response_model=TaskAckResult)
+async def ack_tasks(
+    acks: List[TaskAck],
+    worker_id: UUID = Path(..., description="The UUID of the acking worker"),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Complete or fail a batch of tasks running on a worker."""
+    db_worker = await backend.get_worker(worker_id=worker_id)
+    if db_worker is None:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    acked = await backend.ack_tasks(worker_id=worker_id, acks=acks)
+    acked_ids = {str(task.id) for task in acked}
+    return {
+        "acknowledged": [ack.task_id for ack in acks if str(ack.task_id) in acked_ids],
+        "rejected": [ack.task_id for ack in acks if str(ack.task_id) not in acked_ids],
+    }
+
+
+@router.post("/{worker_id}/release", response_model=List[Task])
+async def release_tasks(
+    task_ids: List[UUID],
+    worker_id: UUID = Path(..., description="The UUID of the releasing worker"),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Put tasks a worker leased but never started back to PENDING."""
+    return await backend.release_tasks(worker_id=worker_id, task_ids=task_ids)
+
+
+@router.post("/{worker_id}/revoked", response_model=List[UUID])
+async def get_revoked_tasks(
+    task_ids: List[UUID],
+    worker_id: UUID = Path(..., description="The UUID of the worker"),  # noqa
+    backend: TaskQueueBackend = Depends(get_task_queue),  # noqa
+):
+    """Which of the tasks a worker is running it should stop.
+
+    These are the tasks no longer running on the worker, because they were
+    paused, deleted or taken over while it ran them. Reads go to the primary,
+    as a lagging replica would revoke tasks the worker just claimed.
+    """
+    db_worker = await backend.get_worker(worker_id=worker_id)
+    if db_worker is None:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    running = set(await backend.get_running_task_ids(worker_id, task_ids))
+    return [task_id for task_id in task_ids if str(task_id) not in running]
@@ -42,13 +42,146 @@ class Settings(BaseSettings):
             username=values.get("POSTGRES_USER"),
             password=values.get("POSTGRES_PASSWORD"),
             host=values.get("POSTGRES_HOST"),
-            port=values.get("POSTGRES_PORT"),
+            port=int(values.get("POSTGRES_PORT", 5432)),
             path=f"/{db_name}",
         )
 
+    # Optional streaming replica serving read-only endpoints while its lag is
+    # below REPLICA_MAX_LAG_SECONDS
+    DATABASE_REPLICA_URL: Optional[str] = os.getenv("DATABASE_REPLICA_URL")
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_LAG_CHECK_INTERVAL: float = float(
+        os.getenv("REPLICA_LAG_CHECK_INTERVAL", "1")
+    )
+
+    # Task storage: "database" or "memory" (in-process, for tests and local dev)
+    QUEUE_BACKEND: str = os.getenv("QUEUE_BACKEND", "database")
+
+    # Single-node SQLite mode, used instead of PostgreSQL when a path is set
+    SQLITE_DATABASE_PATH: Optional[str] = os.getenv("SQLITE_DATABASE_PATH")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+
+    # Sharded mode: comma separated database URLs to spread tasks over. Tasks
+    # are routed by consistent hashing of their ID, or of their queue with
+    # SHARD_KEY=queue; append new shards at the end of the list
+    DATABASE_SHARDS: str = os.getenv("DATABASE_SHARDS", "")
+    SHARD_KEY: str = os.getenv("SHARD_KEY", "id")
+    SHARD_VIRTUAL_NODES: int = int(os.getenv("SHARD_VIRTUAL_NODES", "64"))
+
     # Worker settings
+    # Idle workers back off from WORKER_POLL_MIN_INTERVAL up to
+    # WORKER_POLL_INTERVAL seconds between claims, with jitter
     WORKER_POLL_INTERVAL: int = int(os.getenv("WORKER_POLL_INTERVAL", "5"))
+    WORKER_POLL_MIN_INTERVAL: float = float(
+        os.getenv("WORKER_POLL_MIN_INTERVAL", "0.1")
+    )
     WORKER_MAX_TASKS: int = int(os.getenv("WORKER_MAX_TASKS", "10"))
+    # "database" connects workers straight to the database, "http" leases
+    # tasks through the API so workers share its connection pool
+    WORKER_TRANSPORT: str = os.getenv("WORKER_TRANSPORT", "database")
+    WORKER_API_URL: str = os.getenv("WORKER_API_URL", "http://api:8000/api")
+    WORKER_HTTP_TIMEOUT: int = int(os.getenv("WORKER_HTTP_TIMEOUT", "30"))
+    # Tasks claimed ahead of free slots, so a slot that frees up is refilled
+    # without waiting for a claim
+    WORKER_PREFETCH: int = int(os.getenv("WORKER_PREFETCH", "0"))
+    # On SIGTERM, how long in-flight tasks get to finish before they are
+    # released back to the queue
+    WORKER_DRAIN_TIMEOUT: int = int(os.getenv("WORKER_DRAIN_TIMEOUT", "30"))
+    # Longest time an empty HTTP lease is held open waiting for a task
+    WORKER_LEASE_WAIT: int = int(os.getenv("WORKER_LEASE_WAIT", "20"))
+    # Seconds a task may run before it is cancelled and failed (0 for no
+    # limit), overridden per task name by TASK_TIMEOUTS ("name=seconds,...")
+    # and per task by its timeout_seconds
+    WORKER_TASK_TIMEOUT: float = float(os.getenv("WORKER_TASK_TIMEOUT", "0"))
+    TASK_TIMEOUTS: str = os.getenv("TASK_TIMEOUTS", "")
+    # Times a timed-out task is retried before it fails, first after
+    # WORKER_TIMEOUT_RETRY_DELAY seconds and twice as long on each retry
+    WORKER_TIMEOUT_RETRIES: int = int(os.getenv("WORKER_TIMEOUT_RETRIES", "0"))
+    WORKER_TIMEOUT_RETRY_DELAY: float = float(
+        os.getenv("WORKER_TIMEOUT_RETRY_DELAY", "5")
+    )
+    # How often a worker running tasks checks whether any were paused or
+    # deleted, and cancels them
+    WORKER_REVOKE_CHECK_INTERVAL: float = float(
+        os.getenv("WORKER_REVOKE_CHECK_INTERVAL", "1")
+    )
+    # Tasks running longer than this many seconds are logged with the hottest
+    # stacks sampled every WORKER_PROFILE_INTERVAL seconds (0 disables)
+    WORKER_SLOW_TASK_SECONDS: float = float(os.getenv("WORKER_SLOW_TASK_SECONDS", "0"))
+    WORKER_PROFILE_INTERVAL: float = float(os.getenv("WORKER_PROFILE_INTERVAL", "0.01"))
+
+    # Number of hash partitions of the ready queue; workers claim from their
+    # own partition first to avoid contending for the same rows
+    TASK_PARTITIONS: int = int(os.getenv("TASK_PARTITIONS", "1"))
+
+    # Bulk actions update or delete matching tasks in transactions of at most
+    # this many rows, to keep locks short
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+    # Claim order: "strict" runs tasks by priority, then in order of arrival;
+    # "fair" lets waiting tasks gain priority over time and shares the workers
+    # between queues according to their weights
+    SCHEDULING_MODE: str = os.getenv("SCHEDULING_MODE", "strict")
+    # In fair mode, how long a task waits to gain one priority level
+    PRIORITY_AGING_SECONDS: int = int(os.getenv("PRIORITY_AGING_SECONDS", "60"))
+    # In fair mode, virtual time a task takes from a queue of weight 1
+    FAIR_SHARE_QUANTUM_SECONDS: float = float(
+        os.getenv("FAIR_SHARE_QUANTUM_SECONDS", "1.0")
+    )
+    # Window of recently started tasks used for queue wait time stats
+    QUEUE_STATS_WINDOW_SECONDS: int = int(
+        os.getenv("QUEUE_STATS_WINDOW_SECONDS", "300")
+    )
+    # Group commit of concurrent task creations by the API: tasks submitted
+    # within this many seconds, up to a number of rows, share one INSERT and
+    # one commit; see app/services/enqueue.py
+    ENQUEUE_BATCH_ENABLED: bool = os.getenv("ENQUEUE_BATCH_ENABLED", "false") == "true"
+    ENQUEUE_BATCH_WINDOW: float = float(os.getenv("ENQUEUE_BATCH_WINDOW", "0.002"))
+    ENQUEUE_BATCH_MAX_ROWS: int = int(os.getenv("ENQUEUE_BATCH_MAX_ROWS", "500"))
+    # Autoscaling recommendations: the longest a ready task should wait for
+    # a worker, and how long a computed recommendation is served from memory
+    SCALING_TARGET_WAIT_SECONDS: float = float(
+        os.getenv("SCALING_TARGET_WAIT_SECONDS", "30")
+    )
+    SCALING_CACHE_SECONDS: float = float(os.getenv("SCALING_CACHE_SECONDS", "5"))
+
+    # Scheduler promoting due SCHEDULED tasks, run by the API process
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true") == "true"
+    SCHEDULER_BATCH_SIZE: int = int(os.getenv("SCHEDULER_BATCH_SIZE", "1000"))
+    SCHEDULER_MAX_INTERVAL: int = int(os.getenv("SCHEDULER_MAX_INTERVAL", "60"))
+
+    # Recurring tasks: how far ahead runs are materialized, how late a run may
+    # be before it counts as missed, and how many missed runs are caught up
+    RECURRING_LOOKAHEAD_SECONDS: int = int(
+        os.getenv("RECURRING_LOOKAHEAD_SECONDS", "60")
+    )
+    RECURRING_MISFIRE_GRACE_SECONDS: int = int(
+        os.getenv("RECURRING_MISFIRE_GRACE_SECONDS", "60")
+    )
+    RECURRING_MAX_CATCH_UP: int = int(os.getenv("RECURRING_MAX_CATCH_UP", "100"))
+
+    # HTTP caching of finished tasks: Cache-Control max-age of COMPLETED and
+    # FAILED tasks, and memory for cached responses (0 disables the cache)
+    TASK_CACHE_MAX_AGE: int = int(os.getenv("TASK_CACHE_MAX_AGE", "3600"))
+    TASK_CACHE_MAX_BYTES: int = int(os.getenv("TASK_CACHE_MAX_BYTES", "67108864"))
+
+    # Task payloads and results of at least this many bytes of JSON are
+    # stored compressed with "zstd" (zlib if zstandard isn't installed),
+    # "zlib" or "none"; see app/db/compression.py
+    PAYLOAD_COMPRESSION: str = os.getenv("PAYLOAD_COMPRESSION", "zstd")
+    PAYLOAD_COMPRESSION_THRESHOLD: int = int(
+        os.getenv("PAYLOAD_COMPRESSION_THRESHOLD", "1024")
+    )
+
+    # Mirror service and worker spans to OpenTelemetry (needs opentelemetry-api)
+    OTEL_ENABLED: bool = os.getenv("OTEL_ENABLED", "false") == "true"
+
+    # Task event stream settings
+    EVENTS_CHANNEL: str = os.getenv("EVENTS_CHANNEL", "task_events")
+    EVENTS_CLIENT_BUFFER: int = int(os.getenv("EVENTS_CLIENT_BUFFER", "1000"))
+    EVENTS_KEEPALIVE_INTERVAL: int = int(os.getenv("EVENTS_KEEPALIVE_INTERVAL", "15"))
 
     class Config:
         """Pydantic configuration class."""
@@ -0,0 +1,267 @@
+"""Tracing and profiling hooks for the service layer and the worker.
+
+Each ``TaskQueueService`` call and each worker stage (claim, execute, ack,
+release, heartbeat) runs inside a span. A finished span, or an event such as a
+task timeout, is handed to every registered hook, and mirrored as an
+OpenTelemetry span once ``enable_opentelemetry`` has been called
+(``OTEL_ENABLED=true``) and the ``opentelemetry-api`` package is installed.
+With no hook and no tracer, a span is a shared no-op object, so
+instrumentation costs one attribute check.
+
+``SamplingProfiler`` is an opt-in sampling profiler. A background thread
+records the stack of the event loop thread at a fixed interval into a bounded
+buffer. Coroutines run through ``SamplingProfiler.profile`` are also sampled
+on their own: where the coroutine is, running or suspended, at every tick. The
+worker profiles each task that way and logs the hottest stacks of the slow
+ones, which leaves out whatever else the event loop was doing meanwhile.
+"""
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """A timed stage of work."""
+
+    name: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start: float = 0.0
+    duration: float = 0.0
+    error: Optional[BaseException] = None
+
+
+Hook = Callable[[Span], None]
+
+
+class _NoopSpan:
+    """Context manager used when nothing is listening."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _ActiveSpan:
+    """Context manager timing a span and reporting it when it ends."""
+
+    def __init__(self, instrumentation: "Instrumentation", span: Span):
+        self.instrumentation = instrumentation
+        self.span = span
+        self._otel_span: Any = None
+
+    def __enter__(self) -> Span:
+        tracer = self.instrumentation.tracer
+        if tracer is not None:
+            self._otel_span = tracer.start_as_current_span(
+                self.span.name, attributes=self.span.attributes
+            )
+            self._otel_span.__enter__()
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.span.duration = time.perf_counter() - self.span.start
+        self.span.error = exc
+        if self._otel_span is not None:
+            self._otel_span.__exit__(exc_type, exc, traceback)
+        for hook in self.instrumentation.hooks:
+            try:
+                hook(self.span)
+            except Exception:  # noqa
+                logger.exception(f"Instrumentation hook failed for {self.span.name}")
+
+
+class Instrumentation:
+    """Registry of span hooks and the optional OpenTelemetry tracer."""
+
+    def __init__(self) -> None:
+        """Initialize with no hooks and no tracer."""
+        self.hooks: List[Hook] = []
+        self.tracer: Any = None
+        self.enabled = False
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call ``hook`` with every span that finishes from now on."""
+        self.hooks.append(hook)
+        self.enabled = True
+
+    def remove_hook(self, hook: Hook) -> None:
+        """Stop calling a hook."""
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+        self.enabled = bool(self.hooks) or self.tracer is not None
+
+    def enable_opentelemetry(self) -> bool:
+        """Mirror spans to OpenTelemetry, if the API package is installed."""
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("opentelemetry-api is not installed, tracing disabled")
+            return False
+        self.tracer = trace.get_tracer("taskqueue")
+        self.enabled = True
+        return True
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Context manager timing a stage of work."""
+        if not self.enabled:
+            return _NOOP
+        return _ActiveSpan(self, Span(name, attributes))
+
+    def event(self, name: str, **attributes: Any) -> None:
+        """Report something that happened as a span without duration."""
+        if self.enabled:
+            with _ActiveSpan(self, Span(name, attributes)):
+                pass
+
+
+instrumentation = Instrumentation()
+
+
+def traced(name: str) -> Callable:
+    """Decorate a coroutine function to run inside a span."""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not instrumentation.enabled:
+                return await function(*args, **kwargs)
+            with instrumentation.span(name):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _frame_entry(frame: Any) -> str:
+    """Render a frame as ``module:function:line``."""
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def _fold_stack(frame: Any, outermost: Any = None) -> str:
+    """Render a stack, up to the ``outermost`` frame if given, outermost first."""
+    entries = []
+    while frame is not None:
+        entries.append(_frame_entry(frame))
+        if frame is outermost:
+            break
+        frame = frame.f_back
+    return ";".join(reversed(entries))
+
+
+def _fold_awaits(coro: Any) -> str:
+    """Render where a suspended coroutine is, following what it awaits."""
+    entries = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        entries.append(_frame_entry(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return ";".join(entries)
+
+
+def _is_idle(frame: Any) -> bool:
+    """Whether the thread is the event loop waiting in its selector."""
+    return frame.f_globals.get("__name__") == "selectors"
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread at a fixed interval."""
+
+    def __init__(
+        self,
+        interval: float,
+        max_samples: int = 100_000,
+        thread_id: Optional[int] = None,
+    ):
+        """Initialize the profiler for a thread (the current one by default)."""
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.max_samples = max_samples
+        self._samples: Deque[Tuple[float, str]] = deque(maxlen=max_samples)
+        # Profiled coroutines by key: their asyncio task and their samples
+        self._profiled: Dict[str, Tuple[asyncio.Task, Deque[str]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """Record samples until stopped."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None and not _is_idle(frame):
+                self._samples.append((time.monotonic(), _fold_stack(frame)))
+            for task, samples in list(self._profiled.values()):
+                coro = task.get_coro()
+                if getattr(coro, "cr_running", False):
+                    # Running on the loop thread: its frames are on the stack
+                    if frame is not None:
+                        samples.append(_fold_stack(frame, outermost=coro.cr_frame))
+                elif not task.done():
+                    samples.append(_fold_awaits(coro))
+
+    async def profile(self, key: str, awaitable: Awaitable[Any]) -> Any:
+        """Await ``awaitable``, sampling it under ``key``.
+
+        Samples are taken whether the coroutine is running or suspended,
+        until ``forget`` is called for the key.
+        """
+        task = asyncio.current_task()
+        if task is not None:
+            self._profiled[key] = (task, deque(maxlen=self.max_samples))
+        return await awaitable
+
+    def task_stacks(self, key: str, limit: int = 5) -> List[Tuple[str, int]]:
+        """Most frequent stacks sampled from a coroutine run by ``profile``."""
+        profiled = self._profiled.get(key)
+        if profiled is None:
+            return []
+        return Counter(profiled[1]).most_common(limit)
+
+    def forget(self, key: str) -> None:
+        """Drop the samples of a coroutine run by ``profile``."""
+        self._profiled.pop(key, None)
+
+    def hot_stacks(
+        self, since: float, until: float, limit: int = 5
+    ) -> List[Tuple[str, int]]:
+        """Most frequent stacks sampled between two ``time.monotonic`` times."""
+        counts = Counter(
+            stack for sampled_at, stack in self._samples if since <= sampled_at <= until
+        )
+        return counts.most_common(limit)
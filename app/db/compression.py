@@ -0,0 +1,103 @@
+"""Compressed storage of large JSON values.
+
+Task payloads and results are stored as canonical JSON (sorted keys, no
+whitespace) in a binary column. Values of at least
+``PAYLOAD_COMPRESSION_THRESHOLD`` bytes are compressed with
+``PAYLOAD_COMPRESSION``: ``zstd`` if the ``zstandard`` package is installed,
+otherwise ``zlib``, or ``none``.
+
+Stored values describe themselves: zstd frames start with the bytes
+``28 b5 2f fd`` and zlib streams with ``78`` (``x``), neither of which can start
+a JSON document. Anything else is plain JSON, so rows written before
+compression was enabled, with another codec or under the threshold all read
+back the same way, and changing the settings never needs a rewrite.
+"""
+import functools
+import json
+import logging
+import zlib
+from typing import Any, Callable, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZLIB_MARKER = 0x78
+
+
+def canonical_json(value: Any) -> bytes:
+    """Encode a JSON value with sorted keys and no whitespace."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+@functools.lru_cache(maxsize=None)
+def _compressor(codec: str) -> Optional[Callable[[bytes], bytes]]:
+    """Compression function of a codec, None to store values as they are."""
+    if codec == "zstd":
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).compress
+        logger.warning("zstandard is not installed, compressing with zlib")
+        codec = "zlib"
+    if codec == "zlib":
+        return lambda data: zlib.compress(data, 6)
+    if codec == "none":
+        return None
+    raise ValueError(f"Unknown payload compression codec: {codec}")
+
+
+def encode(value: Any, codec: str, threshold: int) -> bytes:
+    """Stored form of a JSON value."""
+    data = canonical_json(value)
+    compress = _compressor(codec) if len(data) >= threshold else None
+    if compress is None:
+        return data
+    compressed = compress(data)
+    # Incompressible values are cheaper to read uncompressed
+    return compressed if len(compressed) < len(data) else data
+
+
+def decode(data: Any) -> Any:
+    """JSON value of a stored form."""
+    if isinstance(data, str):
+        # Text left in the column by SQLite before it became binary
+        return json.loads(data)
+    data = bytes(data)
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is needed to read zstd compressed values")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif data and data[0] == ZLIB_MARKER:
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored as canonical, and above a size, compressed bytes."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Optional[bytes]:
+        """Encode a value on its way to the database."""
+        if value is None:
+            return None
+        return encode(
+            value,
+            settings.PAYLOAD_COMPRESSION,
+            settings.PAYLOAD_COMPRESSION_THRESHOLD,
+        )
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        """Decode a value read from the database."""
+        if value is None:
+            return None
+        return decode(value)
@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.core.config import settings
+from app.db.sharding import ShardMap, engine_from_url
+from app.db.sqlite import create_sqlite_engine
 
 # Convert PostgreSQL URL to AsyncPG format
 # Replace postgresql:// with postgresql+asyncpg://
@@ -11,9 +13,30 @@ SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL).replace(
 )
 
 # Create async engine
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False)
+if settings.SQLITE_DATABASE_PATH:
+    engine = create_sqlite_engine(settings.SQLITE_DATABASE_PATH)
+else:
+    engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False)
 AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+# Optional replica for read-only endpoints; see app/db/replica.py
+replica_engine = (
+    engine_from_url(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+ReplicaSessionLocal = (
+    async_sessionmaker(bind=replica_engine, expire_on_commit=False)
+    if replica_engine
+    else None
+)
+
+# Sharded mode: tasks are spread over DATABASE_SHARDS instead of the engine above
+SHARD_URLS = [url.strip() for url in settings.DATABASE_SHARDS.split(",") if url.strip()]
+shard_map = (
+    ShardMap.from_urls(SHARD_URLS, settings.SHARD_VIRTUAL_NODES) if SHARD_URLS else None
+)
+
 Base = declarative_base()
 
 
@@ -7,10 +7,24 @@ import uuid
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from app.db.compression import CompressedJSON
 from app.db.database import Base
 
 
@@ -19,6 +33,7 @@ class TaskStatus(enum.Enum):
 
     PENDING = "pending"
     SCHEDULED = "scheduled"
+    BLOCKED = "blocked"
     RUNNING = "running"
     PAUSED = "paused"
     COMPLETED = "completed"
@@ -34,6 +49,17 @@ class TaskPriority(enum.Enum):
     CRITICAL = 4
 
 
+class MisfirePolicy(enum.Enum):
+    """Enum for what to do with runs of a recurring task that were missed."""
+
+    # Drop missed runs and continue with the next upcoming one
+    SKIP = "skip"
+    # Run once for all missed runs
+    FIRE_ONCE = "fire_once"
+    # Run every missed run, up to RECURRING_MAX_CATCH_UP of them
+    CATCH_UP = "catch_up"
+
+
 def generate_uuid() -> str:
     """Generate a UUID as string."""
     return str(uuid.uuid4())
@@ -46,12 +72,27 @@ class Task(Base):
     __allow_unmapped__ = True
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Claiming scans PENDING tasks in sort_key order, within a partition
+        # and when stealing work across all of them
+        Index("ix_tasks_ready", "status", "sort_key"),
+        Index("ix_tasks_ready_partition", "status", "partition", "sort_key"),
+        # Worker load statistics count each worker's tasks by status
+        Index("ix_tasks_worker_status", "worker_id", "status"),
+        # The scheduler looks up due and next due SCHEDULED tasks
+        Index("ix_tasks_status_scheduled_at", "status", "scheduled_at"),
+        # Each run of a recurring task is materialized at most once
+        UniqueConstraint(
+            "recurring_task_id", "scheduled_at", name="uq_tasks_recurring_run"
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=False), primary_key=True, default=generate_uuid, index=True
     )
     name = Column(String(255), nullable=False)
-    payload = Column(JSON, nullable=False)
+    queue = Column(String(255), default="default", nullable=False, index=True)
+    payload = Column(CompressedJSON, nullable=False)
     status = Column(Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False)
     priority = Column(String(20), default=TaskPriority.MEDIUM.name, nullable=False)
     scheduled_at = Column(DateTime(timezone=True), nullable=True)
@@ -67,13 +108,100 @@ class Task(Base):
         nullable=False,
     )
     worker_id = Column(UUID(as_uuid=False), ForeignKey("workers.id"), nullable=True)
-    result = Column(JSON, nullable=True)
+    result = Column(CompressedJSON, nullable=True)
     error = Column(Text, nullable=True)
+    timeout_seconds = Column(Float, nullable=True)
+    # Number of times the task was put back in the queue after failing
+    retries = Column(Integer, default=0, nullable=False)
+    recurring_task_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("recurring_tasks.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    # Number of dependencies of a BLOCKED task that have not completed yet
+    remaining_dependencies = Column(Integer, default=0, nullable=False)
+    # Claim order, lowest first; see app/services/ordering.py
+    sort_key = Column(Float, default=0.0, nullable=False)
+    # Ready queue partition; see app/services/partitions.py
+    partition = Column(Integer, default=0, nullable=False)
 
     # Relationship to Worker with type annotation
     worker: Any = relationship("Worker", back_populates="tasks")
 
 
+class TaskDependency(Base):
+    """Edge of the task dependency graph: ``task_id`` waits for ``depends_on_id``."""
+
+    __tablename__ = "task_dependencies"
+
+    task_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Finishing a task looks up its dependents
+    depends_on_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
+class TaskQueue(Base):
+    """Fair scheduling state of a queue (tenant)."""
+
+    __tablename__ = "task_queues"
+
+    name = Column(String(255), primary_key=True)
+    # Share of the workers the queue gets while other queues have work too
+    weight = Column(Float, default=1.0, nullable=False)
+    # Virtual time at which the queue's latest task was enqueued
+    last_tag = Column(Float, default=0.0, nullable=False)
+
+
+class RecurringTask(Base):
+    """Recurring task model.
+
+    Runs are materialized into ``tasks`` ahead of time by the scheduler.
+    """
+
+    # Allow non-Mapped type annotations
+    __allow_unmapped__ = True
+
+    __tablename__ = "recurring_tasks"
+    __table_args__ = (
+        # The scheduler looks up enabled schedules with runs coming up
+        Index("ix_recurring_tasks_enabled_next_fire_at", "enabled", "next_fire_at"),
+    )
+
+    id = Column(
+        UUID(as_uuid=False), primary_key=True, default=generate_uuid, index=True
+    )
+    name = Column(String(255), nullable=False)
+    queue = Column(String(255), default="default", nullable=False)
+    payload = Column(JSON, nullable=False)
+    priority = Column(String(20), default=TaskPriority.MEDIUM.name, nullable=False)
+    # Exactly one of cron and interval_seconds is set
+    cron = Column(String(255), nullable=True)
+    interval_seconds = Column(Integer, nullable=True)
+    misfire_policy = Column(
+        Enum(MisfirePolicy), default=MisfirePolicy.SKIP, nullable=False
+    )
+    enabled = Column(Boolean, default=True, nullable=False)
+    next_fire_at = Column(DateTime(timezone=True), nullable=False)
+    last_fire_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(), nullable=False
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(),
+        onupdate=lambda: datetime.now(),
+        nullable=False,
+    )
+
+
 class Worker(Base):
     """Worker model."""
 
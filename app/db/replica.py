@@ -0,0 +1,91 @@
+"""Routing of read-only requests to a streaming replica.
+
+A replica is only used while its replication lag, measured at most every
+``REPLICA_LAG_CHECK_INTERVAL`` seconds, is below ``REPLICA_MAX_LAG_SECONDS``.
+Requests that change something hand the client a cookie with the time of the
+write; reads from a client whose last write may not have been replayed on the
+replica yet (it happened less than the current lag ago) go to the primary, so
+clients always see their own writes.
+"""
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.database import replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Cookie holding the time of the client's last write, as a UNIX timestamp
+LAST_WRITE_COOKIE = "tq_last_write"
+
+# Seconds since the last transaction replayed on a PostgreSQL standby, or zero
+# when it has replayed everything it received
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def should_read_from_replica(
+    lag: Optional[float], last_write: Optional[float], now: float
+) -> bool:
+    """Decide whether a read may be served by the replica.
+
+    ``lag`` is None when it could not be measured, ``last_write`` when the
+    client has not written anything recently.
+    """
+    if lag is None or lag > settings.REPLICA_MAX_LAG_SECONDS:
+        return False
+    return last_write is None or now - last_write > lag
+
+
+def parse_last_write(value: Optional[str]) -> Optional[float]:
+    """Read the last write cookie, ignoring malformed values."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class ReplicaMonitor:
+    """Caches the replication lag of a replica."""
+
+    def __init__(self, engine: AsyncEngine, check_interval: float):
+        """Initialize the monitor for a replica engine."""
+        self.engine = engine
+        self.check_interval = check_interval
+        self._lag: Optional[float] = None
+        self._checked_at = float("-inf")
+
+    async def measure(self) -> Optional[float]:
+        """Query the replica's lag in seconds, or None if it is unreachable."""
+        if self.engine.dialect.name != "postgresql":
+            # Only PostgreSQL replicas report their lag
+            return 0.0
+        try:
+            async with self.engine.connect() as conn:
+                lag = (await conn.execute(LAG_QUERY)).scalar_one_or_none()
+        except Exception as exc:  # noqa
+            logger.warning(f"Could not measure replica lag: {exc}")
+            return None
+        return float(lag) if lag is not None else None
+
+    async def lag(self) -> Optional[float]:
+        """Replication lag, measured again once the cached value is stale."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            # Stamped first so concurrent requests don't all query the replica
+            self._checked_at = now
+            self._lag = await self.measure()
+        return self._lag
+
+
+replica_monitor = (
+    ReplicaMonitor(replica_engine, settings.REPLICA_LAG_CHECK_INTERVAL)
+    if replica_engine
+    else None
+)
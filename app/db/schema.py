@@ -0,0 +1,65 @@
+"""Schema version check at start up.
+
+The schema is versioned by the Alembic migrations in ``alembic/versions``.
+Instead of running ``create_all`` (one catalog query per table and index) on
+every start, the API reads the revision stamped in ``alembic_version``:
+
+* an empty database gets the current schema and is stamped with
+  ``SCHEMA_REVISION``, as if ``alembic upgrade head`` had run;
+* a database at ``SCHEMA_REVISION`` is used as is;
+* anything else has to be migrated first with ``alembic upgrade head``.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import Column, MetaData, String, Table, inspect, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Latest revision in alembic/versions; bump it with every new migration
+SCHEMA_REVISION = "0003"
+
+# Alembic's own bookkeeping table, kept out of the models' metadata
+alembic_version = Table(
+    "alembic_version",
+    MetaData(),
+    Column("version_num", String(32), primary_key=True),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is not at the revision this code expects."""
+
+
+def _current_revision(connection) -> Optional[str]:
+    """Revision stamped in the database, "" if unversioned, None if empty."""
+    tables = inspect(connection).get_table_names()
+    if "alembic_version" not in tables:
+        return "" if "tasks" in tables else None
+    return connection.execute(select(alembic_version.c.version_num)).scalar()
+
+
+async def prepare_schema(engine: AsyncEngine, metadata: MetaData) -> None:
+    """Create the schema of an empty database or check its revision."""
+    async with engine.begin() as conn:
+        revision = await conn.run_sync(_current_revision)
+        if revision == SCHEMA_REVISION:
+            return
+        if revision is None:
+            await conn.run_sync(metadata.create_all)
+            await conn.run_sync(alembic_version.create)
+            await conn.execute(
+                alembic_version.insert().values(version_num=SCHEMA_REVISION)
+            )
+            logger.info("Created database schema at revision %s", SCHEMA_REVISION)
+            return
+    if revision == "":
+        raise SchemaVersionError(
+            "Database has tables but no schema revision; run "
+            "'alembic stamp 0001' and then 'alembic upgrade head'"
+        )
+    raise SchemaVersionError(
+        f"Database schema is at revision {revision}, expected "
+        f"{SCHEMA_REVISION}; run 'alembic upgrade head'"
+    )
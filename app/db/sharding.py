@@ -0,0 +1,107 @@
+"""Shard map for spreading tasks over several databases.
+
+Every shard is a complete database with the full schema. Keys (task IDs, or
+queue names with ``SHARD_KEY=queue``) are mapped to shards with a consistent
+hash ring: each shard owns ``SHARD_VIRTUAL_NODES`` points on the ring and a key
+belongs to the first point at or after its hash. Appending a shard to
+``DATABASE_SHARDS`` only moves the keys that land on the new shard's points.
+"""
+import bisect
+import hashlib
+import itertools
+from typing import List, Sequence, Union
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.db.schema import prepare_schema
+from app.db.sqlite import create_sqlite_engine
+
+
+def _hash(key: str) -> int:
+    """Position of a key on the ring."""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+def engine_from_url(url: str) -> AsyncEngine:
+    """Create an async engine for a database URL (PostgreSQL or SQLite)."""
+    if url.startswith("sqlite"):
+        return create_sqlite_engine(url.split(":///", 1)[1])
+    return create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://"), echo=False
+    )
+
+
+class HashRing:
+    """Consistent hash ring over shard indexes."""
+
+    def __init__(self, shard_count: int, virtual_nodes: int = 64):
+        """Place ``virtual_nodes`` points of every shard on the ring."""
+        # Points are named after the shard's position in the list, so shards
+        # keep their keys when their URL changes
+        points = sorted(
+            (_hash(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shard_count)
+            for replica in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def lookup(self, key: Union[str, UUID]) -> int:
+        """Index of the shard owning a key."""
+        index = bisect.bisect_left(self._hashes, _hash(str(key)))
+        return self._shards[index % len(self._shards)]
+
+
+class ShardMap:
+    """Engines and session factories of the shards, with the ring between them."""
+
+    def __init__(self, engines: Sequence[AsyncEngine], virtual_nodes: int = 64):
+        """Build the shard map for already created engines."""
+        if not engines:
+            raise ValueError("A shard map needs at least one shard")
+        self.engines = list(engines)
+        self.session_factories = [
+            async_sessionmaker(bind=engine, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self.ring = HashRing(len(self.engines), virtual_nodes)
+        self._claim_cursor = itertools.count()
+
+    @classmethod
+    def from_urls(cls, urls: Sequence[str], virtual_nodes: int = 64) -> "ShardMap":
+        """Build the shard map for a list of database URLs."""
+        return cls([engine_from_url(url) for url in urls], virtual_nodes)
+
+    def __len__(self) -> int:
+        """Number of shards."""
+        return len(self.engines)
+
+    def shard_for(self, key: Union[str, UUID]) -> int:
+        """Index of the shard owning a key."""
+        return self.ring.lookup(key)
+
+    def claim_order(self) -> List[int]:
+        """Shards in the order the next claim should visit them.
+
+        The starting shard rotates with every call so that claims are spread
+        round-robin over the shards.
+        """
+        start = next(self._claim_cursor) % len(self.engines)
+        return [(start + offset) % len(self.engines) for offset in range(len(self))]
+
+    async def create_all(self, metadata) -> None:
+        """Create the tables on every shard."""
+        for engine in self.engines:
+            async with engine.begin() as conn:
+                await conn.run_sync(metadata.create_all)
+
+    async def prepare_schema(self, metadata) -> None:
+        """Create or check the schema of every shard, see app/db/schema.py."""
+        for engine in self.engines:
+            await prepare_schema(engine, metadata)
+
+    async def dispose(self) -> None:
+        """Close the connection pools of every shard."""
+        for engine in self.engines:
+            await engine.dispose()
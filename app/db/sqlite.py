@@ -0,0 +1,47 @@
+"""Engine setup for the single-node SQLite deployment mode.
+
+SQLite has no row locks, so concurrent workers are made safe by running every
+transaction as ``BEGIN IMMEDIATE`` (it takes the database write lock up front
+instead of failing when upgrading a read lock) and by claiming tasks with a
+single ``UPDATE ... RETURNING`` statement. WAL journaling lets readers proceed
+while a write is in progress, and ``synchronous=NORMAL`` turns the fsync of
+every commit into one fsync per checkpoint.
+"""
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+
+
+def create_sqlite_engine(path: str) -> AsyncEngine:
+    """Create an async engine for a SQLite database file.
+
+    The pool holds a single connection, so all writes of a process go through
+    one writer instead of contending for the database lock.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", echo=False, pool_size=1, max_overflow=0
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def configure_connection(dbapi_connection, connection_record):  # noqa
+        # Let SQLAlchemy emit BEGIN itself instead of the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in (
+            "journal_mode=WAL",
+            "synchronous=NORMAL",
+            f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+            "foreign_keys=ON",
+            "temp_store=MEMORY",
+            f"cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+            f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+        ):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin_immediate(conn):  # noqa
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
@@ -4,17 +4,24 @@ This module initializes and configures the FastAPI application,
 sets up database connections, and includes all API routers.
 """
 import logging
+import time
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 
 try:
     from sqlalchemy.ext.asyncio import AsyncSession
 except ImportError:
     from sqlalchemy.ext.asyncio import AsyncSession  # type: ignore
 
-from app.api.endpoints import tasks, workers
+from app.api.endpoints import queues, recurring, tasks, workers
 from app.core.config import settings
-from app.db.database import Base, engine, get_db
+from app.core.instrumentation import instrumentation
+from app.db.database import Base, engine, get_db, replica_engine, shard_map
+from app.db.replica import LAST_WRITE_COOKIE
+from app.db.schema import prepare_schema
+from app.services.enqueue import enqueue_coalescer
+from app.services.events import broker
+from app.services.scheduler import scheduler
 
 # Create the FastAPI app
 app = FastAPI(
@@ -39,16 +46,40 @@ logging.basicConfig(
 )
 
 
+@app.middleware("http")
+async def track_last_write(request: Request, call_next):
+    """Remember when a client last wrote, for read-your-writes on the replica."""
+    response = await call_next(request)
+    if (
+        replica_engine is not None
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=int(settings.REPLICA_MAX_LAG_SECONDS) + 1,
+            httponly=True,
+        )
+    return response
+
+
 # Create async startup and shutdown events
 @app.on_event("startup")
 async def startup():
     """Startup event handler that initializes the database.
 
-    Creates database tables if they don't exist and logs application startup.
+    Creates the schema of an empty database, refuses to start on one that
+    needs migrating and logs application startup.
     """
-    # Create tables if they don't exist
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if settings.QUEUE_BACKEND == "database" and shard_map is not None:
+        await shard_map.prepare_schema(Base.metadata)
+    elif settings.QUEUE_BACKEND == "database":
+        await prepare_schema(engine, Base.metadata)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    if settings.OTEL_ENABLED:
+        instrumentation.enable_opentelemetry()
     logging.info("Application started")
 
 
@@ -58,14 +89,27 @@ async def shutdown():
 
     Closes database connections and logs application shutdown.
     """
-    # Close the database connection
+    # Stop the scheduler and task event listener and close the database
+    # connection
+    await scheduler.stop()
+    if enqueue_coalescer is not None:
+        await enqueue_coalescer.close()
+    await broker.stop()
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    if shard_map is not None:
+        await shard_map.dispose()
     logging.info("Application shutdown")
 
 
 # Include routers
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 app.include_router(workers.router, prefix="/api/workers", tags=["workers"])
+app.include_router(queues.router, prefix="/api/queue", tags=["queues"])
+app.include_router(
+    recurring.router, prefix="/api/recurring-tasks", tags=["recurring-tasks"]
+)
 
 
 # Health check endpoint
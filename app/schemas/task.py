@@ -3,7 +3,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import UUID4, BaseModel
+from pydantic import UUID4, BaseModel, Field, model_validator
+
+from app.services.cron import CronExpression
 
 
 class TaskStatusEnum(str, Enum):
@@ -11,6 +13,7 @@ class TaskStatusEnum(str, Enum):
 
     PENDING = "pending"
     SCHEDULED = "scheduled"
+    BLOCKED = "blocked"
     RUNNING = "running"
     PAUSED = "paused"
     COMPLETED = "completed"
@@ -31,24 +34,32 @@ class TaskBase(BaseModel):
     """Base schema for task data with common attributes."""
 
     name: str
+    queue: str = "default"
     payload: Dict[str, Any]
     priority: TaskPriorityEnum = TaskPriorityEnum.MEDIUM
     scheduled_at: Optional[datetime] = None
+    # Seconds a worker may run the task before cancelling it and failing it
+    timeout_seconds: Optional[float] = Field(None, gt=0)
 
 
 # Schema for creating a new task
 class TaskCreate(TaskBase):
     """Schema used for creating a new task."""
 
+    # IDs of tasks that must complete before this one can run
+    depends_on: List[UUID4] = []
+
 
 # Schema for updating a task
 class TaskUpdate(BaseModel):
     """Schema used for updating an existing task."""
 
     name: Optional[str] = None
+    queue: Optional[str] = None
     payload: Optional[Dict[str, Any]] = None
     priority: Optional[TaskPriorityEnum] = None
     scheduled_at: Optional[datetime] = None
+    timeout_seconds: Optional[float] = Field(None, gt=0)
     status: Optional[TaskStatusEnum] = None
 
 
@@ -65,6 +76,9 @@ class Task(TaskBase):
     worker_id: Optional[UUID4] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    retries: int = 0
+    recurring_task_id: Optional[UUID4] = None
+    remaining_dependencies: int = 0
 
     class Config:
         """Configuration for the Task schema."""
@@ -73,6 +87,116 @@ class Task(TaskBase):
         json_encoders = {datetime: lambda dt: dt.isoformat(), UUID4: str}
 
 
+# Schema for acknowledging a task a worker has finished
+class TaskAck(BaseModel):
+    """Schema for the outcome of a task reported by a worker."""
+
+    task_id: UUID4
+    success: bool = True
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # Seconds after which a failed task runs again instead of failing
+    retry_in: Optional[float] = Field(None, ge=0)
+
+
+class TaskAckResult(BaseModel):
+    """Schema for the response to a batch of task acknowledgements."""
+
+    acknowledged: List[UUID4]
+    rejected: List[UUID4]
+
+
+class MisfirePolicyEnum(str, Enum):
+    """Enum representing what to do with missed runs of a recurring task."""
+
+    SKIP = "skip"
+    FIRE_ONCE = "fire_once"
+    CATCH_UP = "catch_up"
+
+
+# Recurring task schemas
+class RecurringTaskBase(BaseModel):
+    """Base schema for recurring task data with common attributes."""
+
+    name: str
+    queue: str = "default"
+    payload: Dict[str, Any]
+    priority: TaskPriorityEnum = TaskPriorityEnum.MEDIUM
+    cron: Optional[str] = None
+    interval_seconds: Optional[int] = Field(None, ge=1)
+    misfire_policy: MisfirePolicyEnum = MisfirePolicyEnum.SKIP
+    enabled: bool = True
+
+
+def _check_cron(cron: Optional[str]) -> None:
+    """Raise ValueError if a cron expression is invalid."""
+    if cron is not None:
+        CronExpression(cron)
+
+
+class RecurringTaskCreate(RecurringTaskBase):
+    """Schema used for creating a new recurring task."""
+
+    # First run for interval schedules, earliest run for cron schedules;
+    # defaults to now
+    start_at: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_schedule(self) -> "RecurringTaskCreate":
+        """Require exactly one valid schedule."""
+        if (self.cron is None) == (self.interval_seconds is None):
+            raise ValueError("Exactly one of cron and interval_seconds is required")
+        _check_cron(self.cron)
+        return self
+
+
+class RecurringTaskUpdate(BaseModel):
+    """Schema used for updating an existing recurring task.
+
+    Setting a new schedule restarts it from now.
+    """
+
+    name: Optional[str] = None
+    queue: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    priority: Optional[TaskPriorityEnum] = None
+    cron: Optional[str] = None
+    interval_seconds: Optional[int] = Field(None, ge=1)
+    misfire_policy: Optional[MisfirePolicyEnum] = None
+    enabled: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_schedule(self) -> "RecurringTaskUpdate":
+        """Allow at most one valid schedule."""
+        if self.cron is not None and self.interval_seconds is not None:
+            raise ValueError("Only one of cron and interval_seconds can be set")
+        _check_cron(self.cron)
+        return self
+
+
+class RecurringTask(RecurringTaskBase):
+    """Schema for recurring task data returned from the API."""
+
+    id: UUID4
+    next_fire_at: datetime
+    last_fire_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        """Configuration for the RecurringTask schema."""
+
+        from_attributes = True
+        json_encoders = {datetime: lambda dt: dt.isoformat(), UUID4: str}
+
+
+class RecurringTaskList(BaseModel):
+    """Schema for paginated recurring task list responses."""
+
+    items: List[RecurringTask]
+    total: int
+
+
 # Worker Schemas
 class WorkerBase(BaseModel):
     """Base schema for worker data."""
@@ -101,9 +225,130 @@ class Worker(WorkerBase):
         json_encoders = {datetime: lambda dt: dt.isoformat(), UUID4: str}
 
 
+class WorkerLoad(BaseModel):
+    """Schema for a worker's current load."""
+
+    running: int
+    completed_last_minute: int
+    heartbeat_age_seconds: float
+
+
+class WorkerSummary(Worker):
+    """Schema for a worker in the fleet listing, with its load if requested."""
+
+    stats: Optional[WorkerLoad] = None
+
+
+class WorkerList(BaseModel):
+    """Schema for a page of workers.
+
+    ``next_after`` is passed as ``after`` to get the next page, and is None on
+    the last page.
+    """
+
+    items: List[WorkerSummary]
+    next_after: Optional[UUID4] = None
+
+
+class BulkAction(str, Enum):
+    """Transitions that can be applied to every task matching a filter."""
+
+    PAUSE = "pause"
+    RESUME = "resume"
+    DELETE = "delete"
+    REQUEUE = "requeue"
+
+
+# Schema selecting the tasks a bulk action applies to
+class TaskFilter(BaseModel):
+    """Schema for the criteria of a bulk action; all given criteria must match."""
+
+    status: Optional[TaskStatusEnum] = None
+    name: Optional[str] = None
+    queue: Optional[str] = None
+    priority: Optional[TaskPriorityEnum] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "TaskFilter":
+        """Refuse a filter matching every task."""
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("At least one filter criterion is required")
+        return self
+
+
+class BulkResult(BaseModel):
+    """Schema for the outcome of a bulk action."""
+
+    action: BulkAction
+    affected: int
+
+
 # Schema for task list response
 class TaskList(BaseModel):
     """Schema for paginated task list responses."""
 
     items: List[Task]
     total: int
+
+
+# Queue schemas
+class QueueWeight(BaseModel):
+    """Schema for setting a queue's share of the workers."""
+
+    weight: float = Field(..., gt=0)
+
+
+class TaskQueue(BaseModel):
+    """Schema for a queue's fair scheduling settings."""
+
+    name: str
+    weight: float
+
+    class Config:
+        """Configuration for the TaskQueue schema."""
+
+        from_attributes = True
+
+
+class ScalingGroup(BaseModel):
+    """Schema for the load of one queue or priority and the workers it needs."""
+
+    group: str
+    pending: int
+    running: int
+    oldest_pending_wait_seconds: Optional[float] = None
+    arrivals: int
+    arrival_rate: float
+    finished: int
+    avg_service_seconds: Optional[float] = None
+    worker_service_rate: Optional[float] = None
+    required_slots: float
+    recommended_workers: int
+
+
+class ScalingRecommendation(BaseModel):
+    """Schema for the recommended worker count for a target wait time."""
+
+    group_by: str
+    window_seconds: float
+    target_wait_seconds: float
+    worker_slots: int
+    recommended_workers: int
+    groups: List[ScalingGroup]
+
+
+class QueueStats(BaseModel):
+    """Schema for a queue's backlog and recent wait times."""
+
+    queue: str
+    weight: float
+    pending: int
+    running: int
+    oldest_pending_wait_seconds: Optional[float] = None
+    started_recently: int
+    avg_wait_seconds: Optional[float] = None
+    max_wait_seconds: Optional[float] = None
@@ -0,0 +1,47 @@
+"""Pluggable storage backends for the task queue.
+
+``QUEUE_BACKEND`` selects the backend: ``database`` (the default) stores tasks
+in the configured SQL database, ``memory`` keeps them in process memory with
+no I/O at all. With ``DATABASE_SHARDS`` set, the database backend spreads tasks
+over several databases.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, shard_map
+from app.services.backends.base import TaskQueueBackend
+from app.services.backends.database import DatabaseBackend
+from app.services.backends.memory import InMemoryBackend, memory_backend
+from app.services.backends.sharded import ShardedBackend
+
+__all__ = [
+    "DatabaseBackend",
+    "InMemoryBackend",
+    "ShardedBackend",
+    "TaskQueueBackend",
+    "memory_backend",
+    "open_backend",
+]
+
+
+@asynccontextmanager
+async def open_backend() -> AsyncIterator[TaskQueueBackend]:
+    """Open the configured backend for one unit of work."""
+    if settings.QUEUE_BACKEND == "memory":
+        yield memory_backend
+        return
+
+    if shard_map is not None:
+        backend = ShardedBackend(shard_map)
+        try:
+            yield backend
+        finally:
+            await backend.close()
+        return
+
+    async with AsyncSessionLocal() as session:
+        try:
+            yield DatabaseBackend(session)
+        finally:
+            await session.close()
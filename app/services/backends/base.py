@@ -0,0 +1,205 @@
+"""Interface shared by all task queue backends."""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from app.db.models import RecurringTask, Task, TaskQueue, TaskStatus, Worker
+from app.schemas.task import (
+    BulkAction,
+    RecurringTaskCreate,
+    RecurringTaskUpdate,
+    TaskAck,
+    TaskCreate,
+    TaskFilter,
+    TaskUpdate,
+    WorkerCreate,
+)
+
+
+class TaskQueueBackend(ABC):
+    """Storage backend for tasks and workers.
+
+    Mirrors the operations of ``TaskQueueService``, ``RecurringTaskService``
+    and ``WorkerService`` without tying callers to a database session.
+    """
+
+    # Whether reads may lag behind writes, as on a read replica
+    replica = False
+
+    @abstractmethod
+    async def create_task(self, task_in: TaskCreate) -> Optional[Task]:
+        """Create a new task in the queue.
+
+        Returns None if a task it depends on does not exist.
+        """
+
+    @abstractmethod
+    async def get_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Get a task by ID."""
+
+    @abstractmethod
+    async def get_tasks(self, skip: int = 0, limit: int = 100) -> Sequence[Task]:
+        """Get all tasks with pagination."""
+
+    @abstractmethod
+    async def get_tasks_count(self) -> int:
+        """Get the total count of tasks."""
+
+    @abstractmethod
+    async def get_tasks_by_status(
+        self, status: TaskStatus, skip: int = 0, limit: int = 100
+    ) -> Sequence[Task]:
+        """Get all tasks with a specific status."""
+
+    @abstractmethod
+    async def update_task(
+        self, task_id: Union[str, UUID], task_in: TaskUpdate
+    ) -> Optional[Task]:
+        """Update a task by ID."""
+
+    @abstractmethod
+    async def delete_task(self, task_id: Union[str, UUID]) -> bool:
+        """Delete a task by ID."""
+
+    @abstractmethod
+    async def pause_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Pause a task by ID."""
+
+    @abstractmethod
+    async def resume_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Resume a paused task by ID."""
+
+    @abstractmethod
+    async def bulk_action(self, action: BulkAction, task_filter: TaskFilter) -> int:
+        """Apply a transition to every task matching a filter; return the count."""
+
+    @abstractmethod
+    async def claim_tasks(
+        self, worker_id: Union[str, UUID], limit: int = 1
+    ) -> Sequence[Task]:
+        """Claim up to ``limit`` ready tasks for a worker."""
+
+    @abstractmethod
+    async def get_running_task_ids(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> List[str]:
+        """IDs of the given tasks that are still running on the worker."""
+
+    @abstractmethod
+    async def release_tasks(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> Sequence[Task]:
+        """Put tasks a worker claimed but never started back to PENDING."""
+
+    @abstractmethod
+    async def promote_due_tasks(self, limit: int = 1000) -> Sequence[Task]:
+        """Move up to ``limit`` SCHEDULED tasks that are due to PENDING."""
+
+    @abstractmethod
+    async def get_next_due_at(self) -> Optional[datetime]:
+        """Get the earliest ``scheduled_at`` of the SCHEDULED tasks."""
+
+    @abstractmethod
+    async def set_queue_weight(self, queue: str, weight: float) -> TaskQueue:
+        """Set a queue's share of the workers in fair scheduling mode."""
+
+    @abstractmethod
+    async def get_queue_stats(self) -> List[Dict[str, Any]]:
+        """Get per-queue backlog and wait time statistics."""
+
+    @abstractmethod
+    async def get_load_stats(self, group_by: str = "queue") -> List[Dict[str, Any]]:
+        """Get per-queue or per-priority arrivals, backlog and service times."""
+
+    async def get_next_task(self, worker_id: Union[str, UUID]) -> Optional[Task]:
+        """Get the next task to process for a worker."""
+        tasks = await self.claim_tasks(worker_id, limit=1)
+        return tasks[0] if tasks else None
+
+    @abstractmethod
+    async def complete_task(
+        self, task_id: Union[str, UUID], result: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
+        """Mark a task as completed with an optional result."""
+
+    @abstractmethod
+    async def fail_task(self, task_id: Union[str, UUID], error: str) -> Optional[Task]:
+        """Mark a task as failed with an error message."""
+
+    @abstractmethod
+    async def ack_tasks(
+        self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]
+    ) -> Sequence[Task]:
+        """Complete or fail a batch of a worker's running tasks."""
+
+    @abstractmethod
+    async def create_recurring_task(
+        self, recurring_in: RecurringTaskCreate
+    ) -> RecurringTask:
+        """Create a new recurring task and materialize its upcoming runs."""
+
+    @abstractmethod
+    async def get_recurring_task(
+        self, recurring_task_id: Union[str, UUID]
+    ) -> Optional[RecurringTask]:
+        """Get a recurring task by ID."""
+
+    @abstractmethod
+    async def get_recurring_tasks(
+        self, skip: int = 0, limit: int = 100
+    ) -> Sequence[RecurringTask]:
+        """Get all recurring tasks with pagination."""
+
+    @abstractmethod
+    async def get_recurring_tasks_count(self) -> int:
+        """Get the total count of recurring tasks."""
+
+    @abstractmethod
+    async def update_recurring_task(
+        self, recurring_task_id: Union[str, UUID], recurring_in: RecurringTaskUpdate
+    ) -> Optional[RecurringTask]:
+        """Update a recurring task by ID."""
+
+    @abstractmethod
+    async def delete_recurring_task(self, recurring_task_id: Union[str, UUID]) -> bool:
+        """Delete a recurring task and its runs that have not started yet."""
+
+    @abstractmethod
+    async def materialize_recurring_tasks(self, limit: int = 1000) -> int:
+        """Materialize the upcoming runs of up to ``limit`` schedules."""
+
+    @abstractmethod
+    async def get_next_fire_at(self) -> Optional[datetime]:
+        """Get the earliest ``next_fire_at`` of the enabled schedules."""
+
+    @abstractmethod
+    async def create_worker(self, worker_in: WorkerCreate) -> Worker:
+        """Register a new worker."""
+
+    @abstractmethod
+    async def get_worker(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Get a worker by ID."""
+
+    @abstractmethod
+    async def get_workers(self, skip: int = 0, limit: int = 100) -> Sequence[Worker]:
+        """Get all workers with pagination."""
+
+    @abstractmethod
+    async def list_workers(
+        self,
+        after: Optional[Union[str, UUID]] = None,
+        limit: int = 100,
+        with_stats: bool = False,
+    ) -> List[Tuple[Worker, Optional[Dict[str, Any]]]]:
+        """Get a page of workers in ID order, optionally with load statistics."""
+
+    @abstractmethod
+    async def update_heartbeat(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Update a worker's heartbeat timestamp."""
+
+    @abstractmethod
+    async def set_worker_status(
+        self, worker_id: Union[str, UUID], status: str
+    ) -> Optional[Worker]:
+        """Set a worker's status."""
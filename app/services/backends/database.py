@@ -0,0 +1,215 @@
+"""Task queue backend storing tasks in the SQL database."""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import RecurringTask, Task, TaskQueue, TaskStatus, Worker
+from app.schemas.task import (
+    BulkAction,
+    RecurringTaskCreate,
+    RecurringTaskUpdate,
+    TaskAck,
+    TaskCreate,
+    TaskFilter,
+    TaskUpdate,
+    WorkerCreate,
+)
+from app.services.backends.base import TaskQueueBackend
+from app.services.recurring import RecurringTaskService
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+
+class DatabaseBackend(TaskQueueBackend):
+    """Backend delegating to the database services within one session."""
+
+    def __init__(self, db: AsyncSession, replica: bool = False):
+        """Initialize the backend for a database session.
+
+        ``replica`` marks a session on a read replica, whose reads may lag.
+        """
+        self.db = db
+        self.replica = replica
+
+    async def create_task(self, task_in: TaskCreate) -> Optional[Task]:
+        """Create a new task in the queue."""
+        return await TaskQueueService.create_task(self.db, task_in)
+
+    async def get_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Get a task by ID."""
+        return await TaskQueueService.get_task(self.db, task_id)
+
+    async def get_tasks(self, skip: int = 0, limit: int = 100) -> Sequence[Task]:
+        """Get all tasks with pagination."""
+        return await TaskQueueService.get_tasks(self.db, skip=skip, limit=limit)
+
+    async def get_tasks_count(self) -> int:
+        """Get the total count of tasks."""
+        return await TaskQueueService.get_tasks_count(self.db)
+
+    async def get_tasks_by_status(
+        self, status: TaskStatus, skip: int = 0, limit: int = 100
+    ) -> Sequence[Task]:
+        """Get all tasks with a specific status."""
+        return await TaskQueueService.get_tasks_by_status(
+            self.db, status, skip=skip, limit=limit
+        )
+
+    async def update_task(
+        self, task_id: Union[str, UUID], task_in: TaskUpdate
+    ) -> Optional[Task]:
+        """Update a task by ID."""
+        return await TaskQueueService.update_task(self.db, task_id, task_in)
+
+    async def delete_task(self, task_id: Union[str, UUID]) -> bool:
+        """Delete a task by ID."""
+        return await TaskQueueService.delete_task(self.db, task_id)
+
+    async def pause_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Pause a task by ID."""
+        return await TaskQueueService.pause_task(self.db, task_id)
+
+    async def resume_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Resume a paused task by ID."""
+        return await TaskQueueService.resume_task(self.db, task_id)
+
+    async def bulk_action(self, action: BulkAction, task_filter: TaskFilter) -> int:
+        """Apply a transition to every task matching a filter; return the count."""
+        return await TaskQueueService.bulk_action(self.db, action, task_filter)
+
+    async def claim_tasks(
+        self, worker_id: Union[str, UUID], limit: int = 1
+    ) -> Sequence[Task]:
+        """Claim up to ``limit`` ready tasks for a worker."""
+        return await TaskQueueService.claim_tasks(self.db, worker_id, limit=limit)
+
+    async def get_running_task_ids(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> List[str]:
+        """IDs of the given tasks that are still running on the worker."""
+        return await TaskQueueService.get_running_task_ids(self.db, worker_id, task_ids)
+
+    async def release_tasks(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> Sequence[Task]:
+        """Put tasks a worker claimed but never started back to PENDING."""
+        return await TaskQueueService.release_tasks(self.db, worker_id, task_ids)
+
+    async def promote_due_tasks(self, limit: int = 1000) -> Sequence[Task]:
+        """Move up to ``limit`` SCHEDULED tasks that are due to PENDING."""
+        return await TaskQueueService.promote_due_tasks(self.db, limit=limit)
+
+    async def get_next_due_at(self) -> Optional[datetime]:
+        """Get the earliest ``scheduled_at`` of the SCHEDULED tasks."""
+        return await TaskQueueService.get_next_due_at(self.db)
+
+    async def set_queue_weight(self, queue: str, weight: float) -> TaskQueue:
+        """Set a queue's share of the workers in fair scheduling mode."""
+        return await TaskQueueService.set_queue_weight(self.db, queue, weight)
+
+    async def get_queue_stats(self) -> List[Dict[str, Any]]:
+        """Get per-queue backlog and wait time statistics."""
+        return await TaskQueueService.get_queue_stats(self.db)
+
+    async def get_load_stats(self, group_by: str = "queue") -> List[Dict[str, Any]]:
+        """Get per-queue or per-priority arrivals, backlog and service times."""
+        return await TaskQueueService.get_load_stats(self.db, group_by)
+
+    async def complete_task(
+        self, task_id: Union[str, UUID], result: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
+        """Mark a task as completed with an optional result."""
+        return await TaskQueueService.complete_task(self.db, task_id, result=result)
+
+    async def fail_task(self, task_id: Union[str, UUID], error: str) -> Optional[Task]:
+        """Mark a task as failed with an error message."""
+        return await TaskQueueService.fail_task(self.db, task_id, error)
+
+    async def ack_tasks(
+        self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]
+    ) -> Sequence[Task]:
+        """Complete or fail a batch of a worker's running tasks."""
+        return await TaskQueueService.ack_tasks(self.db, worker_id, acks)
+
+    async def create_recurring_task(
+        self, recurring_in: RecurringTaskCreate
+    ) -> RecurringTask:
+        """Create a new recurring task and materialize its upcoming runs."""
+        return await RecurringTaskService.create_recurring_task(self.db, recurring_in)
+
+    async def get_recurring_task(
+        self, recurring_task_id: Union[str, UUID]
+    ) -> Optional[RecurringTask]:
+        """Get a recurring task by ID."""
+        return await RecurringTaskService.get_recurring_task(self.db, recurring_task_id)
+
+    async def get_recurring_tasks(
+        self, skip: int = 0, limit: int = 100
+    ) -> Sequence[RecurringTask]:
+        """Get all recurring tasks with pagination."""
+        return await RecurringTaskService.get_recurring_tasks(
+            self.db, skip=skip, limit=limit
+        )
+
+    async def get_recurring_tasks_count(self) -> int:
+        """Get the total count of recurring tasks."""
+        return await RecurringTaskService.get_recurring_tasks_count(self.db)
+
+    async def update_recurring_task(
+        self, recurring_task_id: Union[str, UUID], recurring_in: RecurringTaskUpdate
+    ) -> Optional[RecurringTask]:
+        """Update a recurring task by ID."""
+        return await RecurringTaskService.update_recurring_task(
+            self.db, recurring_task_id, recurring_in
+        )
+
+    async def delete_recurring_task(self, recurring_task_id: Union[str, UUID]) -> bool:
+        """Delete a recurring task and its runs that have not started yet."""
+        return await RecurringTaskService.delete_recurring_task(
+            self.db, recurring_task_id
+        )
+
+    async def materialize_recurring_tasks(self, limit: int = 1000) -> int:
+        """Materialize the upcoming runs of up to ``limit`` schedules."""
+        return await RecurringTaskService.materialize_recurring_tasks(
+            self.db, limit=limit
+        )
+
+    async def get_next_fire_at(self) -> Optional[datetime]:
+        """Get the earliest ``next_fire_at`` of the enabled schedules."""
+        return await RecurringTaskService.get_next_fire_at(self.db)
+
+    async def create_worker(self, worker_in: WorkerCreate) -> Worker:
+        """Register a new worker."""
+        return await WorkerService.create_worker(self.db, worker_in)
+
+    async def get_worker(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Get a worker by ID."""
+        return await WorkerService.get_worker(self.db, worker_id)
+
+    async def get_workers(self, skip: int = 0, limit: int = 100) -> Sequence[Worker]:
+        """Get all workers with pagination."""
+        return await WorkerService.get_workers(self.db, skip=skip, limit=limit)
+
+    async def list_workers(
+        self,
+        after: Optional[Union[str, UUID]] = None,
+        limit: int = 100,
+        with_stats: bool = False,
+    ) -> List[Tuple[Worker, Optional[Dict[str, Any]]]]:
+        """Get a page of workers in ID order, optionally with load statistics."""
+        return await WorkerService.list_workers(
+            self.db, after=after, limit=limit, with_stats=with_stats
+        )
+
+    async def update_heartbeat(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Update a worker's heartbeat timestamp."""
+        return await WorkerService.update_heartbeat(self.db, worker_id)
+
+    async def set_worker_status(
+        self, worker_id: Union[str, UUID], status: str
+    ) -> Optional[Worker]:
+        """Set a worker's status."""
+        return await WorkerService.set_worker_status(self.db, worker_id, status)
@@ -0,0 +1,858 @@
+"""In-memory task queue backend for tests, local development and benchmarks.
+
+Ready tasks sit in a heap keyed by ``sort_key`` and SCHEDULED tasks in a timer
+heap keyed by ``scheduled_at``; due timers are promoted to PENDING and moved to
+the ready heap by the scheduler, or at the latest when tasks are claimed. Tasks
+are indexed by ID and by status. Heap entries carry the task's version at the
+time they were pushed, so entries made stale by a later change are skipped
+when popped instead of being searched for and removed.
+
+All methods run without awaiting, so each one is atomic with respect to other
+coroutines on the event loop.
+"""
+import heapq
+import itertools
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.models import (
+    RecurringTask,
+    Task,
+    TaskPriority,
+    TaskQueue,
+    TaskStatus,
+    Worker,
+)
+from app.schemas.task import (
+    BulkAction,
+    RecurringTaskCreate,
+    RecurringTaskUpdate,
+    TaskAck,
+    TaskCreate,
+    TaskFilter,
+    TaskUpdate,
+    WorkerCreate,
+)
+from app.services.backends.base import TaskQueueBackend
+from app.services.events import TaskEvent, TaskEventType, broker
+from app.services.ordering import assign_start_tags, compute_sort_key, ready_at_of
+from app.services.partitions import partition_of
+from app.services.recurring import (
+    apply_schedule_fields,
+    build_runs,
+    first_fire_at,
+    plan_runs,
+)
+from app.services.worker import THROUGHPUT_WINDOW, worker_load
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _run_key(task: Task) -> Tuple[str, float]:
+    """Identify a run of a recurring task."""
+    return task.recurring_task_id, _as_utc(task.scheduled_at).timestamp()
+
+
+def _matches(task: Task, task_filter: TaskFilter) -> bool:
+    """Whether a task meets every criterion of a bulk action filter."""
+    checks = [
+        (task_filter.status, lambda value: task.status.value == value.value),
+        (task_filter.name, lambda value: task.name == value),
+        (task_filter.queue, lambda value: task.queue == value),
+        (task_filter.priority, lambda value: task.priority == value.value),
+        (task_filter.created_after, lambda v: _as_utc(task.created_at) >= _as_utc(v)),
+        (task_filter.created_before, lambda v: _as_utc(task.created_at) < _as_utc(v)),
+        (task_filter.updated_after, lambda v: _as_utc(task.updated_at) >= _as_utc(v)),
+        (task_filter.updated_before, lambda v: _as_utc(task.updated_at) < _as_utc(v)),
+    ]
+    return all(check(value) for value, check in checks if value is not None)
+
+
+class InMemoryBackend(TaskQueueBackend):
+    """Task queue backend keeping all state in process memory."""
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self._tasks: Dict[str, Task] = {}
+        # Dicts are used as insertion-ordered sets
+        self._by_status: Dict[TaskStatus, Dict[str, None]] = {
+            status: {} for status in TaskStatus
+        }
+        self._versions: Dict[str, int] = {}
+        self._ready: List[Tuple[float, int, str, int]] = []
+        self._timers: List[Tuple[float, int, str, int]] = []
+        self._workers: Dict[str, Worker] = {}
+        self._queues: Dict[str, TaskQueue] = {}
+        self._recurring: Dict[str, RecurringTask] = {}
+        # Materialized runs of recurring tasks by (recurring_task_id, scheduled_at)
+        self._runs: Dict[Tuple[str, float], str] = {}
+        # Dependency graph edges from each task to the tasks waiting for it
+        self._dependents: Dict[str, List[str]] = {}
+        self._sequence = itertools.count()
+
+    def _set_status(self, task: Task, status: TaskStatus) -> None:
+        """Move a task between status indexes."""
+        self._by_status[task.status].pop(task.id, None)
+        task.status = status
+        self._by_status[status][task.id] = None
+
+    def _enqueue(self, task: Task) -> None:
+        """Invalidate a task's heap entries and push it to the right heap."""
+        version = self._versions.get(task.id, 0) + 1
+        self._versions[task.id] = version
+        if task.status == TaskStatus.PENDING:
+            self._push_ready(task, version)
+        elif task.status == TaskStatus.SCHEDULED and task.scheduled_at:
+            heapq.heappush(
+                self._timers,
+                (
+                    _as_utc(task.scheduled_at).timestamp(),
+                    next(self._sequence),
+                    task.id,
+                    version,
+                ),
+            )
+
+    def _push_ready(self, task: Task, version: int) -> None:
+        """Push a task onto the ready heap in claim order."""
+        heapq.heappush(
+            self._ready, (task.sort_key, next(self._sequence), task.id, version)
+        )
+
+    def _get_queue(self, name: str) -> TaskQueue:
+        """Get a queue's fair scheduling state, creating it if needed."""
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = TaskQueue(name=name, weight=1.0, last_tag=0.0)
+            self._queues[name] = queue
+        return queue
+
+    def _set_sort_key(self, task: Task, now: datetime) -> None:
+        """Give a task its place in the claim order."""
+        start_tag = ready_at_of(task.scheduled_at, now)
+        if settings.SCHEDULING_MODE == "fair":
+            queue = self._get_queue(task.queue)
+            (start_tag,) = assign_start_tags(queue.last_tag, queue.weight, [start_tag])
+            queue.last_tag = (
+                start_tag + settings.FAIR_SHARE_QUANTUM_SECONDS / queue.weight
+            )
+        task.sort_key = compute_sort_key(task.priority, start_tag)
+
+    def _pop_stale_timers(self) -> None:
+        """Drop timer entries of tasks that changed since they were pushed."""
+        while self._timers:
+            task_id, version = self._timers[0][2:]
+            if task_id in self._tasks and self._versions.get(task_id) == version:
+                return
+            heapq.heappop(self._timers)
+
+    def _promote_due(self, now: datetime, limit: Optional[int] = None) -> List[Task]:
+        """Move SCHEDULED tasks whose time has come to PENDING."""
+        cutoff = now.timestamp()
+        promoted: List[Task] = []
+        self._pop_stale_timers()
+        while self._timers and self._timers[0][0] <= cutoff:
+            if limit is not None and len(promoted) >= limit:
+                break
+            task_id = heapq.heappop(self._timers)[2]
+            task = self._tasks[task_id]
+            self._set_status(task, TaskStatus.PENDING)
+            task.updated_at = now
+            self._enqueue(task)
+            promoted.append(task)
+            self._pop_stale_timers()
+
+        self._publish(TaskEventType.PROMOTED, promoted)
+        return promoted
+
+    def _add_task(self, task: Task) -> None:
+        """Index a new task."""
+        self._tasks[task.id] = task
+        self._by_status[task.status][task.id] = None
+        self._enqueue(task)
+        if task.recurring_task_id:
+            self._runs[_run_key(task)] = task.id
+
+    def _publish(self, event: TaskEventType, tasks: Sequence[Task]) -> None:
+        """Publish events for changed tasks."""
+        for task in tasks:
+            broker.publish(TaskEvent.from_task(event, task))
+
+    async def create_task(self, task_in: TaskCreate) -> Optional[Task]:
+        """Create a new task in the queue."""
+        depends_on = {str(task_id) for task_id in task_in.depends_on}
+        if any(task_id not in self._tasks for task_id in depends_on):
+            return None
+
+        now = datetime.now(timezone.utc)
+        scheduled = (
+            task_in.scheduled_at is not None and _as_utc(task_in.scheduled_at) > now
+        )
+        task_id = str(uuid.uuid4())
+        task = Task(
+            id=task_id,
+            name=task_in.name,
+            queue=task_in.queue,
+            payload=task_in.payload,
+            priority=task_in.priority.value,
+            status=TaskStatus.SCHEDULED if scheduled else TaskStatus.PENDING,
+            scheduled_at=task_in.scheduled_at,
+            timeout_seconds=task_in.timeout_seconds,
+            created_at=now,
+            updated_at=now,
+            remaining_dependencies=0,
+            retries=0,
+            # Kept for parity with the database; one heap has no lock contention
+            partition=partition_of(task_id),
+        )
+        self._set_sort_key(task, now)
+        statuses = [self._tasks[task_id].status for task_id in depends_on]
+        if TaskStatus.FAILED in statuses:
+            task.status = TaskStatus.FAILED
+            task.error = "A dependency failed"
+            task.completed_at = now
+        else:
+            task.remaining_dependencies = sum(
+                status != TaskStatus.COMPLETED for status in statuses
+            )
+            if task.remaining_dependencies:
+                task.status = TaskStatus.BLOCKED
+        for task_id in depends_on:
+            self._dependents.setdefault(task_id, []).append(task.id)
+
+        self._add_task(task)
+        self._publish(TaskEventType.CREATED, [task])
+        return task
+
+    async def get_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Get a task by ID."""
+        return self._tasks.get(str(task_id))
+
+    async def get_tasks(self, skip: int = 0, limit: int = 100) -> Sequence[Task]:
+        """Get all tasks with pagination."""
+        return list(itertools.islice(self._tasks.values(), skip, skip + limit))
+
+    async def get_tasks_count(self) -> int:
+        """Get the total count of tasks."""
+        return len(self._tasks)
+
+    async def get_tasks_by_status(
+        self, status: TaskStatus, skip: int = 0, limit: int = 100
+    ) -> Sequence[Task]:
+        """Get all tasks with a specific status."""
+        task_ids = itertools.islice(self._by_status[status], skip, skip + limit)
+        return [self._tasks[task_id] for task_id in task_ids]
+
+    async def update_task(
+        self, task_id: Union[str, UUID], task_in: TaskUpdate
+    ) -> Optional[Task]:
+        """Update a task by ID."""
+        task = self._tasks.get(str(task_id))
+        if not task:
+            return None
+
+        task_data = task_in.model_dump(exclude_unset=True)
+        if task_data.get("priority"):
+            task_data["priority"] = task_data["priority"].value
+        status = task_data.pop("status", None)
+        for field, value in task_data.items():
+            setattr(task, field, value)
+        if status:
+            self._set_status(task, TaskStatus(status.value))
+
+        now = datetime.now(timezone.utc)
+        if {"priority", "queue", "scheduled_at"} & task_data.keys():
+            self._set_sort_key(task, now)
+        task.updated_at = now
+        self._enqueue(task)
+        self._publish(TaskEventType.UPDATED, [task])
+        return task
+
+    async def delete_task(self, task_id: Union[str, UUID]) -> bool:
+        """Delete a task by ID."""
+        task = self._tasks.pop(str(task_id), None)
+        if not task:
+            return False
+
+        self._by_status[task.status].pop(task.id, None)
+        # Any heap entries left behind no longer match a version
+        self._versions.pop(task.id, None)
+        if task.recurring_task_id:
+            self._runs.pop(_run_key(task), None)
+        self._publish(TaskEventType.DELETED, [task])
+        if task.status != TaskStatus.COMPLETED:
+            self._fail_dependents(task, datetime.now(timezone.utc))
+        self._dependents.pop(task.id, None)
+        return True
+
+    async def pause_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Pause a task by ID."""
+        task = self._tasks.get(str(task_id))
+        if not task or task.status not in [
+            TaskStatus.PENDING,
+            TaskStatus.SCHEDULED,
+            TaskStatus.RUNNING,
+        ]:
+            return None
+
+        self._set_status(task, TaskStatus.PAUSED)
+        task.updated_at = datetime.now(timezone.utc)
+        self._enqueue(task)
+        self._publish(TaskEventType.PAUSED, [task])
+        return task
+
+    async def resume_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Resume a paused task by ID."""
+        task = self._tasks.get(str(task_id))
+        if not task or task.status != TaskStatus.PAUSED:
+            return None
+
+        now = datetime.now(timezone.utc)
+        if task.scheduled_at and _as_utc(task.scheduled_at) > now:
+            self._set_status(task, TaskStatus.SCHEDULED)
+        else:
+            self._set_status(task, TaskStatus.PENDING)
+        task.updated_at = now
+        self._enqueue(task)
+        self._publish(TaskEventType.RESUMED, [task])
+        return task
+
+    async def bulk_action(self, action: BulkAction, task_filter: TaskFilter) -> int:
+        """Apply a transition to every task matching a filter; return the count."""
+        matching = [
+            task for task in self._tasks.values() if _matches(task, task_filter)
+        ]
+        affected = 0
+        for task in matching:
+            if action == BulkAction.PAUSE:
+                done = await self.pause_task(task.id) is not None
+            elif action == BulkAction.RESUME:
+                done = await self.resume_task(task.id) is not None
+            elif action == BulkAction.DELETE:
+                done = await self.delete_task(task.id)
+            else:
+                done = self._requeue_failed(task)
+            affected += done
+        return affected
+
+    def _requeue_failed(self, task: Task) -> bool:
+        """Put a FAILED task back in the queue, keeping its place."""
+        if task.status != TaskStatus.FAILED:
+            return False
+        self._set_status(task, TaskStatus.PENDING)
+        task.worker_id = None
+        task.started_at = None
+        task.completed_at = None
+        task.result = None
+        task.error = None
+        task.updated_at = datetime.now(timezone.utc)
+        self._enqueue(task)
+        self._publish(TaskEventType.REQUEUED, [task])
+        return True
+
+    async def get_running_task_ids(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> List[str]:
+        """IDs of the given tasks that are still running on the worker."""
+        running = []
+        for task_id in task_ids:
+            task = self._tasks.get(str(task_id))
+            if (
+                task
+                and task.status == TaskStatus.RUNNING
+                and task.worker_id == str(worker_id)
+            ):
+                running.append(task.id)
+        return running
+
+    async def release_tasks(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> Sequence[Task]:
+        """Put tasks a worker claimed but never started back to PENDING."""
+        now = datetime.now(timezone.utc)
+        released: List[Task] = []
+        for task_id in task_ids:
+            task = self._tasks.get(str(task_id))
+            if (
+                not task
+                or task.status != TaskStatus.RUNNING
+                or task.worker_id != str(worker_id)
+            ):
+                continue
+            self._set_status(task, TaskStatus.PENDING)
+            task.started_at = None
+            task.worker_id = None
+            task.updated_at = now
+            # The unchanged sort_key puts it back where it was
+            self._enqueue(task)
+            released.append(task)
+
+        self._publish(TaskEventType.REQUEUED, released)
+        return released
+
+    async def promote_due_tasks(self, limit: int = 1000) -> Sequence[Task]:
+        """Move up to ``limit`` SCHEDULED tasks that are due to PENDING."""
+        return self._promote_due(datetime.now(timezone.utc), limit=limit)
+
+    async def get_next_due_at(self) -> Optional[datetime]:
+        """Get the earliest ``scheduled_at`` of the SCHEDULED tasks."""
+        self._pop_stale_timers()
+        if not self._timers:
+            return None
+        return datetime.fromtimestamp(self._timers[0][0], timezone.utc)
+
+    async def set_queue_weight(self, queue: str, weight: float) -> TaskQueue:
+        """Set a queue's share of the workers in fair scheduling mode."""
+        task_queue = self._get_queue(queue)
+        task_queue.weight = weight
+        return task_queue
+
+    async def get_queue_stats(self) -> List[Dict[str, Any]]:
+        """Get per-queue backlog and wait time statistics."""
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(seconds=settings.QUEUE_STATS_WINDOW_SECONDS)
+        stats: Dict[str, Dict[str, Any]] = {}
+        waits: Dict[str, List[float]] = {}
+
+        def queue_stats(queue: str) -> Dict[str, Any]:
+            return stats.setdefault(
+                queue,
+                {
+                    "queue": queue,
+                    "weight": 1.0,
+                    "pending": 0,
+                    "running": 0,
+                    "oldest_pending_wait_seconds": None,
+                    "started_recently": 0,
+                    "avg_wait_seconds": None,
+                    "max_wait_seconds": None,
+                },
+            )
+
+        for task in self._tasks.values():
+            ready_at = ready_at_of(task.scheduled_at, task.created_at)
+            if task.status == TaskStatus.PENDING:
+                entry = queue_stats(task.queue)
+                entry["pending"] += 1
+                waited = max(now.timestamp() - ready_at, 0.0)
+                oldest = entry["oldest_pending_wait_seconds"]
+                entry["oldest_pending_wait_seconds"] = max(oldest or 0.0, waited)
+            elif task.status == TaskStatus.RUNNING:
+                queue_stats(task.queue)["running"] += 1
+            if task.started_at and _as_utc(task.started_at) >= window_start:
+                queue_stats(task.queue)
+                waits.setdefault(task.queue, []).append(
+                    _as_utc(task.started_at).timestamp() - ready_at
+                )
+
+        for queue, queue_waits in waits.items():
+            stats[queue]["started_recently"] = len(queue_waits)
+            stats[queue]["avg_wait_seconds"] = sum(queue_waits) / len(queue_waits)
+            stats[queue]["max_wait_seconds"] = max(queue_waits)
+        for task_queue in self._queues.values():
+            queue_stats(task_queue.name)["weight"] = task_queue.weight
+        return [stats[queue] for queue in sorted(stats)]
+
+    async def get_load_stats(self, group_by: str = "queue") -> List[Dict[str, Any]]:
+        """Get per-queue or per-priority arrivals, backlog and service times."""
+        now = datetime.now(timezone.utc).timestamp()
+        window_start = now - settings.QUEUE_STATS_WINDOW_SECONDS
+        stats: Dict[str, Dict[str, Any]] = {}
+        service_times: Dict[str, List[float]] = {}
+
+        for task in self._tasks.values():
+            key = task.priority if group_by == "priority" else task.queue
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = {
+                    "group": key,
+                    "pending": 0,
+                    "running": 0,
+                    "oldest_pending_wait_seconds": None,
+                    "arrivals": 0,
+                    "finished": 0,
+                    "avg_service_seconds": None,
+                }
+            ready_at = ready_at_of(task.scheduled_at, task.created_at)
+            if window_start <= ready_at <= now:
+                entry["arrivals"] += 1
+            if task.status == TaskStatus.PENDING:
+                entry["pending"] += 1
+                waited = max(now - ready_at, 0.0)
+                oldest = entry["oldest_pending_wait_seconds"]
+                entry["oldest_pending_wait_seconds"] = max(oldest or 0.0, waited)
+            elif task.status == TaskStatus.RUNNING:
+                entry["running"] += 1
+            elif (
+                task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+                and task.started_at
+                and task.completed_at
+                and _as_utc(task.completed_at).timestamp() >= window_start
+            ):
+                service_times.setdefault(key, []).append(
+                    (
+                        _as_utc(task.completed_at) - _as_utc(task.started_at)
+                    ).total_seconds()
+                )
+
+        for key, times in service_times.items():
+            stats[key]["finished"] = len(times)
+            stats[key]["avg_service_seconds"] = sum(times) / len(times)
+        return [
+            entry
+            for key, entry in sorted(stats.items())
+            if entry["pending"]
+            or entry["running"]
+            or entry["arrivals"]
+            or entry["finished"]
+        ]
+
+    async def claim_tasks(
+        self, worker_id: Union[str, UUID], limit: int = 1
+    ) -> Sequence[Task]:
+        """Claim up to ``limit`` PENDING tasks for a worker."""
+        now = datetime.now(timezone.utc)
+        # There may be no scheduler running next to an in-memory queue
+        self._promote_due(now)
+
+        claimed: List[Task] = []
+        while self._ready and len(claimed) < limit:
+            *_, task_id, version = heapq.heappop(self._ready)
+            task = self._tasks.get(task_id)
+            if task is None or self._versions.get(task_id) != version:
+                continue
+            self._set_status(task, TaskStatus.RUNNING)
+            task.started_at = now
+            task.worker_id = str(worker_id)
+            task.updated_at = now
+            self._versions[task_id] = version + 1
+            claimed.append(task)
+
+        self._publish(TaskEventType.CLAIMED, claimed)
+        return claimed
+
+    def _finish(
+        self,
+        task: Task,
+        success: bool,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Move a running task to its final state."""
+        now = datetime.now(timezone.utc)
+        task.completed_at = now
+        task.updated_at = now
+        if success:
+            self._set_status(task, TaskStatus.COMPLETED)
+            task.result = result
+            self._publish(TaskEventType.COMPLETED, [task])
+            self._release_dependents(task, now)
+        else:
+            self._set_status(task, TaskStatus.FAILED)
+            task.error = error
+            self._publish(TaskEventType.FAILED, [task])
+            self._fail_dependents(task, now)
+
+    def _requeue(self, task: Task, retry_in: float, error: Optional[str]) -> None:
+        """Put a failed task back in the queue to run again after ``retry_in``."""
+        now = datetime.now(timezone.utc)
+        self._set_status(task, TaskStatus.SCHEDULED if retry_in else TaskStatus.PENDING)
+        task.scheduled_at = now + timedelta(seconds=retry_in)
+        task.started_at = None
+        task.worker_id = None
+        task.updated_at = now
+        task.error = error
+        task.retries += 1
+        self._enqueue(task)
+        self._publish(TaskEventType.REQUEUED, [task])
+
+    def _release_dependents(self, task: Task, now: datetime) -> None:
+        """Count a completed task off its dependents' remaining dependencies."""
+        released = []
+        for dependent_id in self._dependents.get(task.id, []):
+            dependent = self._tasks.get(dependent_id)
+            if dependent is None or dependent.status != TaskStatus.BLOCKED:
+                continue
+            dependent.remaining_dependencies -= 1
+            if dependent.remaining_dependencies > 0:
+                continue
+            if dependent.scheduled_at and _as_utc(dependent.scheduled_at) > now:
+                self._set_status(dependent, TaskStatus.SCHEDULED)
+            else:
+                self._set_status(dependent, TaskStatus.PENDING)
+            dependent.updated_at = now
+            self._enqueue(dependent)
+            released.append(dependent)
+        self._publish(TaskEventType.RELEASED, released)
+
+    def _fail_dependents(self, task: Task, now: datetime) -> None:
+        """Fail the BLOCKED tasks depending on a failed task, transitively."""
+        failed = []
+        frontier = [task.id]
+        while frontier:
+            task_id = frontier.pop()
+            for dependent_id in self._dependents.get(task_id, []):
+                dependent = self._tasks.get(dependent_id)
+                if dependent is None or dependent.status != TaskStatus.BLOCKED:
+                    continue
+                self._set_status(dependent, TaskStatus.FAILED)
+                dependent.error = "A dependency failed"
+                dependent.completed_at = now
+                dependent.updated_at = now
+                failed.append(dependent)
+                frontier.append(dependent_id)
+        self._publish(TaskEventType.FAILED, failed)
+
+    async def complete_task(
+        self, task_id: Union[str, UUID], result: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
+        """Mark a task as completed with an optional result."""
+        task = self._tasks.get(str(task_id))
+        if not task or task.status != TaskStatus.RUNNING:
+            return None
+
+        self._finish(task, success=True, result=result)
+        return task
+
+    async def fail_task(self, task_id: Union[str, UUID], error: str) -> Optional[Task]:
+        """Mark a task as failed with an error message."""
+        task = self._tasks.get(str(task_id))
+        if not task or task.status != TaskStatus.RUNNING:
+            return None
+
+        self._finish(task, success=False, error=error)
+        return task
+
+    async def ack_tasks(
+        self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]
+    ) -> Sequence[Task]:
+        """Complete or fail a batch of a worker's running tasks."""
+        acked = []
+        for ack in acks:
+            task = self._tasks.get(str(ack.task_id))
+            if (
+                not task
+                or task.status != TaskStatus.RUNNING
+                or task.worker_id != str(worker_id)
+            ):
+                continue
+            if not ack.success and ack.retry_in is not None:
+                self._requeue(task, ack.retry_in, ack.error)
+            else:
+                self._finish(task, ack.success, result=ack.result, error=ack.error)
+            acked.append(task)
+        return acked
+
+    def _materialize(
+        self, recurring_tasks: Sequence[RecurringTask], now: datetime
+    ) -> List[Task]:
+        """Add the upcoming runs of schedules and move them on."""
+        created: List[Task] = []
+        for recurring_task in recurring_tasks:
+            fire_times, next_fire_at = plan_runs(recurring_task, now)
+            for row in build_runs(recurring_task, fire_times, now):
+                task = Task(**row)
+                if _run_key(task) in self._runs:
+                    continue
+                self._set_sort_key(task, now)
+                self._add_task(task)
+                created.append(task)
+            recurring_task.next_fire_at = next_fire_at
+            if fire_times:
+                recurring_task.last_fire_at = fire_times[-1]
+
+        self._publish(TaskEventType.CREATED, created)
+        return created
+
+    def _delete_scheduled_runs(self, recurring_task_id: str) -> None:
+        """Delete the runs of a schedule that are still SCHEDULED."""
+        for task_id in list(self._by_status[TaskStatus.SCHEDULED]):
+            task = self._tasks[task_id]
+            if task.recurring_task_id == recurring_task_id:
+                self._tasks.pop(task_id)
+                self._by_status[TaskStatus.SCHEDULED].pop(task_id)
+                self._versions.pop(task_id, None)
+                self._runs.pop(_run_key(task), None)
+
+    async def create_recurring_task(
+        self, recurring_in: RecurringTaskCreate
+    ) -> RecurringTask:
+        """Create a new recurring task and materialize its upcoming runs."""
+        now = datetime.now(timezone.utc)
+        recurring_task = RecurringTask(
+            id=str(uuid.uuid4()),
+            queue="default",
+            priority=TaskPriority.MEDIUM.name,
+            created_at=now,
+            updated_at=now,
+        )
+        apply_schedule_fields(recurring_task, recurring_in)
+        recurring_task.next_fire_at = first_fire_at(
+            recurring_task, recurring_in.start_at
+        )
+        self._recurring[recurring_task.id] = recurring_task
+        self._materialize([recurring_task], now)
+        return recurring_task
+
+    async def get_recurring_task(
+        self, recurring_task_id: Union[str, UUID]
+    ) -> Optional[RecurringTask]:
+        """Get a recurring task by ID."""
+        return self._recurring.get(str(recurring_task_id))
+
+    async def get_recurring_tasks(
+        self, skip: int = 0, limit: int = 100
+    ) -> Sequence[RecurringTask]:
+        """Get all recurring tasks with pagination."""
+        return list(itertools.islice(self._recurring.values(), skip, skip + limit))
+
+    async def get_recurring_tasks_count(self) -> int:
+        """Get the total count of recurring tasks."""
+        return len(self._recurring)
+
+    async def update_recurring_task(
+        self, recurring_task_id: Union[str, UUID], recurring_in: RecurringTaskUpdate
+    ) -> Optional[RecurringTask]:
+        """Update a recurring task by ID."""
+        recurring_task = self._recurring.get(str(recurring_task_id))
+        if not recurring_task:
+            return None
+
+        now = datetime.now(timezone.utc)
+        if apply_schedule_fields(recurring_task, recurring_in):
+            self._delete_scheduled_runs(recurring_task.id)
+            recurring_task.next_fire_at = first_fire_at(recurring_task, now)
+        recurring_task.updated_at = now
+        if recurring_task.enabled:
+            self._materialize([recurring_task], now)
+        return recurring_task
+
+    async def delete_recurring_task(self, recurring_task_id: Union[str, UUID]) -> bool:
+        """Delete a recurring task and its runs that have not started yet."""
+        recurring_task = self._recurring.pop(str(recurring_task_id), None)
+        if not recurring_task:
+            return False
+
+        self._delete_scheduled_runs(recurring_task.id)
+        for task in self._tasks.values():
+            if task.recurring_task_id == recurring_task.id:
+                self._runs.pop(_run_key(task), None)
+                task.recurring_task_id = None
+        return True
+
+    async def materialize_recurring_tasks(self, limit: int = 1000) -> int:
+        """Materialize the upcoming runs of up to ``limit`` schedules."""
+        now = datetime.now(timezone.utc)
+        horizon = now + timedelta(seconds=settings.RECURRING_LOOKAHEAD_SECONDS)
+        due = heapq.nsmallest(
+            limit,
+            (
+                recurring_task
+                for recurring_task in self._recurring.values()
+                if recurring_task.enabled
+                and _as_utc(recurring_task.next_fire_at) <= horizon
+            ),
+            key=lambda recurring_task: _as_utc(recurring_task.next_fire_at),
+        )
+        self._materialize(due, now)
+        return len(due)
+
+    async def get_next_fire_at(self) -> Optional[datetime]:
+        """Get the earliest ``next_fire_at`` of the enabled schedules."""
+        return min(
+            (
+                _as_utc(recurring_task.next_fire_at)
+                for recurring_task in self._recurring.values()
+                if recurring_task.enabled
+            ),
+            default=None,
+        )
+
+    async def create_worker(self, worker_in: WorkerCreate) -> Worker:
+        """Register a new worker."""
+        now = datetime.now(timezone.utc)
+        worker = Worker(
+            id=str(uuid.uuid4()),
+            name=worker_in.name,
+            status=worker_in.status,
+            last_heartbeat=now,
+            created_at=now,
+            updated_at=now,
+        )
+        self._workers[worker.id] = worker
+        return worker
+
+    async def get_worker(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Get a worker by ID."""
+        return self._workers.get(str(worker_id))
+
+    async def get_workers(self, skip: int = 0, limit: int = 100) -> Sequence[Worker]:
+        """Get all workers with pagination."""
+        return list(itertools.islice(self._workers.values(), skip, skip + limit))
+
+    async def list_workers(
+        self,
+        after: Optional[Union[str, UUID]] = None,
+        limit: int = 100,
+        with_stats: bool = False,
+    ) -> List[Tuple[Worker, Optional[Dict[str, Any]]]]:
+        """Get a page of workers in ID order, optionally with load statistics."""
+        workers = sorted(
+            (
+                worker
+                for worker in self._workers.values()
+                if after is None or worker.id > str(after)
+            ),
+            key=lambda worker: worker.id,
+        )[:limit]
+        if not with_stats:
+            return [(worker, None) for worker in workers]
+
+        now = datetime.now(timezone.utc)
+        cutoff = now - THROUGHPUT_WINDOW
+        running = Counter(
+            self._tasks[task_id].worker_id
+            for task_id in self._by_status[TaskStatus.RUNNING]
+        )
+        completed = Counter(
+            task.worker_id
+            for task in map(self._tasks.get, self._by_status[TaskStatus.COMPLETED])
+            if task.completed_at and _as_utc(task.completed_at) >= cutoff
+        )
+        return [
+            (worker, worker_load(worker, running[worker.id], completed[worker.id], now))
+            for worker in workers
+        ]
+
+    async def update_heartbeat(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Update a worker's heartbeat timestamp."""
+        worker = self._workers.get(str(worker_id))
+        if not worker:
+            return None
+
+        now = datetime.now(timezone.utc)
+        worker.last_heartbeat = now
+        worker.updated_at = now
+        return worker
+
+    async def set_worker_status(
+        self, worker_id: Union[str, UUID], status: str
+    ) -> Optional[Worker]:
+        """Set a worker's status."""
+        worker = self._workers.get(str(worker_id))
+        if not worker:
+            return None
+
+        worker.status = status
+        worker.updated_at = datetime.now(timezone.utc)
+        return worker
+
+
+memory_backend = InMemoryBackend()
@@ -0,0 +1,484 @@
+"""Task queue backend spreading tasks over several databases.
+
+Each shard is an ordinary database driven by a ``DatabaseBackend``; this
+backend only decides which shards an operation touches:
+
+- New tasks go to the shard owning their ID (or their queue with
+  ``SHARD_KEY=queue``) on the hash ring. The ID is drawn until it hashes to
+  that shard, so lookups by ID always start on the right shard. A task with
+  dependencies goes to the shard of its first dependency, since the fan-in
+  counters are maintained within one database; dependencies on other shards
+  count as unknown.
+- Operations on one task go to the shard owning its ID and fall back to the
+  other shards, which finds runs of recurring tasks (stored with their
+  schedule) and tasks created before a shard was added.
+- Lists, counts and statistics are gathered from all shards concurrently.
+- Claims visit the shards round-robin, starting at a different shard each
+  time, until the batch is full.
+- Workers are registered in every shard, since tasks reference them.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import RecurringTask, Task, TaskQueue, TaskStatus, Worker
+from app.db.sharding import ShardMap
+from app.schemas.task import (
+    BulkAction,
+    RecurringTaskCreate,
+    RecurringTaskUpdate,
+    TaskAck,
+    TaskCreate,
+    TaskFilter,
+    TaskUpdate,
+    WorkerCreate,
+)
+from app.services.backends.base import TaskQueueBackend
+from app.services.backends.database import DatabaseBackend
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (as returned by SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _created_order(row: Any) -> tuple:
+    """Sort key merging rows gathered from several shards."""
+    return (_as_utc(row.created_at), str(row.id))
+
+
+def _earliest(values: Sequence[Optional[datetime]]) -> Optional[datetime]:
+    """Earliest of the given timestamps, ignoring missing ones."""
+    present = [_as_utc(value) for value in values if value is not None]
+    return min(present) if present else None
+
+
+def merge_queue_stats(
+    per_shard: Sequence[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Combine the per-queue statistics of several shards."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for shard_stats in per_shard:
+        for entry in shard_stats:
+            total = merged.get(entry["queue"])
+            if total is None:
+                merged[entry["queue"]] = dict(entry)
+                continue
+            started = total["started_recently"] + entry["started_recently"]
+            if started:
+                total["avg_wait_seconds"] = (
+                    (total["avg_wait_seconds"] or 0.0) * total["started_recently"]
+                    + (entry["avg_wait_seconds"] or 0.0) * entry["started_recently"]
+                ) / started
+            total["started_recently"] = started
+            total["pending"] += entry["pending"]
+            total["running"] += entry["running"]
+            for key in ("oldest_pending_wait_seconds", "max_wait_seconds"):
+                values = [v for v in (total[key], entry[key]) if v is not None]
+                total[key] = max(values) if values else None
+    return sorted(merged.values(), key=lambda entry: entry["queue"])
+
+
+def merge_load_stats(per_shard: Sequence[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Combine the per-group load statistics of several shards."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for shard_stats in per_shard:
+        for entry in shard_stats:
+            total = merged.get(entry["group"])
+            if total is None:
+                merged[entry["group"]] = dict(entry)
+                continue
+            finished = total["finished"] + entry["finished"]
+            if finished:
+                total["avg_service_seconds"] = (
+                    (total["avg_service_seconds"] or 0.0) * total["finished"]
+                    + (entry["avg_service_seconds"] or 0.0) * entry["finished"]
+                ) / finished
+            total["finished"] = finished
+            for key in ("pending", "running", "arrivals"):
+                total[key] += entry[key]
+            values = [
+                value
+                for value in (
+                    total["oldest_pending_wait_seconds"],
+                    entry["oldest_pending_wait_seconds"],
+                )
+                if value is not None
+            ]
+            total["oldest_pending_wait_seconds"] = max(values) if values else None
+    return sorted(merged.values(), key=lambda entry: entry["group"])
+
+
+class ShardedBackend(TaskQueueBackend):
+    """Backend routing operations to the shards of a ``ShardMap``."""
+
+    def __init__(self, shard_map: ShardMap):
+        """Initialize the backend; shard sessions are opened on first use."""
+        self.shard_map = shard_map
+        self._sessions: Dict[int, AsyncSession] = {}
+
+    def shard(self, index: int) -> DatabaseBackend:
+        """Backend of one shard."""
+        session = self._sessions.get(index)
+        if session is None:
+            session = self.shard_map.session_factories[index]()
+            self._sessions[index] = session
+        return DatabaseBackend(session)
+
+    async def close(self) -> None:
+        """Close the sessions opened on the shards."""
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+    async def _gather(self, operation: Callable[[DatabaseBackend], Awaitable]) -> list:
+        """Run an operation on every shard concurrently."""
+        return await asyncio.gather(
+            *(operation(self.shard(index)) for index in range(len(self.shard_map)))
+        )
+
+    def _lookup_order(self, key: Union[str, UUID]) -> List[int]:
+        """Shards to look for a key in, starting with the one owning it."""
+        owner = self.shard_map.shard_for(key)
+        return [owner] + [i for i in range(len(self.shard_map)) if i != owner]
+
+    async def _routed(
+        self, key: Union[str, UUID], operation: Callable[[DatabaseBackend], Awaitable]
+    ) -> Any:
+        """Run an operation on the shard owning a key, falling back to the rest.
+
+        Returns the first truthy result, or the owner's result if none is.
+        """
+        first = None
+        for position, index in enumerate(self._lookup_order(key)):
+            result = await operation(self.shard(index))
+            if result:
+                return result
+            if position == 0:
+                first = result
+        return first
+
+    async def _locate_task(self, task_id: Union[str, UUID]) -> Optional[int]:
+        """Index of the shard storing a task, if it exists."""
+        for index in self._lookup_order(task_id):
+            if await self.shard(index).get_task(task_id):
+                return index
+        return None
+
+    def _id_for_shard(self, index: int) -> str:
+        """Draw a task ID that the ring maps to a given shard."""
+        while True:
+            task_id = str(uuid.uuid4())
+            if self.shard_map.shard_for(task_id) == index:
+                return task_id
+
+    async def create_task(self, task_in: TaskCreate) -> Optional[Task]:
+        """Create a new task on the shard it is routed to."""
+        if task_in.depends_on:
+            index = await self._locate_task(task_in.depends_on[0])
+            if index is None:
+                return None
+            task_id = self._id_for_shard(index)
+        elif settings.SHARD_KEY == "queue":
+            index = self.shard_map.shard_for(task_in.queue)
+            task_id = self._id_for_shard(index)
+        else:
+            task_id = str(uuid.uuid4())
+            index = self.shard_map.shard_for(task_id)
+        return await TaskQueueService.create_task(
+            self.shard(index).db, task_in, task_id=task_id
+        )
+
+    async def get_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Get a task by ID."""
+        return await self._routed(task_id, lambda shard: shard.get_task(task_id))
+
+    async def get_tasks(self, skip: int = 0, limit: int = 100) -> Sequence[Task]:
+        """Get all tasks with pagination, gathered from every shard."""
+        results = await self._gather(
+            lambda shard: shard.get_tasks(skip=0, limit=skip + limit)
+        )
+        tasks = sorted((t for ts in results for t in ts), key=_created_order)
+        return tasks[skip : skip + limit]
+
+    async def get_tasks_count(self) -> int:
+        """Get the total count of tasks over all shards."""
+        return sum(await self._gather(lambda shard: shard.get_tasks_count()))
+
+    async def get_tasks_by_status(
+        self, status: TaskStatus, skip: int = 0, limit: int = 100
+    ) -> Sequence[Task]:
+        """Get all tasks with a specific status, gathered from every shard."""
+        results = await self._gather(
+            lambda shard: shard.get_tasks_by_status(status, skip=0, limit=skip + limit)
+        )
+        tasks = sorted((t for ts in results for t in ts), key=_created_order)
+        return tasks[skip : skip + limit]
+
+    async def update_task(
+        self, task_id: Union[str, UUID], task_in: TaskUpdate
+    ) -> Optional[Task]:
+        """Update a task by ID."""
+        return await self._routed(
+            task_id, lambda shard: shard.update_task(task_id, task_in)
+        )
+
+    async def delete_task(self, task_id: Union[str, UUID]) -> bool:
+        """Delete a task by ID."""
+        return bool(
+            await self._routed(task_id, lambda shard: shard.delete_task(task_id))
+        )
+
+    async def pause_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Pause a task by ID."""
+        return await self._routed(task_id, lambda shard: shard.pause_task(task_id))
+
+    async def resume_task(self, task_id: Union[str, UUID]) -> Optional[Task]:
+        """Resume a paused task by ID."""
+        return await self._routed(task_id, lambda shard: shard.resume_task(task_id))
+
+    async def bulk_action(self, action: BulkAction, task_filter: TaskFilter) -> int:
+        """Apply a transition to every matching task on every shard."""
+        counts = await self._gather(
+            lambda shard: shard.bulk_action(action, task_filter)
+        )
+        return sum(counts)
+
+    async def claim_tasks(
+        self, worker_id: Union[str, UUID], limit: int = 1
+    ) -> Sequence[Task]:
+        """Claim up to ``limit`` ready tasks, visiting the shards round-robin."""
+        tasks: List[Task] = []
+        for index in self.shard_map.claim_order():
+            tasks.extend(
+                await self.shard(index).claim_tasks(worker_id, limit=limit - len(tasks))
+            )
+            if len(tasks) >= limit:
+                break
+        return tasks
+
+    async def get_running_task_ids(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> List[str]:
+        """IDs of the given tasks that are still running on the worker."""
+        results = await self._gather(
+            lambda shard: shard.get_running_task_ids(worker_id, task_ids)
+        )
+        return [task_id for task_ids in results for task_id in task_ids]
+
+    async def release_tasks(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> Sequence[Task]:
+        """Put tasks a worker claimed but never started back to PENDING.
+
+        Each shard releases whichever of the tasks it holds in one statement.
+        """
+        results = await self._gather(
+            lambda shard: shard.release_tasks(worker_id, task_ids)
+        )
+        return [task for tasks in results for task in tasks]
+
+    async def promote_due_tasks(self, limit: int = 1000) -> Sequence[Task]:
+        """Move up to ``limit`` due SCHEDULED tasks per shard to PENDING."""
+        results = await self._gather(lambda shard: shard.promote_due_tasks(limit))
+        return [task for tasks in results for task in tasks]
+
+    async def get_next_due_at(self) -> Optional[datetime]:
+        """Get the earliest ``scheduled_at`` of the SCHEDULED tasks."""
+        return _earliest(await self._gather(lambda shard: shard.get_next_due_at()))
+
+    async def set_queue_weight(self, queue: str, weight: float) -> TaskQueue:
+        """Set a queue's share of the workers on every shard."""
+        results = await self._gather(
+            lambda shard: shard.set_queue_weight(queue, weight)
+        )
+        return results[0]
+
+    async def get_queue_stats(self) -> List[Dict[str, Any]]:
+        """Get per-queue backlog and wait time statistics over all shards."""
+        return merge_queue_stats(
+            await self._gather(lambda shard: shard.get_queue_stats())
+        )
+
+    async def get_load_stats(self, group_by: str = "queue") -> List[Dict[str, Any]]:
+        """Get per-group arrivals, backlog and service times over all shards."""
+        return merge_load_stats(
+            await self._gather(lambda shard: shard.get_load_stats(group_by))
+        )
+
+    async def complete_task(
+        self, task_id: Union[str, UUID], result: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
+        """Mark a task as completed with an optional result."""
+        return await self._routed(
+            task_id, lambda shard: shard.complete_task(task_id, result=result)
+        )
+
+    async def fail_task(self, task_id: Union[str, UUID], error: str) -> Optional[Task]:
+        """Mark a task as failed with an error message."""
+        return await self._routed(
+            task_id, lambda shard: shard.fail_task(task_id, error)
+        )
+
+    async def ack_tasks(
+        self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]
+    ) -> Sequence[Task]:
+        """Complete or fail a batch of a worker's running tasks.
+
+        Acknowledgements are sent to the shards owning their tasks in one
+        batch per shard; those that match nothing there are tried on the
+        other shards.
+        """
+        acked: List[Task] = []
+        remaining = list(acks)
+        for attempt in range(len(self.shard_map)):
+            by_shard: Dict[int, List[TaskAck]] = {}
+            for ack in remaining:
+                order = self._lookup_order(ack.task_id)
+                by_shard.setdefault(order[attempt], []).append(ack)
+            for index, shard_acks in by_shard.items():
+                acked.extend(await self.shard(index).ack_tasks(worker_id, shard_acks))
+            done = {str(task.id) for task in acked}
+            remaining = [ack for ack in remaining if str(ack.task_id) not in done]
+            if not remaining:
+                break
+        return acked
+
+    async def create_recurring_task(
+        self, recurring_in: RecurringTaskCreate
+    ) -> RecurringTask:
+        """Create a recurring task on the shard owning its queue.
+
+        Its runs are materialized on the same shard.
+        """
+        index = self.shard_map.shard_for(recurring_in.queue)
+        return await self.shard(index).create_recurring_task(recurring_in)
+
+    async def get_recurring_task(
+        self, recurring_task_id: Union[str, UUID]
+    ) -> Optional[RecurringTask]:
+        """Get a recurring task by ID."""
+        return await self._routed(
+            recurring_task_id,
+            lambda shard: shard.get_recurring_task(recurring_task_id),
+        )
+
+    async def get_recurring_tasks(
+        self, skip: int = 0, limit: int = 100
+    ) -> Sequence[RecurringTask]:
+        """Get all recurring tasks with pagination, gathered from every shard."""
+        results = await self._gather(
+            lambda shard: shard.get_recurring_tasks(skip=0, limit=skip + limit)
+        )
+        recurring_tasks = sorted((r for rs in results for r in rs), key=_created_order)
+        return recurring_tasks[skip : skip + limit]
+
+    async def get_recurring_tasks_count(self) -> int:
+        """Get the total count of recurring tasks over all shards."""
+        return sum(await self._gather(lambda shard: shard.get_recurring_tasks_count()))
+
+    async def update_recurring_task(
+        self, recurring_task_id: Union[str, UUID], recurring_in: RecurringTaskUpdate
+    ) -> Optional[RecurringTask]:
+        """Update a recurring task by ID."""
+        return await self._routed(
+            recurring_task_id,
+            lambda shard: shard.update_recurring_task(recurring_task_id, recurring_in),
+        )
+
+    async def delete_recurring_task(self, recurring_task_id: Union[str, UUID]) -> bool:
+        """Delete a recurring task and its runs that have not started yet."""
+        return bool(
+            await self._routed(
+                recurring_task_id,
+                lambda shard: shard.delete_recurring_task(recurring_task_id),
+            )
+        )
+
+    async def materialize_recurring_tasks(self, limit: int = 1000) -> int:
+        """Materialize the upcoming runs of up to ``limit`` schedules per shard."""
+        return sum(
+            await self._gather(lambda shard: shard.materialize_recurring_tasks(limit))
+        )
+
+    async def get_next_fire_at(self) -> Optional[datetime]:
+        """Get the earliest ``next_fire_at`` of the enabled schedules."""
+        return _earliest(await self._gather(lambda shard: shard.get_next_fire_at()))
+
+    async def create_worker(self, worker_in: WorkerCreate) -> Worker:
+        """Register a new worker in every shard under the same ID."""
+        worker = await self.shard(0).create_worker(worker_in)
+        for index in range(1, len(self.shard_map)):
+            await WorkerService.create_worker(
+                self.shard(index).db, worker_in, worker_id=worker.id
+            )
+        return worker
+
+    async def get_worker(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Get a worker by ID."""
+        return await self.shard(0).get_worker(worker_id)
+
+    async def get_workers(self, skip: int = 0, limit: int = 100) -> Sequence[Worker]:
+        """Get all workers with pagination."""
+        return await self.shard(0).get_workers(skip=skip, limit=limit)
+
+    async def list_workers(
+        self,
+        after: Optional[Union[str, UUID]] = None,
+        limit: int = 100,
+        with_stats: bool = False,
+    ) -> List[Tuple[Worker, Optional[Dict[str, Any]]]]:
+        """Get a page of workers, adding up their load over all shards.
+
+        Workers are registered in every shard, so the first shard lists them;
+        each shard counts the tasks it holds.
+        """
+        if not with_stats:
+            return await self.shard(0).list_workers(after=after, limit=limit)
+        pages = await self._gather(
+            lambda shard: shard.list_workers(after=after, limit=limit, with_stats=True)
+        )
+        totals: Dict[str, Dict[str, Any]] = {}
+        for page in pages[1:]:
+            for worker, stats in page:
+                total = totals.setdefault(worker.id, {"running": 0, "completed": 0})
+                total["running"] += stats["running"]
+                total["completed"] += stats["completed_last_minute"]
+        merged = []
+        for worker, stats in pages[0]:
+            total = totals.get(worker.id, {"running": 0, "completed": 0})
+            stats["running"] += total["running"]
+            stats["completed_last_minute"] += total["completed"]
+            merged.append((worker, stats))
+        return merged
+
+    async def update_heartbeat(self, worker_id: Union[str, UUID]) -> Optional[Worker]:
+        """Update a worker's heartbeat timestamp in every shard."""
+        results = await self._gather(lambda shard: shard.update_heartbeat(worker_id))
+        return results[0]
+
+    async def set_worker_status(
+        self, worker_id: Union[str, UUID], status: str
+    ) -> Optional[Worker]:
+        """Set a worker's status in every shard."""
+        results = await self._gather(
+            lambda shard: shard.set_worker_status(worker_id, status)
+        )
+        return results[0]
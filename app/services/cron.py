@@ -0,0 +1,115 @@
+"""Minimal parser for five-field cron expressions.
+
+Supports ``*``, numbers, ranges (``1-5``), lists (``1,15``), steps (``*/10``,
+``0-30/5``) and the ``@hourly``, ``@daily``, ``@weekly``, ``@monthly`` and
+``@yearly`` aliases. Day of week is ``0-7`` with both ``0`` and ``7`` meaning
+Sunday. As in classic cron, when both day of month and day of week are
+restricted a day matching either one fires. Expressions are evaluated in UTC.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import FrozenSet, Tuple
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (minimum, maximum) of minute, hour, day of month, month and day of week
+FIELD_RANGES: Tuple[Tuple[int, int], ...] = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+# No valid expression goes longer than this without firing (Feb 29 on a
+# Monday, say, takes up to 28 years)
+MAX_SEARCH_DAYS = 366 * 30
+
+
+def _parse_field(field: str, minimum: int, maximum: int) -> FrozenSet[int]:
+    """Parse one field into the set of values it matches."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid step: {step_text}")
+
+        if part == "*":
+            start, end = minimum, maximum
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = maximum if step > 1 else start
+
+        if not minimum <= start <= end <= maximum:
+            raise ValueError(f"Value out of range {minimum}-{maximum}: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """A parsed cron expression."""
+
+    def __init__(self, expression: str):
+        """Parse ``expression``, raising ValueError if it is invalid."""
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression}")
+
+        try:
+            minutes, hours, days, months, weekdays = (
+                _parse_field(field, *FIELD_RANGES[i]) for i, field in enumerate(fields)
+            )
+        except ValueError as exc:
+            raise ValueError(f"Invalid cron expression {expression}: {exc}") from exc
+
+        self.minutes = minutes
+        self.hours = hours
+        self.days = days
+        self.months = months
+        # Python counts weekdays from Monday, cron from Sunday
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _matches_day(self, moment: datetime) -> bool:
+        """Check whether a date matches the day of month and day of week."""
+        in_days = moment.day in self.days
+        in_weekdays = moment.weekday() in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the first time strictly after ``moment`` matching the expression."""
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        moment = moment.astimezone(timezone.utc)
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=MAX_SEARCH_DAYS)
+
+        # Skip whole months, days and hours that cannot match before looking
+        # at minutes
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+            elif not self._matches_day(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression}")
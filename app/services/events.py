@@ -0,0 +1,285 @@
+"""Task state change events and their per-process fan-out.
+
+Every state transition made by ``TaskQueueService`` is published as a
+``TaskEvent``. On PostgreSQL the events are sent with ``pg_notify`` inside the
+transaction that made the change, so they are delivered on commit to every
+process listening on the channel. Each API process holds a single listening
+connection and fans the events out to its subscribers. On other databases the
+events are published to the local broker once the session commits.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import engine, shard_map
+
+logger = logging.getLogger(__name__)
+
+_PENDING_EVENTS_KEY = "pending_task_events"
+
+
+class TaskEventType(str, Enum):
+    """Enum representing the kinds of task state changes."""
+
+    CREATED = "created"
+    PROMOTED = "promoted"
+    RELEASED = "released"
+    REQUEUED = "requeued"
+    CLAIMED = "claimed"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    PAUSED = "paused"
+    RESUMED = "resumed"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    """A single task state change."""
+
+    event: TaskEventType
+    task_id: str
+    name: str
+    queue: str
+    status: str
+    priority: str
+    worker_id: Optional[str]
+    timestamp: str
+
+    @classmethod
+    def from_task(cls, event: TaskEventType, task: Any) -> "TaskEvent":
+        """Build an event describing the current state of a task."""
+        return cls(
+            event=event,
+            task_id=str(task.id),
+            name=task.name,
+            queue=task.queue,
+            status=task.status.value,
+            priority=task.priority,
+            worker_id=str(task.worker_id) if task.worker_id else None,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "TaskEvent":
+        """Decode an event from its JSON representation."""
+        data = json.loads(raw)
+        data["event"] = TaskEventType(data["event"])
+        return cls(**data)
+
+    def to_json(self) -> str:
+        """Encode the event as compact JSON."""
+        data = asdict(self)
+        data["event"] = self.event.value
+        return json.dumps(data, separators=(",", ":"))
+
+
+class Subscription:
+    """A subscriber's bounded event buffer and filters."""
+
+    def __init__(
+        self,
+        buffer_size: int,
+        statuses: Optional[Iterable[str]] = None,
+        names: Optional[Iterable[str]] = None,
+        queues: Optional[Iterable[str]] = None,
+    ):
+        """Initialize an empty subscription with optional filters."""
+        self._queue: "asyncio.Queue[Optional[TaskEvent]]" = asyncio.Queue(
+            maxsize=buffer_size
+        )
+        self.statuses: Optional[Set[str]] = set(statuses) if statuses else None
+        self.names: Optional[Set[str]] = set(names) if names else None
+        self.queues: Optional[Set[str]] = set(queues) if queues else None
+        self.evicted = False
+
+    def matches(self, task_event: TaskEvent) -> bool:
+        """Check whether an event passes the subscription's filters."""
+        if self.statuses is not None and task_event.status not in self.statuses:
+            return False
+        if self.names is not None and task_event.name not in self.names:
+            return False
+        if self.queues is not None and task_event.queue not in self.queues:
+            return False
+        return True
+
+    def offer(self, task_event: TaskEvent) -> bool:
+        """Buffer an event without blocking, returning False if the buffer is full."""
+        try:
+            self._queue.put_nowait(task_event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Drop all buffered events."""
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def evict(self) -> None:
+        """Drop buffered events and wake the consumer so it can stop."""
+        self.evicted = True
+        self.clear()
+        self._queue.put_nowait(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[TaskEvent]:
+        """Wait for the next event.
+
+        Returns None if the timeout elapses or the subscription was evicted.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class TaskEventBroker:
+    """Fans task events out from one database listener to many subscribers."""
+
+    def __init__(self, channel: str, buffer_size: int):
+        """Initialize the broker for a notification channel."""
+        self.channel = channel
+        self.buffer_size = buffer_size
+        self._subscriptions: List[Subscription] = []
+        # Called synchronously with every event, e.g. to invalidate caches
+        self._callbacks: List[Callable[[TaskEvent], None]] = []
+        # Listener connection and its raw driver connection, per engine
+        self._listeners: Dict[AsyncEngine, Tuple[Any, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of active subscriptions."""
+        return len(self._subscriptions)
+
+    def subscribe(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        names: Optional[Iterable[str]] = None,
+        queues: Optional[Iterable[str]] = None,
+    ) -> Subscription:
+        """Register a new subscription."""
+        subscription = Subscription(self.buffer_size, statuses, names, queues)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def add_callback(self, callback: Callable[[TaskEvent], None]) -> None:
+        """Call ``callback`` with every event published from now on."""
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription if it is still registered."""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def publish(self, task_event: TaskEvent) -> None:
+        """Deliver an event to every matching subscriber.
+
+        Subscribers whose buffer is full are evicted rather than allowed to
+        slow down or grow memory for everyone else.
+        """
+        for callback in self._callbacks:
+            callback(task_event)
+        for subscription in list(self._subscriptions):
+            if not subscription.matches(task_event):
+                continue
+            if not subscription.offer(task_event):
+                logger.warning("Evicting slow task event subscriber")
+                self.unsubscribe(subscription)
+                subscription.evict()
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """Start listening for notifications on the engine's database.
+
+        Only PostgreSQL supports LISTEN; on other databases the broker is fed
+        directly by the sessions of this process. Starting again for an engine
+        that is already listened to does nothing, and every shard of a sharded
+        deployment gets its own listener.
+        """
+        async with self._lock:
+            if engine in self._listeners or engine.dialect.name != "postgresql":
+                return
+            connection = await engine.connect()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.add_listener(
+                self.channel, self._on_notification
+            )
+            self._listeners[engine] = (connection, raw_connection)
+            logger.info(f"Listening for task events on channel {self.channel}")
+
+    async def stop(self) -> None:
+        """Stop listening and release the listener connections."""
+        async with self._lock:
+            for connection, raw_connection in self._listeners.values():
+                await raw_connection.driver_connection.remove_listener(
+                    self.channel, self._on_notification
+                )
+                await connection.close()
+            self._listeners.clear()
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:  # noqa
+        """Handle a NOTIFY delivered by asyncpg."""
+        try:
+            self.publish(TaskEvent.from_json(payload))
+        except (ValueError, TypeError, KeyError):
+            logger.warning(f"Ignoring malformed task event: {payload}")
+
+
+broker = TaskEventBroker(
+    channel=settings.EVENTS_CHANNEL, buffer_size=settings.EVENTS_CLIENT_BUFFER
+)
+
+
+async def start_listener() -> None:
+    """Start this process's task event listeners if tasks live in the database."""
+    if settings.QUEUE_BACKEND != "database":
+        return
+    for shard_engine in shard_map.engines if shard_map else [engine]:
+        await broker.start(shard_engine)
+
+
+async def emit_task_events(db: AsyncSession, task_events: Sequence[TaskEvent]) -> None:
+    """Emit events as part of the session's current transaction.
+
+    Must be called before the transaction commits so that subscribers never see
+    events for changes that were rolled back.
+    """
+    if not task_events:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(
+            text(
+                "SELECT pg_notify(:channel, payload) "
+                "FROM unnest(CAST(:payloads AS text[])) AS payload"
+            ),
+            {
+                "channel": broker.channel,
+                "payloads": [task_event.to_json() for task_event in task_events],
+            },
+        )
+    else:
+        db.info.setdefault(_PENDING_EVENTS_KEY, []).extend(task_events)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    """Publish locally buffered events once their transaction has committed."""
+    for task_event in session.info.pop(_PENDING_EVENTS_KEY, []):
+        broker.publish(task_event)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    """Drop locally buffered events of a rolled back transaction."""
+    session.info.pop(_PENDING_EVENTS_KEY, None)
@@ -0,0 +1,123 @@
+"""Claim order of tasks.
+
+Workers claim PENDING tasks in ascending ``sort_key``, which is computed once
+when a task is enqueued so that the claim stays a single scan of the
+``(status, sort_key)`` index.
+
+In ``strict`` mode the key is the time the task became ready minus a very large
+offset per priority level, so tasks run by priority and then in order of
+arrival. A steady stream of high priority tasks starves the others.
+
+In ``fair`` mode the offset per priority level is ``PRIORITY_AGING_SECONDS``.
+Ordering by ``ready_at - rank * aging`` is the same as ordering by the
+effective priority ``rank + waited / aging`` at any given moment, so a waiting
+task gains one priority level every ``PRIORITY_AGING_SECONDS`` without its key
+ever being updated. On top of that, the ready time is replaced by a start tag
+from start-time fair queuing: every queue has a virtual clock (``last_tag``)
+that advances by ``FAIR_SHARE_QUANTUM_SECONDS / weight`` per task. A queue that
+floods the system pushes only its own tasks into the future, and the workers
+are shared between busy queues in proportion to their weights.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import TaskPriority, TaskQueue
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (as returned by SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Offset per priority level in strict mode, far larger than any timestamp
+STRICT_PRIORITY_SPACING = 1e10
+
+
+def ready_at_of(scheduled_at: Optional[datetime], created_at: datetime) -> float:
+    """Time from which a task competes for workers, as a UNIX timestamp."""
+    ready_at = created_at
+    if scheduled_at is not None:
+        ready_at = max(_as_utc(scheduled_at), _as_utc(created_at))
+    return _as_utc(ready_at).timestamp()
+
+
+def priority_spacing() -> float:
+    """Offset of the sort key per priority level."""
+    if settings.SCHEDULING_MODE == "fair":
+        return float(settings.PRIORITY_AGING_SECONDS)
+    return STRICT_PRIORITY_SPACING
+
+
+def compute_sort_key(priority: str, start: float) -> float:
+    """Sort key of a task of ``priority`` that starts competing at ``start``."""
+    return start - TaskPriority[priority].value * priority_spacing()
+
+
+def assign_start_tags(
+    last_tag: float, weight: float, ready_ats: Sequence[float]
+) -> List[float]:
+    """Start tags of tasks added to a queue whose clock ended at ``last_tag``."""
+    step = settings.FAIR_SHARE_QUANTUM_SECONDS / weight
+    tags = []
+    for ready_at in ready_ats:
+        tag = max(last_tag, ready_at)
+        tags.append(tag)
+        last_tag = tag + step
+    return tags
+
+
+async def reserve_start_tags(
+    db: AsyncSession, queue: str, ready_ats: Sequence[float]
+) -> List[float]:
+    """Reserve the start tags of tasks being added to a queue.
+
+    Returns the ready times themselves outside of fair mode. In fair mode the
+    queue's clock is advanced by one atomic upsert, so concurrent producers
+    never hand out the same tags.
+    """
+    dialect = db.get_bind().dialect.name
+    if (
+        settings.SCHEDULING_MODE != "fair"
+        or not ready_ats
+        or dialect not in ("postgresql", "sqlite")
+    ):
+        return list(ready_ats)
+
+    count = len(ready_ats)
+    earliest = min(ready_ats)
+    quantum = settings.FAIR_SHARE_QUANTUM_SECONDS
+    if dialect == "postgresql":
+        stmt = postgresql.insert(TaskQueue)
+        greatest = func.greatest
+    else:
+        stmt = sqlite.insert(TaskQueue)
+        # SQLite's multi-argument max() is a scalar function
+        greatest = func.max
+    stmt = (
+        stmt.values(name=queue, weight=1.0, last_tag=earliest + count * quantum)
+        .on_conflict_do_update(
+            index_elements=[TaskQueue.name],
+            set_={
+                "last_tag": greatest(TaskQueue.last_tag, earliest)
+                + count * quantum / TaskQueue.weight
+            },
+        )
+        .returning(TaskQueue.last_tag, TaskQueue.weight)
+    )
+    last_tag, weight = (await db.execute(stmt)).one()
+
+    order = sorted(range(count), key=ready_ats.__getitem__)
+    tags = assign_start_tags(
+        last_tag - count * quantum / weight,
+        weight,
+        [ready_ats[i] for i in order],
+    )
+    start_tags = [0.0] * count
+    for i, tag in zip(order, tags):
+        start_tags[i] = tag
+    return start_tags
@@ -0,0 +1,327 @@
+"""Service layer for recurring tasks.
+
+Recurring tasks are schedules, not work: the scheduler materializes each run as
+an ordinary task ahead of time, ``RECURRING_LOOKAHEAD_SECONDS`` before it is
+due. A tick locks the schedules with runs coming up, plans their runs in
+memory, inserts all the tasks with one multi-row ``INSERT`` and moves every
+schedule on with one batched ``UPDATE``. Runs are keyed by
+``(recurring_task_id, scheduled_at)``, so a run materialized twice (by two
+schedulers, or after a crash between the insert and the update) is ignored by
+the unique constraint instead of running twice.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import MisfirePolicy, RecurringTask, Task, TaskStatus, generate_uuid
+from app.schemas.task import RecurringTaskCreate, RecurringTaskUpdate
+from app.services.cron import CronExpression
+from app.services.events import TaskEvent, TaskEventType, emit_task_events
+from app.services.ordering import compute_sort_key, reserve_start_tags
+from app.services.partitions import partition_of
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (as returned by SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def next_fire_after(recurring_task: Any, moment: datetime) -> datetime:
+    """Get the first run of a schedule strictly after ``moment``."""
+    if recurring_task.cron:
+        return CronExpression(recurring_task.cron).next_after(moment)
+    return moment + timedelta(seconds=recurring_task.interval_seconds)
+
+
+def first_fire_at(recurring_task: Any, start_at: Optional[datetime]) -> datetime:
+    """Get the first run of a new or rescheduled schedule."""
+    start = _as_utc(start_at) if start_at else datetime.now(timezone.utc)
+    if recurring_task.cron:
+        # A start time on the minute is itself a candidate
+        return next_fire_after(recurring_task, start - timedelta(microseconds=1))
+    return start
+
+
+def plan_runs(recurring_task: Any, now: datetime) -> Tuple[List[datetime], datetime]:
+    """Plan the runs of a schedule up to the lookahead horizon.
+
+    Returns the fire times to materialize and the schedule's new
+    ``next_fire_at``. Runs due more than ``RECURRING_MISFIRE_GRACE_SECONDS``
+    ago were missed and are handled by the schedule's misfire policy.
+    """
+    horizon = now + timedelta(seconds=settings.RECURRING_LOOKAHEAD_SECONDS)
+    misfire_cutoff = now - timedelta(seconds=settings.RECURRING_MISFIRE_GRACE_SECONDS)
+    fire_at = _as_utc(recurring_task.next_fire_at)
+
+    runs: List[datetime] = []
+    if fire_at < misfire_cutoff:
+        if recurring_task.misfire_policy == MisfirePolicy.CATCH_UP:
+            while (
+                fire_at < misfire_cutoff and len(runs) < settings.RECURRING_MAX_CATCH_UP
+            ):
+                runs.append(fire_at)
+                fire_at = next_fire_after(recurring_task, fire_at)
+        elif recurring_task.misfire_policy == MisfirePolicy.FIRE_ONCE:
+            runs.append(fire_at)
+        # Jump over the rest of the missed runs instead of walking through them
+        if fire_at < misfire_cutoff:
+            fire_at = next_fire_after(recurring_task, misfire_cutoff)
+
+    while fire_at <= horizon:
+        runs.append(fire_at)
+        fire_at = next_fire_after(recurring_task, fire_at)
+    return runs, fire_at
+
+
+def build_runs(
+    recurring_task: Any, fire_times: Sequence[datetime], now: datetime
+) -> List[Dict[str, Any]]:
+    """Build the task rows for runs of a schedule."""
+    rows = []
+    for fire_at in fire_times:
+        task_id = generate_uuid()
+        rows.append(
+            {
+                "id": task_id,
+                "name": recurring_task.name,
+                "queue": recurring_task.queue,
+                "payload": recurring_task.payload,
+                "priority": recurring_task.priority,
+                "status": TaskStatus.SCHEDULED if fire_at > now else TaskStatus.PENDING,
+                "scheduled_at": fire_at,
+                "created_at": now,
+                "updated_at": now,
+                "recurring_task_id": recurring_task.id,
+                "remaining_dependencies": 0,
+                "retries": 0,
+                "partition": partition_of(task_id),
+            }
+        )
+    return rows
+
+
+def apply_schedule_fields(
+    recurring_task: Any, recurring_in: Union[RecurringTaskCreate, RecurringTaskUpdate]
+) -> bool:
+    """Copy set fields onto a schedule, returning True if its timing changed."""
+    data = recurring_in.model_dump(
+        exclude_unset=isinstance(recurring_in, RecurringTaskUpdate),
+        exclude={"start_at"},
+    )
+    if data.get("priority"):
+        data["priority"] = data["priority"].value
+    if data.get("misfire_policy"):
+        data["misfire_policy"] = MisfirePolicy(data["misfire_policy"].value)
+
+    rescheduled = data.get("cron") is not None or data.get("interval_seconds")
+    if data.get("cron") is not None:
+        data["interval_seconds"] = None
+    elif data.get("interval_seconds"):
+        data["cron"] = None
+
+    for field, value in data.items():
+        setattr(recurring_task, field, value)
+    return bool(rescheduled)
+
+
+class RecurringTaskService:
+    """Service class for handling recurring tasks in the database."""
+
+    @staticmethod
+    async def create_recurring_task(
+        db: AsyncSession, recurring_in: RecurringTaskCreate
+    ) -> RecurringTask:
+        """Create a new recurring task and materialize its upcoming runs."""
+        now = datetime.now(timezone.utc)
+        db_recurring = RecurringTask(created_at=now, updated_at=now)
+        apply_schedule_fields(db_recurring, recurring_in)
+        db_recurring.next_fire_at = first_fire_at(db_recurring, recurring_in.start_at)
+        db.add(db_recurring)
+        await db.flush()
+
+        await RecurringTaskService._materialize(db, [db_recurring], now)
+        await db.commit()
+        await db.refresh(db_recurring)
+        return db_recurring
+
+    @staticmethod
+    async def get_recurring_task(
+        db: AsyncSession, recurring_task_id: Union[str, UUID]
+    ) -> Optional[RecurringTask]:
+        """Get a recurring task by ID."""
+        result = await db.execute(
+            select(RecurringTask).filter(RecurringTask.id == str(recurring_task_id))  # type: ignore   # noqa
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_recurring_tasks(
+        db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> Sequence[RecurringTask]:
+        """Get all recurring tasks with pagination."""
+        result = await db.execute(
+            select(RecurringTask)  # type: ignore   # noqa
+            .order_by(RecurringTask.created_at.asc(), RecurringTask.id.asc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_recurring_tasks_count(db: AsyncSession) -> int:
+        """Get the total count of recurring tasks."""
+        result = await db.execute(select(func.count()).select_from(RecurringTask))
+        return result.scalar_one()
+
+    @staticmethod
+    async def update_recurring_task(
+        db: AsyncSession,
+        recurring_task_id: Union[str, UUID],
+        recurring_in: RecurringTaskUpdate,
+    ) -> Optional[RecurringTask]:
+        """Update a recurring task by ID.
+
+        A new schedule drops the runs materialized for the old one that have
+        not started yet.
+        """
+        db_recurring = await RecurringTaskService.get_recurring_task(
+            db, recurring_task_id
+        )
+        if not db_recurring:
+            return None
+
+        now = datetime.now(timezone.utc)
+        if apply_schedule_fields(db_recurring, recurring_in):
+            await RecurringTaskService._delete_scheduled_runs(db, db_recurring.id)
+            db_recurring.next_fire_at = first_fire_at(db_recurring, now)
+        db_recurring.updated_at = now
+        db.add(db_recurring)
+        await db.flush()
+
+        if db_recurring.enabled:
+            await RecurringTaskService._materialize(db, [db_recurring], now)
+        await db.commit()
+        await db.refresh(db_recurring)
+        return db_recurring
+
+    @staticmethod
+    async def delete_recurring_task(
+        db: AsyncSession, recurring_task_id: Union[str, UUID]
+    ) -> bool:
+        """Delete a recurring task and its runs that have not started yet."""
+        db_recurring = await RecurringTaskService.get_recurring_task(
+            db, recurring_task_id
+        )
+        if not db_recurring:
+            return False
+
+        await RecurringTaskService._delete_scheduled_runs(db, db_recurring.id)
+        await db.delete(db_recurring)
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def _delete_scheduled_runs(db: AsyncSession, recurring_task_id: str) -> None:
+        """Delete the runs of a schedule that are still SCHEDULED."""
+        await db.execute(
+            delete(Task)
+            .where(
+                Task.recurring_task_id == recurring_task_id,
+                Task.status == TaskStatus.SCHEDULED,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def _materialize(
+        db: AsyncSession, recurring_tasks: Sequence[RecurringTask], now: datetime
+    ) -> Sequence[Task]:
+        """Insert the upcoming runs of schedules and move them on.
+
+        Runs that already exist are skipped. Does not commit.
+        """
+        rows: List[Dict[str, Any]] = []
+        schedules: List[Dict[str, Any]] = []
+        for recurring_task in recurring_tasks:
+            fire_times, next_fire_at = plan_runs(recurring_task, now)
+            rows.extend(build_runs(recurring_task, fire_times, now))
+            schedules.append(
+                {
+                    "id": recurring_task.id,
+                    "next_fire_at": next_fire_at,
+                    "last_fire_at": (
+                        fire_times[-1] if fire_times else recurring_task.last_fire_at
+                    ),
+                }
+            )
+
+        rows_by_queue: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_queue.setdefault(row["queue"], []).append(row)
+        for queue, queue_rows in rows_by_queue.items():
+            start_tags = await reserve_start_tags(
+                db, queue, [row["scheduled_at"].timestamp() for row in queue_rows]
+            )
+            for row, start_tag in zip(queue_rows, start_tags):
+                row["sort_key"] = compute_sort_key(row["priority"], start_tag)
+
+        tasks: Sequence[Task] = []
+        if rows:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                stmt = postgresql.insert(Task).on_conflict_do_nothing()
+            elif dialect == "sqlite":
+                stmt = sqlite.insert(Task).on_conflict_do_nothing()
+            else:
+                stmt = insert(Task)
+            result = await db.execute(stmt.returning(Task), rows)
+            tasks = result.scalars().all()
+            await emit_task_events(
+                db, [TaskEvent.from_task(TaskEventType.CREATED, task) for task in tasks]
+            )
+        if schedules:
+            # Executed as one executemany by primary key
+            await db.execute(
+                update(RecurringTask).execution_options(synchronize_session=False),
+                schedules,
+            )
+        return tasks
+
+    @staticmethod
+    async def materialize_recurring_tasks(db: AsyncSession, limit: int = 1000) -> int:
+        """Materialize the upcoming runs of up to ``limit`` schedules.
+
+        Returns the number of schedules processed.
+        """
+        now = datetime.now(timezone.utc)
+        horizon = now + timedelta(seconds=settings.RECURRING_LOOKAHEAD_SECONDS)
+        result = await db.execute(
+            select(RecurringTask)  # type: ignore   # noqa
+            .filter(
+                RecurringTask.enabled.is_(True),
+                RecurringTask.next_fire_at <= horizon,
+            )
+            .order_by(RecurringTask.next_fire_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        recurring_tasks = result.scalars().all()
+        await RecurringTaskService._materialize(db, recurring_tasks, now)
+        await db.commit()
+        return len(recurring_tasks)
+
+    @staticmethod
+    async def get_next_fire_at(db: AsyncSession) -> Optional[datetime]:
+        """Get the earliest ``next_fire_at`` of the enabled schedules."""
+        result = await db.execute(
+            select(func.min(RecurringTask.next_fire_at)).filter(  # type: ignore   # noqa
+                RecurringTask.enabled.is_(True)
+            )
+        )
+        next_fire_at = result.scalar_one_or_none()
+        return _as_utc(next_fire_at) if next_fire_at else None
@@ -0,0 +1,105 @@
+"""Worker count recommendations for autoscalers.
+
+CPU usage says little about how many workers an I/O bound queue needs. This
+module sizes the fleet from the queue itself, per queue or per priority, over
+the last ``QUEUE_STATS_WINDOW_SECONDS``:
+
+* the arrival rate ``λ`` is the number of tasks that became ready divided by
+  the window;
+* the service time ``S`` is the mean run time of the tasks that finished, so a
+  worker with ``WORKER_MAX_TASKS`` slots serves ``WORKER_MAX_TASKS / S`` tasks
+  per second.
+
+By Little's law, keeping up with arrivals takes ``λ * S`` busy slots. On top of
+that, the ``pending`` backlog has to drain within the target wait, which takes
+another ``pending * S / target_wait`` slots. The recommendation is the number
+of workers providing that many slots. Without any finished task in the window
+there is no service time yet, and the slots currently busy (at least one while
+tasks are pending) are recommended instead.
+
+Autoscalers poll, so results are cached for ``SCALING_CACHE_SECONDS``.
+"""
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def required_slots(
+    stats: Dict[str, Any], window_seconds: float, target_wait: float
+) -> Tuple[float, float]:
+    """Arrival rate and number of busy slots needed by one group's load."""
+    arrival_rate = stats["arrivals"] / window_seconds
+    service = stats["avg_service_seconds"]
+    if service is None:
+        return arrival_rate, float(max(stats["running"], 1 if stats["pending"] else 0))
+    return (
+        arrival_rate,
+        arrival_rate * service + stats["pending"] * service / target_wait,
+    )
+
+
+def recommend(
+    load_stats: List[Dict[str, Any]],
+    window_seconds: float,
+    target_wait: float,
+    worker_slots: int,
+) -> Dict[str, Any]:
+    """Recommended worker counts for the load of each group and overall."""
+    groups = []
+    total_slots = 0.0
+    for stats in load_stats:
+        arrival_rate, slots = required_slots(stats, window_seconds, target_wait)
+        total_slots += slots
+        service = stats["avg_service_seconds"]
+        groups.append(
+            {
+                **stats,
+                "arrival_rate": arrival_rate,
+                "worker_service_rate": worker_slots / service if service else None,
+                "required_slots": slots,
+                "recommended_workers": math.ceil(slots / worker_slots),
+            }
+        )
+    return {
+        "window_seconds": window_seconds,
+        "target_wait_seconds": target_wait,
+        "worker_slots": worker_slots,
+        # Groups share workers, so the total is not the sum of the groups'
+        "recommended_workers": math.ceil(total_slots / worker_slots),
+        "groups": groups,
+    }
+
+
+class TTLCache:
+    """Results of an expensive computation, kept for ``ttl`` seconds per key.
+
+    Concurrent callers that miss on the same key each compute the result; the
+    last one is kept.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """Initialize an empty cache."""
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+
+    async def get_or_compute(
+        self, key: Any, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached result for ``key``, computed if missing or expired."""
+        entry: Optional[Tuple[float, Any]] = self._entries.get(key)
+        if entry is not None and self.clock() < entry[0]:
+            return entry[1]
+        value = await compute()
+        self._entries[key] = (self.clock() + self.ttl, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+
+# Recommendations served by the API, keyed by grouping and target wait
+scaling_cache = TTLCache(settings.SCALING_CACHE_SECONDS)
@@ -0,0 +1,114 @@
+"""Scheduler promoting due SCHEDULED tasks to PENDING.
+
+Workers only ever claim PENDING tasks, so the claim query is a plain index scan
+on ``(status, priority, ...)`` and never has to compare ``scheduled_at`` with
+the current time. One scheduler moves due tasks over in bulk and then sleeps
+until the earliest ``scheduled_at`` still ahead, or until a new SCHEDULED task
+shows up that may be due sooner. Promotions are published as task events, which
+is what wakes idle workers.
+
+Each tick first materializes the upcoming runs of recurring tasks, so that
+they are promoted in the same pass once they are due.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Callable, Optional
+
+from app.core.config import settings
+from app.services.backends import TaskQueueBackend, open_backend
+from app.services.events import broker, start_listener
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Background loop moving SCHEDULED tasks to PENDING when they are due."""
+
+    def __init__(
+        self,
+        backend_opener: Callable[
+            [], AsyncContextManager[TaskQueueBackend]
+        ] = open_backend,
+        batch_size: int = settings.SCHEDULER_BATCH_SIZE,
+        max_interval: float = settings.SCHEDULER_MAX_INTERVAL,
+    ):
+        """Initialize the scheduler with a function opening the backend."""
+        self.open_backend = backend_opener
+        self.batch_size = batch_size
+        self.max_interval = max_interval
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def tick(self) -> Optional[datetime]:
+        """Materialize and promote every due task and return when to tick next."""
+        async with self.open_backend() as backend:
+            while True:
+                processed = await backend.materialize_recurring_tasks(
+                    limit=self.batch_size
+                )
+                if processed:
+                    logger.info(f"Materialized runs of {processed} recurring tasks")
+                if processed < self.batch_size:
+                    break
+
+            while True:
+                promoted = await backend.promote_due_tasks(limit=self.batch_size)
+                if promoted:
+                    logger.info(f"Promoted {len(promoted)} scheduled tasks")
+                if len(promoted) < self.batch_size:
+                    break
+
+            wakeups = [await backend.get_next_due_at()]
+            next_fire_at = await backend.get_next_fire_at()
+            if next_fire_at is not None:
+                wakeups.append(
+                    next_fire_at
+                    - timedelta(seconds=settings.RECURRING_LOOKAHEAD_SECONDS)
+                )
+            return min((wakeup for wakeup in wakeups if wakeup), default=None)
+
+    def _timeout(self, next_due_at: Optional[datetime]) -> float:
+        """Seconds to sleep before the next tick."""
+        if next_due_at is None:
+            return self.max_interval
+        delay = (next_due_at - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 0.0), self.max_interval)
+
+    async def run(self) -> None:
+        """Promote due tasks until cancelled."""
+        await start_listener()
+        # Newly created or resumed SCHEDULED tasks may be due before the
+        # current wakeup, so any of them triggers an early tick
+        subscription = broker.subscribe(statuses=["scheduled"])
+        try:
+            while True:
+                subscription.clear()
+                try:
+                    next_due_at = await self.tick()
+                except Exception as e:
+                    logger.error(f"Scheduler error: {str(e)}")
+                    next_due_at = None
+                await subscription.get(timeout=self._timeout(next_due_at))
+                if subscription.evicted:
+                    subscription = broker.subscribe(statuses=["scheduled"])
+        finally:
+            broker.unsubscribe(subscription)
+
+    def start(self) -> None:
+        """Start the loop as a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the loop and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+scheduler = Scheduler()
@@ -0,0 +1,135 @@
+"""HTTP caching of task responses.
+
+COMPLETED and FAILED tasks no longer change on their own, so their serialized
+responses are kept in an in-process LRU cache bounded by
+``TASK_CACHE_MAX_BYTES`` and served without touching the database. Entries are
+dropped on any event for the task (an edit, a deletion, a retry), whichever
+process made the change, as long as the task event listener is running.
+
+Every task response carries an ``ETag`` derived from the task's ID and
+``updated_at``, so clients can revalidate with ``If-None-Match`` and get a
+``304 Not Modified`` instead of the body.
+"""
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+from app.db.models import TaskStatus
+from app.services.events import TaskEvent, broker
+
+# Tasks in these states only change through an explicit edit, deletion or retry
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+def task_etag(task: Any) -> str:
+    """Strong ETag of a task's current version."""
+    return f'"{task.id}-{task.updated_at.timestamp():.6f}"'
+
+
+def cache_control(task: Any) -> str:
+    """Cache-Control header for a task response."""
+    if task.status in TERMINAL_STATUSES:
+        return f"private, max-age={settings.TASK_CACHE_MAX_AGE}"
+    # Still changing: clients may keep it but must revalidate every time
+    return "no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class TaskResponseCache:
+    """LRU cache of serialized task responses, bounded by their total size.
+
+    No method awaits, so each one is atomic with respect to other coroutines.
+
+    A task can change while its response is being read and serialized, and
+    the event for that change can arrive before the response is cached, when
+    there is no entry to drop yet. Events therefore also stamp the task with a
+    new generation, and ``put`` refuses responses read before the task's last
+    invalidation. The stamps of the ``MAX_INVALIDATIONS`` most recently
+    changed tasks are kept; responses read before an older, forgotten stamp
+    are refused for every task.
+    """
+
+    MAX_INVALIDATIONS = 10000
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty cache holding at most ``max_bytes`` of bodies."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[str, str, bytes]]" = OrderedDict()
+        self._generation = 0
+        self._invalidations: "OrderedDict[str, int]" = OrderedDict()
+        self._forgotten = 0
+
+    def __len__(self) -> int:
+        """Number of cached responses."""
+        return len(self._entries)
+
+    def get(self, task_id: str) -> Optional[Tuple[str, str, bytes]]:
+        """Get the ETag, Cache-Control and body of a cached task response."""
+        entry = self._entries.get(task_id)
+        if entry is not None:
+            self._entries.move_to_end(task_id)
+        return entry
+
+    def generation(self) -> int:
+        """Current generation, to be taken before reading a task to ``put``."""
+        return self._generation
+
+    def put(
+        self,
+        task_id: str,
+        etag: str,
+        cache_control: str,
+        body: bytes,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a response, evicting the least recently used ones to fit it.
+
+        A response read at ``generation`` is dropped if the task changed since.
+        """
+        if len(body) > self.max_bytes:
+            return
+        if generation is not None and generation < self._invalidations.get(
+            task_id, self._forgotten
+        ):
+            return
+        self._pop(task_id)
+        self._entries[task_id] = (etag, cache_control, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def invalidate(self, task_id: str) -> None:
+        """Drop a task's cached response, if any."""
+        self._pop(task_id)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+        self.size = 0
+
+    def on_event(self, task_event: TaskEvent) -> None:
+        """Broker callback dropping the response of a task that changed."""
+        self._generation += 1
+        self._invalidations.pop(task_event.task_id, None)
+        self._invalidations[task_event.task_id] = self._generation
+        if len(self._invalidations) > self.MAX_INVALIDATIONS:
+            _, self._forgotten = self._invalidations.popitem(last=False)
+        self.invalidate(task_event.task_id)
+
+    def _pop(self, task_id: str) -> None:
+        """Remove an entry and account for its size."""
+        entry = self._entries.pop(task_id, None)
+        if entry is not None:
+            self.size -= len(entry[2])
+
+
+task_cache = TaskResponseCache(settings.TASK_CACHE_MAX_BYTES)
+broker.add_callback(task_cache.on_event)
@@ -1,71 +1,247 @@
 """Service layer for task queue operations with database access."""
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Sequence, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
 from uuid import UUID
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Task, TaskStatus
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.core.config import settings
+from app.core.instrumentation import traced
+from app.db.models import Task, TaskDependency, TaskQueue, TaskStatus, generate_uuid
+from app.schemas.task import BulkAction, TaskAck, TaskCreate, TaskFilter, TaskUpdate
+from app.services.events import TaskEvent, TaskEventType, emit_task_events
+from app.services.ordering import compute_sort_key, ready_at_of, reserve_start_tags
+from app.services.partitions import partition_of, preferred_partitions
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (as returned by SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _requeue(task: Task, ack: TaskAck, now: datetime) -> None:
+    """Put a failed task back in the queue to run again after ``ack.retry_in``.
+
+    The task keeps its ``sort_key``, so it is claimed ahead of tasks enqueued
+    after it once it is due.
+    """
+    task.status = TaskStatus.SCHEDULED if ack.retry_in else TaskStatus.PENDING
+    task.scheduled_at = now + timedelta(seconds=ack.retry_in or 0)
+    task.started_at = None
+    task.worker_id = None
+    task.error = ack.error
+    task.retries += 1
+
+
+# Statuses each bulk action applies to (None for any status)
+BULK_ACTION_STATUSES: Dict[BulkAction, Optional[List[TaskStatus]]] = {
+    BulkAction.PAUSE: [TaskStatus.PENDING, TaskStatus.SCHEDULED, TaskStatus.RUNNING],
+    BulkAction.RESUME: [TaskStatus.PAUSED],
+    BulkAction.REQUEUE: [TaskStatus.FAILED],
+    BulkAction.DELETE: None,
+}
+
+
+def _filter_clauses(task_filter: TaskFilter, action: BulkAction) -> List[Any]:
+    """SQL conditions selecting the tasks a bulk action applies to."""
+    clauses = []
+    if task_filter.status is not None:
+        clauses.append(Task.status == TaskStatus(task_filter.status.value))
+    if task_filter.name is not None:
+        clauses.append(Task.name == task_filter.name)
+    if task_filter.queue is not None:
+        clauses.append(Task.queue == task_filter.queue)
+    if task_filter.priority is not None:
+        clauses.append(Task.priority == task_filter.priority.value)
+    if task_filter.created_after is not None:
+        clauses.append(Task.created_at >= task_filter.created_after)
+    if task_filter.created_before is not None:
+        clauses.append(Task.created_at < task_filter.created_before)
+    if task_filter.updated_after is not None:
+        clauses.append(Task.updated_at >= task_filter.updated_after)
+    if task_filter.updated_before is not None:
+        clauses.append(Task.updated_at < task_filter.updated_before)
+    statuses = BULK_ACTION_STATUSES[action]
+    if statuses is not None:
+        clauses.append(Task.status.in_(statuses))
+    return clauses
+
+
+def _new_task_row(
+    task_in: TaskCreate, now: datetime, task_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Column values of a new task without dependencies, except its sort key."""
+    # Tasks scheduled in the past are ready straight away
+    scheduled = task_in.scheduled_at is not None and _as_utc(task_in.scheduled_at) > now
+    task_id = task_id or generate_uuid()
+    return {
+        "id": task_id,
+        "name": task_in.name,
+        "queue": task_in.queue,
+        "payload": task_in.payload,
+        "priority": task_in.priority.value,
+        "status": TaskStatus.SCHEDULED if scheduled else TaskStatus.PENDING,
+        "scheduled_at": task_in.scheduled_at,
+        "timeout_seconds": task_in.timeout_seconds,
+        "created_at": now,
+        "updated_at": now,
+        "remaining_dependencies": 0,
+        "retries": 0,
+        "partition": partition_of(task_id),
+    }
+
+
+def _epoch(db: AsyncSession, column: Any) -> Any:
+    """SQL expression for a timestamp column as seconds since the epoch."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", column)
+    # Julian day number of 1970-01-01
+    return (func.julianday(column) - 2440587.5) * 86400.0
+
+
+@traced("task_queue.commit")
+async def _commit(db: AsyncSession) -> None:
+    """Commit, in a span of its own nested in the calling method's."""
+    await db.commit()
 
 
 class TaskQueueService:
     """Service class for handling task queue operations in the database."""
 
     @staticmethod
-    async def create_task(db: AsyncSession, task_in: TaskCreate) -> Task:
-        """Create a new task in the queue."""
+    @traced("task_queue.create_task")
+    async def create_task(
+        db: AsyncSession, task_in: TaskCreate, task_id: Optional[str] = None
+    ) -> Optional[Task]:
+        """Create a new task in the queue.
+
+        A task with dependencies that have not all completed yet is created
+        BLOCKED, and one with a failed dependency is created FAILED. Returns
+        None if a dependency does not exist. ``task_id`` lets the caller pick
+        the ID, as the sharded backend does to route the task.
+        """
         now = datetime.now(timezone.utc)
+        db_task = Task(**_new_task_row(task_in, now, task_id))
+
+        depends_on = {str(task_id) for task_id in task_in.depends_on}
+        if depends_on:
+            # Locking the dependencies keeps them from finishing before the
+            # edges below are committed, which would leave this task blocked
+            result = await db.execute(
+                select(Task.id, Task.status)  # type: ignore   # noqa
+                .filter(Task.id.in_(depends_on))
+                .with_for_update()
+            )
+            statuses = dict(result.all())
+            if len(statuses) != len(depends_on):
+                await db.rollback()
+                return None
 
-        # Convert enum string to model enum
-        priority_name = task_in.priority.value
+            if TaskStatus.FAILED in statuses.values():
+                db_task.status = TaskStatus.FAILED
+                db_task.error = "A dependency failed"
+                db_task.completed_at = now
+            else:
+                db_task.remaining_dependencies = sum(
+                    status != TaskStatus.COMPLETED for status in statuses.values()
+                )
+                if db_task.remaining_dependencies:
+                    db_task.status = TaskStatus.BLOCKED
 
-        db_task = Task(
-            name=task_in.name,
-            payload=task_in.payload,
-            priority=priority_name,
-            status=TaskStatus.SCHEDULED if task_in.scheduled_at else TaskStatus.PENDING,
-            scheduled_at=task_in.scheduled_at,
-            created_at=now,
-            updated_at=now,
+        (start_tag,) = await reserve_start_tags(
+            db, db_task.queue, [ready_at_of(db_task.scheduled_at, now)]
         )
+        db_task.sort_key = compute_sort_key(db_task.priority, start_tag)
+
         db.add(db_task)
-        await db.commit()
+        await db.flush()
+        db.add_all(
+            TaskDependency(task_id=db_task.id, depends_on_id=depends_on_id)
+            for depends_on_id in depends_on
+        )
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.CREATED, db_task)]
+        )
+        await _commit(db)
         await db.refresh(db_task)
         return db_task
 
     @staticmethod
+    @traced("task_queue.create_tasks")
+    async def create_tasks(
+        db: AsyncSession, task_ins: Sequence[TaskCreate]
+    ) -> List[Task]:
+        """Create tasks without dependencies in one INSERT and one commit.
+
+        Returns the tasks in the order of ``task_ins``.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [_new_task_row(task_in, now) for task_in in task_ins]
+        rows_by_queue: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_queue.setdefault(row["queue"], []).append(row)
+        for queue, queue_rows in rows_by_queue.items():
+            start_tags = await reserve_start_tags(
+                db,
+                queue,
+                [ready_at_of(row["scheduled_at"], now) for row in queue_rows],
+            )
+            for row, start_tag in zip(queue_rows, start_tags):
+                row["sort_key"] = compute_sort_key(row["priority"], start_tag)
+
+        result = await db.execute(
+            insert(Task).returning(Task, sort_by_parameter_order=True), rows
+        )
+        tasks = list(result.scalars().all())
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.CREATED, task) for task in tasks]
+        )
+        await _commit(db)
+        return tasks
+
+    @staticmethod
+    @traced("task_queue.get_task")
     async def get_task(db: AsyncSession, task_id: Union[str, UUID]) -> Optional[Task]:
         """Get a task by ID."""
-        result = await db.execute(select(Task).filter(Task.id == task_id))  # type: ignore   # noqa
+        result = await db.execute(select(Task).filter(Task.id == str(task_id)))  # type: ignore   # noqa
         return result.scalar_one_or_none()
 
     @staticmethod
+    @traced("task_queue.get_tasks")
     async def get_tasks(
         db: AsyncSession, skip: int = 0, limit: int = 100
     ) -> Sequence[Task]:
-        """Get all tasks with pagination."""
-        result = await db.execute(select(Task).offset(skip).limit(limit))
+        """Get all tasks with pagination, oldest first."""
+        result = await db.execute(
+            select(Task).order_by(Task.created_at, Task.id).offset(skip).limit(limit)
+        )
         return result.scalars().all()
 
     @staticmethod
+    @traced("task_queue.get_tasks_count")
     async def get_tasks_count(db: AsyncSession) -> int:
         """Get the total count of tasks."""
         result = await db.execute(select(Task.id))
         return len(result.all())
 
     @staticmethod
+    @traced("task_queue.get_tasks_by_status")
     async def get_tasks_by_status(
         db: AsyncSession, status: TaskStatus, skip: int = 0, limit: int = 100
     ) -> Sequence[Task]:
-        """Get all tasks with a specific status."""
+        """Get all tasks with a specific status, oldest first."""
         result = await db.execute(
-            select(Task).filter(Task.status == status).offset(skip).limit(limit)  # type: ignore   # noqa
+            select(Task)  # type: ignore   # noqa
+            .filter(Task.status == status)
+            .order_by(Task.created_at, Task.id)
+            .offset(skip)
+            .limit(limit)
         )
         return result.scalars().all()
 
     @staticmethod
+    @traced("task_queue.update_task")
     async def update_task(
         db: AsyncSession, task_id: Union[str, UUID], task_in: TaskUpdate
     ) -> Optional[Task]:
@@ -88,24 +264,53 @@ class TaskQueueService:
         for field, value in task_data.items():
             setattr(db_task, field, value)
 
-        db_task.updated_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        if {"priority", "queue", "scheduled_at"} & task_data.keys():
+            # Requeue the task in its new position
+            (start_tag,) = await reserve_start_tags(
+                db, db_task.queue, [ready_at_of(db_task.scheduled_at, now)]
+            )
+            db_task.sort_key = compute_sort_key(db_task.priority, start_tag)
+
+        db_task.updated_at = now
         db.add(db_task)
-        await db.commit()
+        await db.flush()
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.UPDATED, db_task)]
+        )
+        await _commit(db)
         await db.refresh(db_task)
         return db_task
 
     @staticmethod
+    @traced("task_queue.delete_task")
     async def delete_task(db: AsyncSession, task_id: Union[str, UUID]) -> bool:
-        """Delete a task by ID."""
+        """Delete a task by ID.
+
+        Tasks waiting for a deleted task that had not completed can never run,
+        so they are failed.
+        """
         db_task = await TaskQueueService.get_task(db, task_id)
         if not db_task:
             return False
 
+        failed: Sequence[Task] = []
+        if db_task.status != TaskStatus.COMPLETED:
+            failed = await TaskQueueService._fail_dependents(
+                db, [db_task.id], datetime.now(timezone.utc)
+            )
+        deleted = TaskEvent.from_task(TaskEventType.DELETED, db_task)
         await db.delete(db_task)
-        await db.commit()
+        await emit_task_events(
+            db,
+            [deleted]
+            + [TaskEvent.from_task(TaskEventType.FAILED, task) for task in failed],
+        )
+        await _commit(db)
         return True
 
     @staticmethod
+    @traced("task_queue.pause_task")
     async def pause_task(db: AsyncSession, task_id: Union[str, UUID]) -> Optional[Task]:
         """Pause a task by ID."""
         db_task = await TaskQueueService.get_task(db, task_id)
@@ -119,11 +324,13 @@ class TaskQueueService:
         db_task.status = TaskStatus.PAUSED
         db_task.updated_at = datetime.now(timezone.utc)
         db.add(db_task)
-        await db.commit()
+        await emit_task_events(db, [TaskEvent.from_task(TaskEventType.PAUSED, db_task)])
+        await _commit(db)
         await db.refresh(db_task)
         return db_task
 
     @staticmethod
+    @traced("task_queue.resume_task")
     async def resume_task(
         db: AsyncSession, task_id: Union[str, UUID]
     ) -> Optional[Task]:
@@ -133,60 +340,508 @@ class TaskQueueService:
             return None
 
         now = datetime.now(timezone.utc)
-        if db_task.scheduled_at and db_task.scheduled_at > now:
+        if db_task.scheduled_at and _as_utc(db_task.scheduled_at) > now:
             db_task.status = TaskStatus.SCHEDULED
         else:
             db_task.status = TaskStatus.PENDING
 
         db_task.updated_at = now
         db.add(db_task)
-        await db.commit()
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.RESUMED, db_task)]
+        )
+        await _commit(db)
         await db.refresh(db_task)
         return db_task
 
     @staticmethod
-    async def get_next_task(
-        db: AsyncSession, worker_id: Union[str, UUID]
-    ) -> Optional[Task]:
-        """Get the next task to process for a worker."""
-        # Get tasks ready to run (PENDING or SCHEDULED with scheduled_at in the past)
-        current_time = datetime.now(timezone.utc)
+    @traced("task_queue.bulk_action")
+    async def bulk_action(
+        db: AsyncSession,
+        action: BulkAction,
+        task_filter: TaskFilter,
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """Apply a transition to every task matching a filter; return the count.
 
-        stmt = (
-            select(Task)  # type: ignore   # noqa
-            .filter(
-                or_(
-                    and_(Task.status == TaskStatus.PENDING),
-                    and_(
-                        Task.status == TaskStatus.SCHEDULED,
-                        Task.scheduled_at <= current_time,
+        Tasks are updated or deleted with set-based statements, committing
+        every ``chunk_size`` rows so no transaction holds many row locks.
+        Rows locked by other transactions, e.g. tasks being claimed, are
+        skipped. Pausing covers PENDING, SCHEDULED and RUNNING tasks, resuming
+        PAUSED ones and requeueing FAILED ones, which keep their place in the
+        queue; deleting covers tasks in any status.
+        """
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        clauses = _filter_clauses(task_filter, action)
+        affected = 0
+        while True:
+            chunk = (
+                select(Task.id)  # type: ignore   # noqa
+                .filter(*clauses)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+            )
+            if action == BulkAction.DELETE:
+                count = await TaskQueueService._delete_chunk(db, chunk)
+            else:
+                count = await TaskQueueService._update_chunk(db, action, chunk)
+            await _commit(db)
+            affected += count
+            if count < chunk_size:
+                return affected
+
+    @staticmethod
+    async def _update_chunk(db: AsyncSession, action: BulkAction, chunk: Any) -> int:
+        """Pause, resume or requeue the tasks selected by ``chunk``."""
+        now = datetime.now(timezone.utc)
+        if action == BulkAction.PAUSE:
+            event_type = TaskEventType.PAUSED
+            values: Dict[str, Any] = {"status": TaskStatus.PAUSED}
+        elif action == BulkAction.RESUME:
+            event_type = TaskEventType.RESUMED
+            status_type = Task.status.type
+            values = {
+                "status": case(
+                    (
+                        Task.scheduled_at > now,
+                        literal(TaskStatus.SCHEDULED, status_type),
                     ),
+                    else_=literal(TaskStatus.PENDING, status_type),
                 )
+            }
+        else:
+            event_type = TaskEventType.REQUEUED
+            values = {
+                "status": TaskStatus.PENDING,
+                "worker_id": None,
+                "started_at": None,
+                "completed_at": None,
+                "result": None,
+                "error": None,
+            }
+
+        selected = chunk.cte("selected")
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(select(selected.c.id)))
+            .values(updated_at=now, **values)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        tasks = result.scalars().all()
+        await emit_task_events(
+            db, [TaskEvent.from_task(event_type, task) for task in tasks]
+        )
+        return len(tasks)
+
+    @staticmethod
+    async def _delete_chunk(db: AsyncSession, chunk: Any) -> int:
+        """Delete the tasks selected by ``chunk``, failing their dependents."""
+        selected = chunk.cte("selected")
+        result = await db.execute(
+            select(Task).filter(Task.id.in_(select(selected.c.id)))  # type: ignore
+        )
+        tasks = result.scalars().all()
+        if not tasks:
+            return 0
+
+        ids = [task.id for task in tasks]
+        unfinished = [task.id for task in tasks if task.status != TaskStatus.COMPLETED]
+        failed = await TaskQueueService._fail_dependents(
+            db, unfinished, datetime.now(timezone.utc)
+        )
+        task_events = [
+            TaskEvent.from_task(TaskEventType.DELETED, task) for task in tasks
+        ]
+        task_events += [
+            TaskEvent.from_task(TaskEventType.FAILED, task)
+            for task in failed
+            if task.id not in ids
+        ]
+        await db.execute(
+            delete(Task)
+            .where(Task.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        for task in tasks:
+            db.expunge(task)
+        await emit_task_events(db, task_events)
+        return len(tasks)
+
+    @staticmethod
+    @traced("task_queue.claim_tasks")
+    async def claim_tasks(
+        db: AsyncSession, worker_id: Union[str, UUID], limit: int = 1
+    ) -> Sequence[Task]:
+        """Claim up to ``limit`` PENDING tasks for a worker.
+
+        The candidates are picked and marked RUNNING by a single
+        ``UPDATE ... RETURNING``, so the claim is atomic on PostgreSQL (with
+        ``SKIP LOCKED`` on the candidate rows) as well as on SQLite, which
+        ignores ``FOR UPDATE`` but serializes writes. SCHEDULED tasks are
+        only claimable once the scheduler has promoted them to PENDING. Tasks
+        are claimed in ``sort_key`` order; see ``app.services.ordering``.
+
+        With ``TASK_PARTITIONS`` above one, the worker first claims from its
+        preferred partition and tops up the batch from all partitions in the
+        same transaction; see ``app.services.partitions``.
+        """
+        current_time = datetime.now(timezone.utc)
+
+        tasks: List[Task] = []
+        partitions = preferred_partitions(worker_id)
+        if partitions is not None:
+            tasks.extend(
+                await TaskQueueService._claim(
+                    db, worker_id, limit, current_time, partitions
+                )
+            )
+        if len(tasks) < limit:
+            # Steal from the other partitions once the worker's own are empty
+            tasks.extend(
+                await TaskQueueService._claim(
+                    db, worker_id, limit - len(tasks), current_time
+                )
+            )
+        if not tasks:
+            await _commit(db)
+            return tasks
+
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.CLAIMED, task) for task in tasks]
+        )
+        await _commit(db)
+        return tasks
+
+    @staticmethod
+    @traced("task_queue.get_running_task_ids")
+    async def get_running_task_ids(
+        db: AsyncSession, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> List[str]:
+        """IDs of the given tasks that are still running on the worker.
+
+        Workers call this to find tasks paused or deleted while they ran.
+        """
+        if not task_ids:
+            return []
+        result = await db.execute(
+            select(Task.id).filter(  # type: ignore   # noqa
+                Task.id.in_([str(task_id) for task_id in task_ids]),
+                Task.status == TaskStatus.RUNNING,
+                Task.worker_id == str(worker_id),
+            )
+        )
+        return [str(task_id) for task_id in result.scalars().all()]
+
+    @staticmethod
+    @traced("task_queue.release_tasks")
+    async def release_tasks(
+        db: AsyncSession, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> Sequence[Task]:
+        """Put tasks a worker claimed but never started back to PENDING.
+
+        One ``UPDATE`` releases the whole batch. Tasks keep their ``sort_key``,
+        so they are claimed again ahead of tasks enqueued after them. Tasks
+        that are no longer running on the worker are left alone.
+        """
+        if not task_ids:
+            return []
+
+        current_time = datetime.now(timezone.utc)
+        stmt = (
+            update(Task)
+            .where(
+                Task.id.in_([str(task_id) for task_id in task_ids]),
+                Task.status == TaskStatus.RUNNING,
+                Task.worker_id == str(worker_id),
+            )
+            .values(
+                status=TaskStatus.PENDING,
+                started_at=None,
+                worker_id=None,
+                updated_at=current_time,
             )
-            .order_by(
-                Task.priority.desc(),
-                Task.scheduled_at.asc().nullsfirst(),
-                Task.created_at.asc(),
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        tasks = result.scalars().all()
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.REQUEUED, task) for task in tasks]
+        )
+        await _commit(db)
+        return tasks
+
+    @staticmethod
+    async def _claim(
+        db: AsyncSession,
+        worker_id: Union[str, UUID],
+        limit: int,
+        current_time: datetime,
+        partitions: Optional[Sequence[int]] = None,
+    ) -> Sequence[Task]:
+        """Mark up to ``limit`` PENDING tasks RUNNING, optionally by partition."""
+        candidates = select(Task.id).filter(  # type: ignore   # noqa
+            Task.status == TaskStatus.PENDING
+        )
+        if partitions is not None:
+            candidates = candidates.filter(Task.partition.in_(partitions))
+        candidates = (
+            candidates.order_by(Task.sort_key.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("candidates")
+        )
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(select(candidates.c.id)))
+            .values(
+                status=TaskStatus.RUNNING,
+                started_at=current_time,
+                worker_id=str(worker_id),
+                updated_at=current_time,
             )
-            .limit(1)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    @traced("task_queue.promote_due_tasks")
+    async def promote_due_tasks(db: AsyncSession, limit: int = 1000) -> Sequence[Task]:
+        """Move up to ``limit`` SCHEDULED tasks that are due to PENDING."""
+        current_time = datetime.now(timezone.utc)
+
+        due = (
+            select(Task.id)  # type: ignore   # noqa
+            .filter(
+                Task.status == TaskStatus.SCHEDULED,
+                Task.scheduled_at <= current_time,
+            )
+            .order_by(Task.scheduled_at.asc())
+            .limit(limit)
             .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(select(due.c.id)))
+            .values(status=TaskStatus.PENDING, updated_at=current_time)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
 
         result = await db.execute(stmt)
-        next_task = result.scalar_one_or_none()
+        tasks = result.scalars().all()
+        await emit_task_events(
+            db, [TaskEvent.from_task(TaskEventType.PROMOTED, task) for task in tasks]
+        )
+        await _commit(db)
+        return tasks
+
+    @staticmethod
+    @traced("task_queue.set_queue_weight")
+    async def set_queue_weight(
+        db: AsyncSession, queue: str, weight: float
+    ) -> TaskQueue:
+        """Set a queue's share of the workers in fair scheduling mode."""
+        db_queue = await db.get(TaskQueue, queue)
+        if db_queue is None:
+            db_queue = TaskQueue(name=queue, last_tag=0.0)
+        db_queue.weight = weight
+        db.add(db_queue)
+        await _commit(db)
+        await db.refresh(db_queue)
+        return db_queue
 
-        if next_task:
-            next_task.status = TaskStatus.RUNNING
-            next_task.started_at = current_time
-            next_task.worker_id = worker_id
-            next_task.updated_at = current_time
-            db.add(next_task)
-            await db.commit()
-            await db.refresh(next_task)
+    @staticmethod
+    @traced("task_queue.get_queue_stats")
+    async def get_queue_stats(db: AsyncSession) -> List[Dict[str, Any]]:
+        """Get per-queue backlog and wait time statistics.
+
+        Wait times are measured from when a task became ready to when it was
+        claimed, over the tasks claimed in the last
+        ``QUEUE_STATS_WINDOW_SECONDS``.
+        """
+        now = datetime.now(timezone.utc)
+        ready_epoch = _epoch(
+            db,
+            case(
+                (Task.scheduled_at > Task.created_at, Task.scheduled_at),
+                else_=Task.created_at,
+            ),
+        )
+        is_pending = Task.status == TaskStatus.PENDING
 
-        return next_task
+        backlog = await db.execute(
+            select(  # type: ignore   # noqa
+                Task.queue,
+                func.sum(case((is_pending, 1), else_=0)),
+                func.sum(case((is_pending, 0), else_=1)),
+                func.min(case((is_pending, ready_epoch))),
+            )
+            .filter(Task.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING]))
+            .group_by(Task.queue)
+        )
+        wait = _epoch(db, Task.started_at) - ready_epoch
+        window_start = now - timedelta(seconds=settings.QUEUE_STATS_WINDOW_SECONDS)
+        started = await db.execute(
+            select(  # type: ignore   # noqa
+                Task.queue, func.count(), func.avg(wait), func.max(wait)
+            )
+            .filter(Task.started_at >= window_start)
+            .group_by(Task.queue)
+        )
+        weights = await db.execute(select(TaskQueue.name, TaskQueue.weight))
+
+        stats: Dict[str, Dict[str, Any]] = {}
+
+        def queue_stats(queue: str) -> Dict[str, Any]:
+            return stats.setdefault(
+                queue,
+                {
+                    "queue": queue,
+                    "weight": 1.0,
+                    "pending": 0,
+                    "running": 0,
+                    "oldest_pending_wait_seconds": None,
+                    "started_recently": 0,
+                    "avg_wait_seconds": None,
+                    "max_wait_seconds": None,
+                },
+            )
+
+        for queue, pending, running, oldest_ready in backlog.all():
+            entry = queue_stats(queue)
+            entry["pending"] = int(pending or 0)
+            entry["running"] = int(running or 0)
+            if oldest_ready is not None:
+                entry["oldest_pending_wait_seconds"] = max(
+                    now.timestamp() - float(oldest_ready), 0.0
+                )
+        for queue, count, avg_wait, max_wait in started.all():
+            entry = queue_stats(queue)
+            entry["started_recently"] = count
+            entry["avg_wait_seconds"] = float(avg_wait)
+            entry["max_wait_seconds"] = float(max_wait)
+        for queue, weight in weights.all():
+            queue_stats(queue)["weight"] = weight
+        return [stats[queue] for queue in sorted(stats)]
 
     @staticmethod
+    @traced("task_queue.get_load_stats")
+    async def get_load_stats(
+        db: AsyncSession, group_by: str = "queue"
+    ) -> List[Dict[str, Any]]:
+        """Get per-queue or per-priority arrivals, backlog and service times.
+
+        Arrivals are the tasks that became ready, and service times those of
+        the tasks that finished, in the last ``QUEUE_STATS_WINDOW_SECONDS``.
+        """
+        group = Task.priority if group_by == "priority" else Task.queue
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(seconds=settings.QUEUE_STATS_WINDOW_SECONDS)
+        ready_epoch = _epoch(
+            db,
+            case(
+                (Task.scheduled_at > Task.created_at, Task.scheduled_at),
+                else_=Task.created_at,
+            ),
+        )
+        is_pending = Task.status == TaskStatus.PENDING
+        is_finished = Task.status.in_([TaskStatus.COMPLETED, TaskStatus.FAILED])
+        finished_recently = and_(
+            is_finished,
+            Task.started_at.isnot(None),
+            Task.completed_at >= window_start,
+        )
+        service_time = _epoch(db, Task.completed_at) - _epoch(db, Task.started_at)
+
+        # One scan of the recent and unfinished tasks
+        result = await db.execute(
+            select(  # type: ignore   # noqa
+                group,
+                func.sum(case((is_pending, 1), else_=0)),
+                func.sum(case((Task.status == TaskStatus.RUNNING, 1), else_=0)),
+                func.min(case((is_pending, ready_epoch))),
+                func.sum(
+                    case(
+                        (
+                            ready_epoch.between(
+                                window_start.timestamp(), now.timestamp()
+                            ),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ),
+                func.sum(case((finished_recently, 1), else_=0)),
+                func.avg(case((finished_recently, service_time))),
+            )
+            .filter(
+                or_(
+                    Task.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING]),
+                    Task.created_at >= window_start,
+                    Task.scheduled_at >= window_start,
+                    Task.completed_at >= window_start,
+                )
+            )
+            .group_by(group)
+        )
+        stats = []
+        for (
+            key,
+            pending,
+            running,
+            oldest_ready,
+            arrivals,
+            finished,
+            service,
+        ) in result.all():
+            stats.append(
+                {
+                    "group": key,
+                    "pending": int(pending or 0),
+                    "running": int(running or 0),
+                    "oldest_pending_wait_seconds": (
+                        max(now.timestamp() - float(oldest_ready), 0.0)
+                        if oldest_ready is not None
+                        else None
+                    ),
+                    "arrivals": int(arrivals or 0),
+                    "finished": int(finished or 0),
+                    "avg_service_seconds": (
+                        float(service) if service is not None else None
+                    ),
+                }
+            )
+        return sorted(stats, key=lambda entry: entry["group"])
+
+    @staticmethod
+    @traced("task_queue.get_next_due_at")
+    async def get_next_due_at(db: AsyncSession) -> Optional[datetime]:
+        """Get the earliest ``scheduled_at`` of the SCHEDULED tasks."""
+        result = await db.execute(
+            select(func.min(Task.scheduled_at)).filter(  # type: ignore   # noqa
+                Task.status == TaskStatus.SCHEDULED
+            )
+        )
+        next_due_at = result.scalar_one_or_none()
+        return _as_utc(next_due_at) if next_due_at else None
+
+    @staticmethod
+    @traced("task_queue.get_next_task")
+    async def get_next_task(
+        db: AsyncSession, worker_id: Union[str, UUID]
+    ) -> Optional[Task]:
+        """Get the next task to process for a worker."""
+        tasks = await TaskQueueService.claim_tasks(db, worker_id, limit=1)
+        return tasks[0] if tasks else None
+
+    @staticmethod
+    @traced("task_queue.complete_task")
     async def complete_task(
         db: AsyncSession,
         task_id: Union[str, UUID],
@@ -204,11 +859,19 @@ class TaskQueueService:
         db_task.updated_at = now
 
         db.add(db_task)
-        await db.commit()
+        await db.flush()
+        released = await TaskQueueService._release_dependents(db, [db_task.id], now)
+        await emit_task_events(
+            db,
+            [TaskEvent.from_task(TaskEventType.COMPLETED, db_task)]
+            + [TaskEvent.from_task(TaskEventType.RELEASED, task) for task in released],
+        )
+        await _commit(db)
         await db.refresh(db_task)
         return db_task
 
     @staticmethod
+    @traced("task_queue.fail_task")
     async def fail_task(
         db: AsyncSession, task_id: Union[str, UUID], error: str
     ) -> Optional[Task]:
@@ -224,6 +887,153 @@ class TaskQueueService:
         db_task.updated_at = now
 
         db.add(db_task)
-        await db.commit()
+        await db.flush()
+        failed = await TaskQueueService._fail_dependents(db, [db_task.id], now)
+        await emit_task_events(
+            db,
+            [
+                TaskEvent.from_task(TaskEventType.FAILED, task)
+                for task in [db_task, *failed]
+            ],
+        )
+        await _commit(db)
         await db.refresh(db_task)
         return db_task
+
+    @staticmethod
+    @traced("task_queue.ack_tasks")
+    async def ack_tasks(
+        db: AsyncSession, worker_id: Union[str, UUID], acks: Sequence[TaskAck]
+    ) -> Sequence[Task]:
+        """Complete or fail a batch of a worker's running tasks in one transaction.
+
+        A failed task acknowledged with ``retry_in`` is requeued instead, and
+        runs again after that many seconds. Acknowledgements for tasks that are
+        no longer running on the worker (for example because they were paused
+        in the meantime) are ignored.
+        """
+        acks_by_id = {str(ack.task_id): ack for ack in acks}
+        if not acks_by_id:
+            return []
+
+        result = await db.execute(
+            select(Task).filter(  # type: ignore   # noqa
+                Task.id.in_(list(acks_by_id)),
+                Task.status == TaskStatus.RUNNING,
+                Task.worker_id == str(worker_id),
+            )
+        )
+        tasks = result.scalars().all()
+
+        now = datetime.now(timezone.utc)
+        task_events = []
+        for task in tasks:
+            ack = acks_by_id[str(task.id)]
+            task.updated_at = now
+            if not ack.success and ack.retry_in is not None:
+                _requeue(task, ack, now)
+                task_events.append(TaskEvent.from_task(TaskEventType.REQUEUED, task))
+                continue
+            task.completed_at = now
+            if ack.success:
+                task.status = TaskStatus.COMPLETED
+                task.result = ack.result
+                task_events.append(TaskEvent.from_task(TaskEventType.COMPLETED, task))
+            else:
+                task.status = TaskStatus.FAILED
+                task.error = ack.error
+                task_events.append(TaskEvent.from_task(TaskEventType.FAILED, task))
+        await db.flush()
+
+        # Dependents of the whole batch are released or failed together
+        completed_ids = [t.id for t in tasks if t.status == TaskStatus.COMPLETED]
+        failed_ids = [t.id for t in tasks if t.status == TaskStatus.FAILED]
+        for task in await TaskQueueService._release_dependents(db, completed_ids, now):
+            task_events.append(TaskEvent.from_task(TaskEventType.RELEASED, task))
+        for task in await TaskQueueService._fail_dependents(db, failed_ids, now):
+            task_events.append(TaskEvent.from_task(TaskEventType.FAILED, task))
+
+        await emit_task_events(db, task_events)
+        await _commit(db)
+        return tasks
+
+    @staticmethod
+    async def _release_dependents(
+        db: AsyncSession, task_ids: Sequence[str], now: datetime
+    ) -> Sequence[Task]:
+        """Count completed tasks off their dependents' remaining dependencies.
+
+        One ``UPDATE`` decrements the counters of all BLOCKED dependents and
+        moves those left with none to PENDING (or SCHEDULED, if they are
+        scheduled for later). Returns the released tasks. Does not commit.
+        """
+        if not task_ids:
+            return []
+
+        completed = (
+            select(func.count())
+            .select_from(TaskDependency)
+            .where(
+                TaskDependency.task_id == Task.id,
+                TaskDependency.depends_on_id.in_(task_ids),
+            )
+            .scalar_subquery()
+        )
+        remaining = Task.remaining_dependencies - completed
+        dependents = select(TaskDependency.task_id).where(
+            TaskDependency.depends_on_id.in_(task_ids)
+        )
+        status_type = Task.status.type
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(dependents), Task.status == TaskStatus.BLOCKED)
+            .values(
+                remaining_dependencies=remaining,
+                status=case(
+                    (remaining > 0, literal(TaskStatus.BLOCKED, status_type)),
+                    (
+                        Task.scheduled_at > now,
+                        literal(TaskStatus.SCHEDULED, status_type),
+                    ),
+                    else_=literal(TaskStatus.PENDING, status_type),
+                ),
+                updated_at=now,
+            )
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        return [
+            task for task in result.scalars().all() if task.status != TaskStatus.BLOCKED
+        ]
+
+    @staticmethod
+    async def _fail_dependents(
+        db: AsyncSession, task_ids: Sequence[str], now: datetime
+    ) -> List[Task]:
+        """Fail the BLOCKED tasks depending on failed tasks, transitively.
+
+        Runs one ``UPDATE`` per level of the dependency graph and returns the
+        failed tasks. Does not commit.
+        """
+        failed: List[Task] = []
+        while task_ids:
+            dependents = select(TaskDependency.task_id).where(
+                TaskDependency.depends_on_id.in_(task_ids)
+            )
+            result = await db.execute(
+                update(Task)
+                .where(Task.id.in_(dependents), Task.status == TaskStatus.BLOCKED)
+                .values(
+                    status=TaskStatus.FAILED,
+                    error="A dependency failed",
+                    completed_at=now,
+                    updated_at=now,
+                )
+                .returning(Task)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            tasks = result.scalars().all()
+            failed.extend(tasks)
+            task_ids = [task.id for task in tasks]
+        return failed
@@ -3,16 +3,36 @@
 This module provides methods for managing worker entities, including
 creating, retrieving, and updating worker records in the database.
 """
-from datetime import datetime, timezone
-from typing import Optional, Sequence, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import and_, case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.db.models import Worker
+from app.db.models import Task, TaskStatus, Worker
 from app.schemas.task import WorkerCreate
 
+# Window over which finished tasks count towards a worker's throughput
+THROUGHPUT_WINDOW = timedelta(minutes=1)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (as returned by SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def worker_load(
+    worker: Worker, running: int, completed: int, now: datetime
+) -> Dict[str, Any]:
+    """Load statistics of a worker."""
+    return {
+        "running": running,
+        "completed_last_minute": completed,
+        "heartbeat_age_seconds": (now - _as_utc(worker.last_heartbeat)).total_seconds(),
+    }
+
 
 class WorkerService:
     """Service class for managing workers in the task queue system.
@@ -22,10 +42,17 @@ class WorkerService:
     """
 
     @staticmethod
-    async def create_worker(db: AsyncSession, worker_in: WorkerCreate) -> Worker:
-        """Create a new worker in the database."""
+    async def create_worker(
+        db: AsyncSession, worker_in: WorkerCreate, worker_id: Optional[str] = None
+    ) -> Worker:
+        """Create a new worker in the database.
+
+        ``worker_id`` registers the worker under an existing ID, as the sharded
+        backend does to register it in every shard.
+        """
         now = datetime.now(timezone.utc)
         db_worker = Worker(
+            id=worker_id,
             name=worker_in.name,
             status=worker_in.status,
             last_heartbeat=now,
@@ -42,7 +69,7 @@ class WorkerService:
         db: AsyncSession, worker_id: Union[str, UUID]
     ) -> Optional[Worker]:
         """Get a worker by ID."""
-        result = await db.execute(select(Worker).filter(Worker.id == worker_id))  # type: ignore    # noqa
+        result = await db.execute(select(Worker).filter(Worker.id == str(worker_id)))  # type: ignore    # noqa
         return result.scalar_one_or_none()
 
     @staticmethod
@@ -53,6 +80,61 @@ class WorkerService:
         result = await db.execute(select(Worker).offset(skip).limit(limit))  # type: ignore    # noqa
         return result.scalars().all()
 
+    @staticmethod
+    async def list_workers(
+        db: AsyncSession,
+        after: Optional[Union[str, UUID]] = None,
+        limit: int = 100,
+        with_stats: bool = False,
+    ) -> List[Tuple[Worker, Optional[Dict[str, Any]]]]:
+        """Get a page of workers in ID order, starting after the ID ``after``.
+
+        With ``with_stats``, each worker comes with its load statistics, from
+        one query joining the page to a grouped aggregate of its tasks: the
+        number running, the number completed in the last minute and the age
+        of its heartbeat.
+        """
+        page = select(Worker).order_by(Worker.id).limit(limit)
+        if after is not None:
+            page = page.filter(Worker.id > str(after))
+        if not with_stats:
+            result = await db.execute(page)
+            return [(worker, None) for worker in result.scalars().all()]
+
+        now = datetime.now(timezone.utc)
+        cutoff = now - THROUGHPUT_WINDOW
+        page_cte = page.cte("page")
+        is_running = Task.status == TaskStatus.RUNNING
+        load = (
+            select(
+                Task.worker_id,
+                func.sum(case((is_running, 1), else_=0)).label("running"),
+                func.sum(case((is_running, 0), else_=1)).label("completed"),
+            )
+            .filter(
+                Task.worker_id.in_(select(page_cte.c.id)),
+                or_(
+                    is_running,
+                    and_(
+                        Task.status == TaskStatus.COMPLETED,
+                        Task.completed_at >= cutoff,
+                    ),
+                ),
+            )
+            .group_by(Task.worker_id)
+            .subquery("load")
+        )
+        worker = aliased(Worker, page_cte)
+        result = await db.execute(
+            select(worker, load.c.running, load.c.completed)
+            .outerjoin(load, load.c.worker_id == worker.id)
+            .order_by(worker.id)
+        )
+        return [
+            (row[0], worker_load(row[0], row[1] or 0, row[2] or 0, now))
+            for row in result.all()
+        ]
+
     @staticmethod
     async def update_heartbeat(
         db: AsyncSession, worker_id: Union[str, UUID]
@@ -0,0 +1,264 @@
+"""Command line interface for the task queue benchmarks.
+
+Usage:
+    python -m benchmarks run --workers 1,4,16 --table-sizes 0,100000 \\
+        --output results.json
+    python -m benchmarks run --workers 16,64 --partitions 16 --output parts.json
+    python -m benchmarks compare baseline.json results.json
+    python -m benchmarks startup --runs 5
+    python -m benchmarks compression --payload-kb 200 --tasks 200
+    python -m benchmarks records --tasks 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from benchmarks.compression import run_compression, summarize_compression
+from benchmarks.load import create_schema, run_scenario, summarize
+from benchmarks.records import run_records, summarize_records
+from benchmarks.startup import run_startup, summarize_startup
+
+SQLITE_FALLBACK_URL = "sqlite+aiosqlite:///./benchmark.db"
+
+# Metrics where a higher value is better; all other compared metrics are
+# latencies where lower is better
+THROUGHPUT_METRICS = ("enqueue_per_sec", "claim_per_sec")
+LATENCY_METRICS = (
+    "pickup_latency_p50_ms",
+    "pickup_latency_p99_ms",
+    "claim_latency_p50_ms",
+    "claim_latency_p99_ms",
+)
+
+
+def parse_int_list(value: str) -> List[int]:
+    """Parse a comma separated list of integers."""
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def default_database_url() -> str:
+    """Use DATABASE_URL if set, falling back to a local SQLite file."""
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        return SQLITE_FALLBACK_URL
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+def git_revision() -> str:
+    """Return the current git commit, or "unknown" outside a checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Task queue benchmarks"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser(
+        "run",
+        help="Measure enqueue/dequeue throughput and latency",
+        description=(
+            "Run producers and workers against a database. Use a dedicated "
+            "database: rows named benchmark-* are deleted before and after "
+            "each scenario."
+        ),
+    )
+    run.add_argument("--database-url", default=default_database_url())
+    run.add_argument(
+        "--workers",
+        type=parse_int_list,
+        default=[1, 4, 16],
+        help="Comma separated worker counts to measure",
+    )
+    run.add_argument(
+        "--table-sizes",
+        type=parse_int_list,
+        default=[0],
+        help="Comma separated numbers of finished rows to preload",
+    )
+    run.add_argument("--tasks", type=int, default=2000, help="Tasks per scenario")
+    run.add_argument("--producers", type=int, default=4)
+    run.add_argument(
+        "--batch-size", type=int, default=1, help="Tasks claimed per worker call"
+    )
+    run.add_argument(
+        "--partitions",
+        type=int,
+        default=settings.TASK_PARTITIONS,
+        help="Ready queue partitions (TASK_PARTITIONS) to run with",
+    )
+    run.add_argument("--output", help="Write results as JSON to this file")
+
+    compare = subparsers.add_parser(
+        "compare", help="Compare two result files and flag regressions"
+    )
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change treated as a regression (default: 0.10)",
+    )
+
+    startup = subparsers.add_parser(
+        "startup", help="Measure worker and API cold start costs"
+    )
+    startup.add_argument("--database-url", default=default_database_url())
+    startup.add_argument(
+        "--runs", type=int, default=5, help="Measurements per metric (median)"
+    )
+    startup.add_argument("--output", help="Write results as JSON to this file")
+
+    compression = subparsers.add_parser(
+        "compression", help="Measure storage and throughput of payload codecs"
+    )
+    compression.add_argument("--database-url", default=default_database_url())
+    compression.add_argument("--tasks", type=int, default=200)
+    compression.add_argument(
+        "--payload-kb", type=int, default=200, help="Size of each task's payload"
+    )
+    compression.add_argument("--output", help="Write results as JSON to this file")
+
+    records = subparsers.add_parser(
+        "records", help="Measure the memory held by in-flight claimed tasks"
+    )
+    records.add_argument("--database-url", default=default_database_url())
+    records.add_argument("--tasks", type=int, default=10000)
+    records.add_argument("--output", help="Write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every worker count and table size combination."""
+    settings.TASK_PARTITIONS = args.partitions
+    engine = create_async_engine(
+        args.database_url,
+        pool_size=max(args.workers) + args.producers,
+        max_overflow=0,
+    )
+    await create_schema(engine)
+    results = []
+    try:
+        for table_size in args.table_sizes:
+            for workers in args.workers:
+                print(
+                    f"Running {workers} workers with {table_size} preloaded rows...",
+                    file=sys.stderr,
+                )
+                results.append(
+                    await run_scenario(
+                        engine,
+                        workers=workers,
+                        table_size=table_size,
+                        tasks=args.tasks,
+                        producers=args.producers,
+                        batch_size=args.batch_size,
+                    )
+                )
+    finally:
+        await engine.dispose()
+
+    print(summarize(results))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "partitions": args.partitions,
+        },
+        "results": [result.to_dict() for result in results],
+    }
+
+
+async def compress(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the payload compression benchmark."""
+    engine = create_async_engine(args.database_url)
+    try:
+        return await run_compression(engine, args.tasks, args.payload_kb)
+    finally:
+        await engine.dispose()
+
+
+async def measure_records(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the in-flight task memory benchmark."""
+    engine = create_async_engine(args.database_url)
+    try:
+        return await run_records(engine, args.tasks)
+    finally:
+        await engine.dispose()
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Print metric changes between two runs, returning 1 on regression."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    def key(result: Dict[str, Any]) -> tuple:
+        return (result["workers"], result["table_size"])
+
+    baseline_by_key = {key(result): result for result in baseline["results"]}
+    regressed = False
+    for result in candidate["results"]:
+        previous = baseline_by_key.get(key(result))
+        if previous is None:
+            continue
+        workers, table_size = key(result)
+        print(f"workers={workers} table_size={table_size}")
+        for metric in THROUGHPUT_METRICS + LATENCY_METRICS:
+            old, new = previous[metric], result[metric]
+            change = (new - old) / old if old else 0.0
+            worse = -change if metric in THROUGHPUT_METRICS else change
+            flag = ""
+            if worse > args.threshold:
+                regressed = True
+                flag = "  REGRESSION"
+            print(f"  {metric:<24} {old:>10.1f} -> {new:>10.1f} {change:>+8.1%}{flag}")
+    return 1 if regressed else 0
+
+
+def main(argv: List[str]) -> int:
+    """Entry point for the benchmark CLI."""
+    args = parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+
+    if args.command == "startup":
+        report = run_startup(args.database_url, args.runs)
+        print(summarize_startup(report))
+    elif args.command == "compression":
+        report = asyncio.run(compress(args))
+        print(summarize_compression(report))
+    elif args.command == "records":
+        report = asyncio.run(measure_records(args))
+        print(summarize_records(report))
+    else:
+        report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+"""Storage and throughput impact of payload compression.
+
+For every codec, enqueues tasks carrying a generated payload of the given size
+through ``TaskQueueService``, reads them back, and reports the bytes stored in
+the ``payload`` column along with enqueue and read throughput. Rows are named
+with the ``benchmark-`` prefix and removed after each codec.
+"""
+import random
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.config import settings
+from app.db.compression import zstandard
+from app.db.models import Task
+from app.schemas.task import TaskCreate
+from app.services.task_queue import TaskQueueService
+from benchmarks.load import NAME_PREFIX, cleanup, create_schema
+
+
+def generate_payload(size_bytes: int, seed: int = 0) -> Dict[str, Any]:
+    """JSON payload of about ``size_bytes``, shaped like a batch of records."""
+    rng = random.Random(seed)
+    records: List[Dict[str, Any]] = []
+    size = 0
+    while size < size_bytes:
+        record = {
+            "id": rng.randrange(10**9),
+            "customer": f"customer-{rng.randrange(1000)}",
+            "status": rng.choice(["new", "paid", "shipped", "returned"]),
+            "amount": round(rng.uniform(1, 1000), 2),
+            "tags": rng.sample(["a", "b", "c", "d", "e", "f"], 3),
+        }
+        records.append(record)
+        size += len(str(record))
+    return {"records": records}
+
+
+async def run_codec(
+    engine: AsyncEngine, codec: str, tasks: int, payload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Enqueue and read back ``tasks`` tasks with one codec."""
+    settings.PAYLOAD_COMPRESSION = codec
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    await cleanup(engine)
+    try:
+        ids = []
+        start = time.perf_counter()
+        async with session_factory() as db:
+            for index in range(tasks):
+                task = await TaskQueueService.create_task(
+                    db, TaskCreate(name=f"{NAME_PREFIX}{index}", payload=payload)
+                )
+                ids.append(task.id)
+        enqueue_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async with session_factory() as db:
+            for task_id in ids:
+                task = await TaskQueueService.get_task(db, task_id)
+                assert task is not None and task.payload == payload
+        read_seconds = time.perf_counter() - start
+
+        async with engine.connect() as conn:
+            stored = await conn.scalar(
+                select(func.sum(func.length(Task.payload))).where(
+                    Task.name.startswith(NAME_PREFIX)
+                )
+            )
+    finally:
+        await cleanup(engine)
+    return {
+        "codec": codec,
+        "stored_bytes_per_task": stored / tasks,
+        "enqueue_per_sec": tasks / enqueue_seconds,
+        "read_per_sec": tasks / read_seconds,
+    }
+
+
+async def run_compression(
+    engine: AsyncEngine, tasks: int, payload_kb: int
+) -> Dict[str, Any]:
+    """Compare every available codec on the same payload."""
+    await create_schema(engine)
+    payload = generate_payload(payload_kb * 1024)
+    codecs = ["none", "zlib"] + (["zstd"] if zstandard is not None else [])
+    original = settings.PAYLOAD_COMPRESSION
+    try:
+        results = [await run_codec(engine, codec, tasks, payload) for codec in codecs]
+    finally:
+        settings.PAYLOAD_COMPRESSION = original
+    return {"payload_kb": payload_kb, "tasks": tasks, "results": results}
+
+
+def summarize_compression(report: Dict[str, Any]) -> str:
+    """Format a compression report as a table."""
+    baseline = report["results"][0]["stored_bytes_per_task"]
+    lines = [
+        f"{report['tasks']} tasks with a {report['payload_kb']} KB payload",
+        f"{'codec':<6} {'bytes/task':>12} {'ratio':>7} "
+        f"{'enqueue/s':>10} {'read/s':>10}",
+    ]
+    for result in report["results"]:
+        lines.append(
+            f"{result['codec']:<6} {result['stored_bytes_per_task']:>12.0f} "
+            f"{baseline / result['stored_bytes_per_task']:>6.1f}x "
+            f"{result['enqueue_per_sec']:>10.1f} {result['read_per_sec']:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,218 @@
+"""Load generation for enqueue and dequeue throughput and latency.
+
+Each scenario preloads the tasks table with finished filler rows, then runs
+producer coroutines that enqueue tasks alongside worker coroutines that claim
+and acknowledge them through ``TaskQueueService``. All rows created by a
+scenario are named with the ``benchmark-`` prefix and removed afterwards.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.db.models import Base, Task, TaskStatus, Worker
+from app.schemas.task import TaskAck, TaskCreate, WorkerCreate
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+NAME_PREFIX = "benchmark-"
+FILLER_CHUNK_SIZE = 5000
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements of a single benchmark scenario."""
+
+    workers: int
+    table_size: int
+    tasks: int
+    producers: int
+    batch_size: int
+    enqueue_per_sec: float
+    claim_per_sec: float
+    pickup_latency_p50_ms: float
+    pickup_latency_p99_ms: float
+    claim_latency_p50_ms: float
+    claim_latency_p99_ms: float
+    claim_calls: int
+    empty_claims: int
+    contention_ratio: float
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert the result to a JSON serialisable dict."""
+        return asdict(self)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Return the value at ``fraction`` of the sorted values (nearest rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def epoch_seconds(value: datetime) -> float:
+    """Convert a stored timestamp to epoch seconds, assuming UTC if naive."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    """Create the queue tables if they don't exist."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def cleanup(engine: AsyncEngine) -> None:
+    """Remove every row created by the benchmark."""
+    async with engine.begin() as conn:
+        await conn.execute(delete(Task).where(Task.name.startswith(NAME_PREFIX)))
+        await conn.execute(delete(Worker).where(Worker.name.startswith(NAME_PREFIX)))
+
+
+async def preload(engine: AsyncEngine, table_size: int) -> None:
+    """Fill the tasks table with completed filler rows."""
+    now = datetime.now(timezone.utc)
+    remaining = table_size
+    while remaining > 0:
+        chunk = min(remaining, FILLER_CHUNK_SIZE)
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": f"{NAME_PREFIX}filler",
+                "queue": "default",
+                "payload": {},
+                "status": TaskStatus.COMPLETED,
+                "priority": "MEDIUM",
+                "created_at": now,
+                "updated_at": now,
+                "completed_at": now,
+            }
+            for _ in range(chunk)
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert(Task), rows)
+        remaining -= chunk
+
+
+async def run_scenario(
+    engine: AsyncEngine,
+    workers: int,
+    table_size: int,
+    tasks: int,
+    producers: int,
+    batch_size: int,
+) -> ScenarioResult:
+    """Run producers and workers concurrently and measure the queue."""
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    await cleanup(engine)
+    await preload(engine, table_size)
+
+    worker_ids = []
+    for index in range(workers):
+        async with session_factory() as db:
+            worker = await WorkerService.create_worker(
+                db=db, worker_in=WorkerCreate(name=f"{NAME_PREFIX}worker-{index}")
+            )
+            worker_ids.append(worker.id)
+
+    pickup_latencies: List[float] = []
+    claim_latencies: List[float] = []
+    claim_times: List[float] = []
+    counters = {"claimed": 0, "calls": 0, "empty": 0}
+    producers_done = asyncio.Event()
+
+    async def producer(count: int) -> None:
+        for _ in range(count):
+            async with session_factory() as db:
+                await TaskQueueService.create_task(
+                    db=db,
+                    task_in=TaskCreate(name=f"{NAME_PREFIX}task", payload={"n": 1}),
+                )
+
+    async def worker(worker_id: str) -> None:
+        while counters["claimed"] < tasks:
+            started = time.perf_counter()
+            async with session_factory() as db:
+                claimed = await TaskQueueService.claim_tasks(
+                    db=db, worker_id=worker_id, limit=batch_size
+                )
+            finished = time.perf_counter()
+            claimed_at = time.time()
+            counters["calls"] += 1
+            claim_latencies.append(finished - started)
+
+            if not claimed:
+                # Work is still outstanding, so the worker either outran the
+                # producers or lost the race for the head of the queue
+                counters["empty"] += 1
+                await asyncio.sleep(0.001 if producers_done.is_set() else 0.005)
+                continue
+
+            counters["claimed"] += len(claimed)
+            for task in claimed:
+                claim_times.append(finished)
+                pickup_latencies.append(claimed_at - epoch_seconds(task.created_at))
+            async with session_factory() as db:
+                await TaskQueueService.ack_tasks(
+                    db=db,
+                    worker_id=worker_id,
+                    acks=[TaskAck(task_id=task.id) for task in claimed],
+                )
+
+    per_producer, extra = divmod(tasks, producers)
+    enqueue_started = time.perf_counter()
+    worker_runs = [asyncio.create_task(worker(worker_id)) for worker_id in worker_ids]
+    await asyncio.gather(
+        *(producer(per_producer + (1 if i < extra else 0)) for i in range(producers))
+    )
+    enqueue_elapsed = time.perf_counter() - enqueue_started
+    producers_done.set()
+    await asyncio.gather(*worker_runs)
+
+    claim_elapsed = (max(claim_times) - enqueue_started) if claim_times else 0.0
+    await cleanup(engine)
+
+    return ScenarioResult(
+        workers=workers,
+        table_size=table_size,
+        tasks=tasks,
+        producers=producers,
+        batch_size=batch_size,
+        enqueue_per_sec=tasks / enqueue_elapsed if enqueue_elapsed else 0.0,
+        claim_per_sec=counters["claimed"] / claim_elapsed if claim_elapsed else 0.0,
+        pickup_latency_p50_ms=percentile(pickup_latencies, 0.50) * 1000,
+        pickup_latency_p99_ms=percentile(pickup_latencies, 0.99) * 1000,
+        claim_latency_p50_ms=percentile(claim_latencies, 0.50) * 1000,
+        claim_latency_p99_ms=percentile(claim_latencies, 0.99) * 1000,
+        claim_calls=counters["calls"],
+        empty_claims=counters["empty"],
+        contention_ratio=(
+            counters["empty"] / counters["calls"] if counters["calls"] else 0.0
+        ),
+    )
+
+
+def summarize(results: Sequence[ScenarioResult]) -> str:
+    """Format scenario results as a plain text table."""
+    header = (
+        f"{'workers':>8} {'rows':>9} {'enqueue/s':>10} {'claim/s':>10} "
+        f"{'p50 ms':>9} {'p99 ms':>9} {'contention':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.workers:>8} {result.table_size:>9} "
+            f"{result.enqueue_per_sec:>10.1f} {result.claim_per_sec:>10.1f} "
+            f"{result.pickup_latency_p50_ms:>9.1f} "
+            f"{result.pickup_latency_p99_ms:>9.1f} "
+            f"{result.contention_ratio:>10.2%}"
+        )
+    return "\n".join(lines)
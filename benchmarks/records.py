@@ -0,0 +1,115 @@
+"""Memory held by a worker's in-flight tasks, per representation.
+
+Claims ``tasks`` tasks in one go and measures with ``tracemalloc`` what holding
+them costs in each of the representations a worker could keep:
+
+* ``orm``: the SQLAlchemy ``Task`` instances, with their session still open,
+  as they come out of ``TaskQueueService.claim_tasks``;
+* ``pydantic``: the API ``Task`` schema the worker used to validate them into;
+* ``record``: the slotted ``TaskRecord`` of worker/record.py.
+
+It also reports how long the claim, including the conversion, takes. Rows are
+named with the ``benchmark-`` prefix and removed afterwards.
+"""
+import gc
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.db.models import Task, TaskStatus
+from app.schemas.task import Task as TaskSchema
+from app.services.task_queue import TaskQueueService
+from benchmarks.load import NAME_PREFIX, cleanup, create_schema
+from worker.record import TaskRecord
+
+
+async def enqueue(engine: AsyncEngine, tasks: int) -> None:
+    """Insert ``tasks`` PENDING tasks with a small payload."""
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"{NAME_PREFIX}{index}",
+            "payload": {"customer": index, "action": "send-invoice"},
+            "status": TaskStatus.PENDING,
+            "sort_key": float(index),
+        }
+        for index in range(tasks)
+    ]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Task), rows)
+
+
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "orm": lambda task: task,
+    "pydantic": TaskSchema.model_validate,
+    "record": TaskRecord.from_row,
+}
+
+
+async def held_after_claim(
+    engine: AsyncEngine, tasks: int, convert: Callable[[Any], Any]
+) -> Dict[str, float]:
+    """Memory still allocated while the converted claimed tasks are held.
+
+    Measured after the claim's session is closed and the ORM objects are
+    dropped, except for ``orm`` where they are what is held.
+    """
+    await cleanup(engine)
+    await enqueue(engine, tasks)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    session = session_factory()
+    claimed = await TaskQueueService.claim_tasks(session, str(uuid.uuid4()), tasks)
+    held = [convert(task) for task in claimed]
+    elapsed = time.perf_counter() - start
+    if convert is not CONVERTERS["orm"]:
+        del claimed
+        await session.close()
+    gc.collect()
+    held_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(held)
+    del held
+    await session.close()
+    return {"count": count, "bytes": held_bytes, "seconds": elapsed}
+
+
+async def run_records(engine: AsyncEngine, tasks: int) -> Dict[str, Any]:
+    """Compare the memory footprint of the task representations."""
+    await create_schema(engine)
+    results = []
+    try:
+        for name, convert in CONVERTERS.items():
+            result = await held_after_claim(engine, tasks, convert)
+            results.append(
+                {
+                    "representation": name,
+                    "tasks": result["count"],
+                    "bytes_per_task": result["bytes"] / max(result["count"], 1),
+                    "total_mb": result["bytes"] / 2**20,
+                    "claim_ms": result["seconds"] * 1000,
+                }
+            )
+    finally:
+        await cleanup(engine)
+    return {"tasks": tasks, "results": results}
+
+
+def summarize_records(report: Dict[str, Any]) -> str:
+    """Format a record memory report as a table."""
+    lines = [
+        f"{report['tasks']} in-flight tasks",
+        f"{'representation':<15} {'bytes/task':>11} {'total MB':>9} {'claim ms':>9}",
+    ]
+    for result in report["results"]:
+        lines.append(
+            f"{result['representation']:<15} {result['bytes_per_task']:>11.0f} "
+            f"{result['total_mb']:>9.1f} {result['claim_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
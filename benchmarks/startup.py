@@ -0,0 +1,103 @@
+"""Cold start benchmarks.
+
+Measures, in fresh interpreters, how long importing an entry point takes and
+which heavy dependencies it pulls in, and how long the API's schema step takes
+on a database that is already up to date.
+"""
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.models import Base
+from app.db.schema import prepare_schema
+
+# Dependencies a worker talking to the API over HTTP doesn't need
+HEAVY_MODULES = ("fastapi", "sqlalchemy", "asyncpg", "aiosqlite", "httpx")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure_import(module: str, runs: int) -> Dict[str, Any]:
+    """Median import time of ``module`` over ``runs`` fresh interpreters."""
+    samples = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES),
+            ],
+            text=True,
+        )
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe["seconds"])
+        loaded = probe["loaded"]
+    return {
+        "module": module,
+        "import_ms_p50": statistics.median(samples) * 1000,
+        "heavy_modules_loaded": loaded,
+    }
+
+
+async def measure_schema_step(database_url: str, runs: int) -> Dict[str, Any]:
+    """Median time of ``create_all`` and of the revision check on a ready schema."""
+    engine = create_async_engine(database_url)
+    try:
+        await prepare_schema(engine, Base.metadata)
+        create_all, check = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            create_all.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            await prepare_schema(engine, Base.metadata)
+            check.append(time.perf_counter() - start)
+    finally:
+        await engine.dispose()
+    return {
+        "create_all_ms_p50": statistics.median(create_all) * 1000,
+        "revision_check_ms_p50": statistics.median(check) * 1000,
+    }
+
+
+def run_startup(database_url: str, runs: int) -> Dict[str, Any]:
+    """Run every cold start measurement."""
+    return {
+        "imports": [
+            measure_import(module, runs) for module in ("worker.main", "app.main")
+        ],
+        "schema": asyncio.run(measure_schema_step(database_url, runs)),
+    }
+
+
+def summarize_startup(report: Dict[str, Any]) -> str:
+    """Format a startup report as a table."""
+    lines = [f"{'module':<14} {'import ms':>10}  heavy modules loaded"]
+    for result in report["imports"]:
+        loaded = ", ".join(result["heavy_modules_loaded"]) or "-"
+        lines.append(
+            f"{result['module']:<14} {result['import_ms_p50']:>10.1f}  {loaded}"
+        )
+    schema = report["schema"]
+    lines.append(f"create_all on a ready schema: {schema['create_all_ms_p50']:.1f} ms")
+    lines.append(
+        f"schema revision check:        {schema['revision_check_ms_p50']:.1f} ms"
+    )
+    return "\n".join(lines)
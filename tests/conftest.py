@@ -0,0 +1,25 @@
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    # Create an in-memory SQLite database for testing
+    # Using SQLite for simplicity, although it has limited async support
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    TestingSessionLocal = sessionmaker(
+        class_=AsyncSession, expire_on_commit=False, bind=engine
+    )
+
+    async with TestingSessionLocal() as session:
+        yield session
+        # Clean up
+        await session.close()
+
+    await engine.dispose()
@@ -0,0 +1,88 @@
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.db.models import TaskStatus
+from app.schemas.task import BulkAction, TaskAck, TaskCreate, TaskFilter
+from app.services.backends import InMemoryBackend
+from app.services.task_queue import TaskQueueService
+
+
+async def create_tasks(db, name, count):
+    return [
+        await TaskQueueService.create_task(db, TaskCreate(name=name, payload={}))
+        for _ in range(count)
+    ]
+
+
+async def statuses(db, tasks):
+    return [(await TaskQueueService.get_task(db, task.id)).status for task in tasks]
+
+
+@pytest.mark.asyncio
+async def test_bulk_pause_and_resume_by_name(db_session):
+    reports = await create_tasks(db_session, "report", 5)
+    emails = await create_tasks(db_session, "email", 2)
+
+    paused = await TaskQueueService.bulk_action(
+        db_session, BulkAction.PAUSE, TaskFilter(name="report"), chunk_size=2
+    )
+    assert paused == 5
+    assert await statuses(db_session, reports) == [TaskStatus.PAUSED] * 5
+    assert await statuses(db_session, emails) == [TaskStatus.PENDING] * 2
+
+    resumed = await TaskQueueService.bulk_action(
+        db_session, BulkAction.RESUME, TaskFilter(name="report"), chunk_size=2
+    )
+    assert resumed == 5
+    assert await statuses(db_session, reports) == [TaskStatus.PENDING] * 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_requeue_failed_and_delete_completed(db_session):
+    tasks = await create_tasks(db_session, "job", 4)
+    worker_id = str(uuid.uuid4())
+    claimed = await TaskQueueService.claim_tasks(db_session, worker_id, limit=4)
+    await TaskQueueService.ack_tasks(
+        db_session,
+        worker_id,
+        [
+            TaskAck(task_id=task.id, success=index % 2 == 0, error="boom")
+            for index, task in enumerate(claimed)
+        ],
+    )
+
+    requeued = await TaskQueueService.bulk_action(
+        db_session, BulkAction.REQUEUE, TaskFilter(name="job")
+    )
+    assert requeued == 2
+    deleted = await TaskQueueService.bulk_action(
+        db_session, BulkAction.DELETE, TaskFilter(status="completed"), chunk_size=1
+    )
+    assert deleted == 2
+
+    remaining = await TaskQueueService.get_tasks(db_session)
+    assert len(remaining) == 2
+    assert {task.status for task in remaining} == {TaskStatus.PENDING}
+    assert all(task.error is None and task.worker_id is None for task in remaining)
+    assert {task.id for task in remaining} < {task.id for task in tasks}
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_bulk_actions():
+    backend = InMemoryBackend()
+    for name in ["report", "report", "email"]:
+        await backend.create_task(TaskCreate(name=name, payload={}))
+
+    assert await backend.bulk_action(BulkAction.PAUSE, TaskFilter(name="report")) == 2
+    assert (
+        await backend.bulk_action(BulkAction.RESUME, TaskFilter(status="paused")) == 2
+    )
+    assert await backend.bulk_action(BulkAction.DELETE, TaskFilter(name="email")) == 1
+    assert await backend.get_tasks_count() == 2
+
+
+def test_filter_must_not_match_everything():
+    with pytest.raises(ValidationError):
+        TaskFilter()
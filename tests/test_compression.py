@@ -0,0 +1,51 @@
+import json
+import zlib
+
+import pytest
+from sqlalchemy import LargeBinary, select, type_coerce
+
+from app.core.config import settings
+from app.db.compression import ZLIB_MARKER, canonical_json, decode, encode
+from app.db.models import Task
+from app.schemas.task import TaskCreate
+from app.services.task_queue import TaskQueueService
+
+LARGE = {"records": [{"id": index, "status": "shipped"} for index in range(500)]}
+
+
+def test_small_values_are_stored_as_canonical_json():
+    stored = encode({"b": 1, "a": [1, 2]}, "zlib", threshold=1024)
+    assert stored == b'{"a":[1,2],"b":1}'
+    assert decode(stored) == {"b": 1, "a": [1, 2]}
+
+
+def test_large_values_are_compressed():
+    stored = encode(LARGE, "zlib", threshold=1024)
+    assert stored[0] == ZLIB_MARKER
+    assert len(stored) < len(canonical_json(LARGE)) / 5
+    assert decode(stored) == LARGE
+    assert encode(LARGE, "none", threshold=1024) == canonical_json(LARGE)
+
+
+def test_values_written_before_compression_are_readable():
+    legacy = json.dumps(LARGE, indent=2)
+    assert decode(legacy.encode()) == LARGE
+    assert decode(legacy) == LARGE
+    assert decode(memoryview(zlib.compress(legacy.encode()))) == LARGE
+
+
+@pytest.mark.asyncio
+async def test_task_payload_roundtrip(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "PAYLOAD_COMPRESSION", "zlib")
+    task = await TaskQueueService.create_task(
+        db_session, TaskCreate(name="big", payload=LARGE)
+    )
+    stored = await db_session.scalar(
+        select(type_coerce(Task.payload, LargeBinary)).where(Task.id == task.id)
+    )
+    assert stored[0] == ZLIB_MARKER
+
+    db_session.expunge_all()
+    loaded = await TaskQueueService.get_task(db_session, task.id)
+    assert loaded.payload == LARGE
+    assert loaded.result is None
@@ -0,0 +1,97 @@
+import uuid
+
+import pytest
+
+from app.db.models import TaskStatus
+from app.schemas.task import TaskAck, TaskCreate
+from app.services.backends import InMemoryBackend
+from app.services.task_queue import TaskQueueService
+
+
+async def create(db_session, name, depends_on=()):
+    return await TaskQueueService.create_task(
+        db_session,
+        TaskCreate(name=name, payload={}, depends_on=[task.id for task in depends_on]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_fan_in_released_on_completion(db_session):
+    worker_id = str(uuid.uuid4())
+    first = await create(db_session, "a")
+    second = await create(db_session, "b")
+    joined = await create(db_session, "c", depends_on=[first, second])
+
+    assert joined.status == TaskStatus.BLOCKED
+    assert joined.remaining_dependencies == 2
+
+    claimed = await TaskQueueService.claim_tasks(db_session, worker_id, limit=10)
+    assert {task.id for task in claimed} == {first.id, second.id}
+
+    await TaskQueueService.complete_task(db_session, first.id)
+    await db_session.refresh(joined)
+    assert joined.status == TaskStatus.BLOCKED
+    assert joined.remaining_dependencies == 1
+
+    await TaskQueueService.ack_tasks(
+        db_session, worker_id, [TaskAck(task_id=second.id, success=True)]
+    )
+    await db_session.refresh(joined)
+    assert joined.status == TaskStatus.PENDING
+    assert joined.remaining_dependencies == 0
+
+    # Tasks depending on completed tasks are ready straight away
+    later = await create(db_session, "d", depends_on=[first])
+    assert later.status == TaskStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_failure_propagates_to_dependents(db_session):
+    worker_id = str(uuid.uuid4())
+    root = await create(db_session, "root")
+    child = await create(db_session, "child", depends_on=[root])
+    grandchild = await create(db_session, "grandchild", depends_on=[child])
+
+    await TaskQueueService.claim_tasks(db_session, worker_id)
+    await TaskQueueService.fail_task(db_session, root.id, "boom")
+
+    for task in (child, grandchild):
+        await db_session.refresh(task)
+        assert task.status == TaskStatus.FAILED
+        assert task.error == "A dependency failed"
+
+    assert (await create(db_session, "late", depends_on=[root])).status == (
+        TaskStatus.FAILED
+    )
+    unknown = TaskCreate(name="x", payload={}, depends_on=[uuid.uuid4()])
+    assert await TaskQueueService.create_task(db_session, unknown) is None
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_dependencies():
+    backend = InMemoryBackend()
+    first = await backend.create_task(TaskCreate(name="a", payload={}))
+    second = await backend.create_task(TaskCreate(name="b", payload={}))
+    joined = await backend.create_task(
+        TaskCreate(name="c", payload={}, depends_on=[first.id, second.id])
+    )
+    failing = await backend.create_task(TaskCreate(name="d", payload={}))
+    doomed = await backend.create_task(
+        TaskCreate(name="e", payload={}, depends_on=[failing.id])
+    )
+
+    claimed = await backend.claim_tasks("worker", limit=10)
+    assert joined not in claimed and doomed not in claimed
+
+    await backend.ack_tasks(
+        "worker",
+        [
+            TaskAck(task_id=first.id),
+            TaskAck(task_id=second.id),
+            TaskAck(task_id=failing.id, success=False, error="boom"),
+        ],
+    )
+
+    assert joined.status == TaskStatus.PENDING
+    assert doomed.status == TaskStatus.FAILED
+    assert await backend.claim_tasks("worker") == [joined]
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.instrumentation import instrumentation
+from app.db.models import Base, TaskStatus
+from app.db.sqlite import create_sqlite_engine
+from app.schemas.task import TaskCreate, WorkerCreate
+from app.services.enqueue import EnqueueCoalescer
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_share_batches(tmp_path):
+    engine = create_sqlite_engine(str(tmp_path / "queue.db"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    coalescer = EnqueueCoalescer(session_factory, window=0.01, max_rows=20)
+
+    batches = []
+
+    def hook(span):
+        if span.name == "task_queue.create_tasks":
+            batches.append(span)
+
+    instrumentation.add_hook(hook)
+    try:
+        tasks = await asyncio.gather(
+            *(
+                coalescer.create_task(
+                    TaskCreate(name=f"job-{index}", payload={"n": index})
+                )
+                for index in range(50)
+            )
+        )
+    finally:
+        instrumentation.remove_hook(hook)
+        await coalescer.close()
+
+    assert len(batches) == 3
+    assert [task.name for task in tasks] == [f"job-{index}" for index in range(50)]
+    assert [task.payload for task in tasks] == [{"n": index} for index in range(50)]
+    assert len({task.id for task in tasks}) == 50
+    async with session_factory() as db:
+        assert await TaskQueueService.get_tasks_count(db) == 50
+        worker = await WorkerService.create_worker(db, WorkerCreate(name="w"))
+        claimed = await TaskQueueService.claim_tasks(db, worker.id, limit=50)
+    await engine.dispose()
+    # Claim order is creation order within a batch and across batches
+    assert [task.id for task in claimed] == [task.id for task in tasks]
+    assert {task.status for task in claimed} == {TaskStatus.RUNNING}
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_caller():
+    def broken_session():
+        raise RuntimeError("database is down")
+
+    coalescer = EnqueueCoalescer(broken_session, window=0.001, max_rows=10)
+    results = await asyncio.gather(
+        *(coalescer.create_task(TaskCreate(name="job", payload={})) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert [str(result) for result in results] == ["database is down"] * 3
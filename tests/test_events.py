@@ -0,0 +1,100 @@
+import pytest
+
+from app.db.models import TaskStatus
+from app.schemas.task import TaskCreate, TaskPriorityEnum, WorkerCreate
+from app.services.backends import DatabaseBackend, InMemoryBackend
+from app.services.events import TaskEvent, TaskEventBroker, TaskEventType, broker
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+
+def make_event(status="pending", name="email", queue="default"):
+    return TaskEvent(
+        event=TaskEventType.CREATED,
+        task_id="00000000-0000-4000-8000-000000000000",
+        name=name,
+        queue=queue,
+        status=status,
+        priority="MEDIUM",
+        worker_id=None,
+        timestamp="2024-01-01T00:00:00+00:00",
+    )
+
+
+@pytest.mark.asyncio
+async def test_broker_filters_events():
+    event_broker = TaskEventBroker(channel="test", buffer_size=10)
+    running = event_broker.subscribe(statuses=["running"])
+    emails = event_broker.subscribe(names=["email"], queues=["default"])
+
+    event_broker.publish(make_event(status="pending", name="email"))
+    event_broker.publish(make_event(status="running", name="report"))
+
+    assert (await emails.get(timeout=0.1)).name == "email"
+    assert (await emails.get(timeout=0.1)) is None
+    assert (await running.get(timeout=0.1)).status == "running"
+
+
+@pytest.mark.asyncio
+async def test_broker_evicts_slow_consumer():
+    event_broker = TaskEventBroker(channel="test", buffer_size=2)
+    slow = event_broker.subscribe()
+
+    for _ in range(3):
+        event_broker.publish(make_event())
+
+    assert slow.evicted
+    assert event_broker.subscriber_count == 0
+    assert (await slow.get(timeout=0.1)) is None
+
+
+def test_event_json_round_trip():
+    task_event = make_event()
+    assert TaskEvent.from_json(task_event.to_json()) == task_event
+
+
+@pytest.mark.asyncio
+async def test_service_publishes_events_on_commit(db_session):
+    subscription = broker.subscribe(queues=["events-test"])
+    try:
+        task = await TaskQueueService.create_task(
+            db=db_session,
+            task_in=TaskCreate(
+                name="evented",
+                queue="events-test",
+                payload={},
+                priority=TaskPriorityEnum.HIGH,
+            ),
+        )
+        await TaskQueueService.pause_task(db=db_session, task_id=task.id)
+
+        created = await subscription.get(timeout=0.1)
+        paused = await subscription.get(timeout=0.1)
+        assert created.event == TaskEventType.CREATED
+        assert created.task_id == task.id
+        assert paused.event == TaskEventType.PAUSED
+        assert paused.status == TaskStatus.PAUSED.value
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@pytest.mark.asyncio
+async def test_released_running_tasks_are_requeued(db_session):
+    worker = await WorkerService.create_worker(db_session, WorkerCreate(name="w"))
+    backends = [InMemoryBackend(), DatabaseBackend(db_session)]
+    subscription = broker.subscribe(queues=["release-test"], statuses=["pending"])
+    try:
+        for backend in backends:
+            await backend.create_task(
+                TaskCreate(name="handed-back", queue="release-test", payload={})
+            )
+            assert (await subscription.get(timeout=0.1)).event == TaskEventType.CREATED
+            claimed = await backend.claim_tasks(worker.id, limit=1)
+            await backend.release_tasks(worker.id, [claimed[0].id])
+
+            # RELEASED is kept for blocked tasks whose dependencies finished
+            requeued = await subscription.get(timeout=0.1)
+            assert requeued.event == TaskEventType.REQUEUED
+            assert requeued.task_id == str(claimed[0].id)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.task import TaskCreate, TaskPriorityEnum
+from app.services.backends import InMemoryBackend
+from app.services.ordering import compute_sort_key
+from app.services.task_queue import TaskQueueService
+
+
+@pytest.fixture
+def fair_mode(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULING_MODE", "fair")
+    monkeypatch.setattr(settings, "PRIORITY_AGING_SECONDS", 60)
+    monkeypatch.setattr(settings, "FAIR_SHARE_QUANTUM_SECONDS", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_strict_mode_claims_by_priority(db_session):
+    worker_id = str(uuid.uuid4())
+    names = []
+    for priority in ("LOW", "CRITICAL", "MEDIUM", "HIGH"):
+        await TaskQueueService.create_task(
+            db_session,
+            TaskCreate(name=priority, payload={}, priority=TaskPriorityEnum(priority)),
+        )
+    for _ in range(4):
+        (task,) = await TaskQueueService.claim_tasks(db_session, worker_id)
+        names.append(task.name)
+
+    assert names == ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+
+def test_waiting_tasks_age_into_higher_priority(fair_mode):
+    now = 1_700_000_000.0
+    # A LOW task waiting for more than two aging periods beats a fresh HIGH one
+    assert compute_sort_key("LOW", now - 121) < compute_sort_key("HIGH", now)
+    assert compute_sort_key("LOW", now - 119) > compute_sort_key("HIGH", now)
+
+
+@pytest.mark.asyncio
+async def test_fair_mode_shares_workers_between_queues(db_session, fair_mode):
+    worker_id = str(uuid.uuid4())
+    await TaskQueueService.set_queue_weight(db_session, "heavy", 2.0)
+    for i in range(10):
+        await TaskQueueService.create_task(
+            db_session, TaskCreate(name=f"noisy_{i}", queue="noisy", payload={})
+        )
+    for i in range(4):
+        await TaskQueueService.create_task(
+            db_session, TaskCreate(name=f"heavy_{i}", queue="heavy", payload={})
+        )
+
+    claimed = await TaskQueueService.claim_tasks(db_session, worker_id, limit=6)
+
+    # Tasks queued behind a burst from another queue are not starved, and a
+    # queue with twice the weight gets twice the share
+    assert sum(task.queue == "heavy" for task in claimed) == 4
+    assert sum(task.queue == "noisy" for task in claimed) == 2
+
+    stats = {s["queue"]: s for s in await TaskQueueService.get_queue_stats(db_session)}
+    assert stats["noisy"]["pending"] == 8
+    assert stats["noisy"]["running"] == 2
+    assert stats["heavy"]["weight"] == 2.0
+    assert stats["heavy"]["started_recently"] == 4
+    assert stats["heavy"]["max_wait_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_fair_mode(fair_mode):
+    backend = InMemoryBackend()
+    for i in range(5):
+        await backend.create_task(TaskCreate(name=f"a_{i}", queue="a", payload={}))
+    late = await backend.create_task(TaskCreate(name="b", queue="b", payload={}))
+
+    claimed = await backend.claim_tasks("worker", limit=2)
+
+    assert late in claimed
+    stats = {s["queue"]: s for s in await backend.get_queue_stats()}
+    assert stats["a"]["pending"] == 4
+    assert stats["b"]["started_recently"] == 1
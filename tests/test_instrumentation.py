@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+
+from app.core.instrumentation import SamplingProfiler, instrumentation
+from app.schemas.task import TaskCreate
+from app.services.task_queue import TaskQueueService
+
+
+@pytest.fixture
+def spans():
+    recorded = []
+    instrumentation.add_hook(recorded.append)
+    yield recorded
+    instrumentation.remove_hook(recorded.append)
+
+
+def test_spans_are_noops_without_hooks():
+    assert not instrumentation.enabled
+    with instrumentation.span("anything", key="value") as span:
+        assert span is None
+
+
+@pytest.mark.asyncio
+async def test_service_calls_are_traced(db_session, spans):
+    task = await TaskQueueService.create_task(
+        db_session, TaskCreate(name="traced", payload={})
+    )
+    await TaskQueueService.claim_tasks(db_session, str(uuid.uuid4()), limit=1)
+
+    names = [span.name for span in spans]
+    # Commits get spans of their own, reported before the enclosing call's
+    assert names == [
+        "task_queue.commit",
+        "task_queue.create_task",
+        "task_queue.commit",
+        "task_queue.claim_tasks",
+    ]
+    assert all(span.duration > 0 and span.error is None for span in spans)
+    assert task is not None
+
+
+def test_span_records_errors_and_survives_failing_hooks(spans):
+    def broken(span):
+        raise RuntimeError("hook bug")
+
+    instrumentation.add_hook(broken)
+    try:
+        with pytest.raises(ValueError):
+            with instrumentation.span("worker.execute", task_id="1"):
+                raise ValueError("task bug")
+    finally:
+        instrumentation.remove_hook(broken)
+
+    assert isinstance(spans[0].error, ValueError)
+    assert spans[0].attributes == {"task_id": "1"}
+
+
+def busy_loop(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_sampling_profiler_finds_the_hot_function():
+    profiler = SamplingProfiler(interval=0.001, thread_id=threading.get_ident())
+    profiler.start()
+    started = time.monotonic()
+    busy_loop(0.2)
+    finished = time.monotonic()
+    profiler.stop()
+
+    stacks = profiler.hot_stacks(started, finished, limit=1)
+    assert stacks
+    assert "busy_loop" in stacks[0][0]
+    assert profiler.hot_stacks(finished + 1, finished + 2) == []
+
+
+async def sleeper():
+    await asyncio.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_sampling_profiler_attributes_samples_to_each_task():
+    profiler = SamplingProfiler(interval=0.005)
+    profiler.start()
+
+    async def busy():
+        await asyncio.sleep(0)
+        busy_loop(0.1)
+
+    try:
+        await asyncio.gather(
+            profiler.profile("sleeping", sleeper()), profiler.profile("busy", busy())
+        )
+    finally:
+        profiler.stop()
+
+    # Each task only sees its own frames, suspended or running
+    sleeping = profiler.task_stacks("sleeping", limit=1)
+    assert "sleeper" in sleeping[0][0] and "busy_loop" not in sleeping[0][0]
+    busy_stacks = profiler.task_stacks("busy", limit=1)
+    assert "busy_loop" in busy_stacks[0][0] and "sleeper" not in busy_stacks[0][0]
+    profiler.forget("busy")
+    assert profiler.task_stacks("busy") == []
@@ -0,0 +1,112 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.endpoints.workers import ack_tasks
+from app.db.models import TaskStatus
+from app.schemas.task import TaskAck, TaskCreate, TaskPriorityEnum, WorkerCreate
+from app.services.backends import InMemoryBackend
+
+
+@pytest.mark.asyncio
+async def test_claims_in_priority_then_creation_order():
+    backend = InMemoryBackend()
+    low = await backend.create_task(
+        TaskCreate(name="low", payload={}, priority=TaskPriorityEnum.LOW)
+    )
+    critical = await backend.create_task(
+        TaskCreate(name="critical", payload={}, priority=TaskPriorityEnum.CRITICAL)
+    )
+    high_first = await backend.create_task(
+        TaskCreate(name="high_1", payload={}, priority=TaskPriorityEnum.HIGH)
+    )
+    high_second = await backend.create_task(
+        TaskCreate(name="high_2", payload={}, priority=TaskPriorityEnum.HIGH)
+    )
+
+    claimed = await backend.claim_tasks("worker", limit=10)
+
+    assert [task.id for task in claimed] == [
+        critical.id,
+        high_first.id,
+        high_second.id,
+        low.id,
+    ]
+    assert await backend.claim_tasks("worker") == []
+
+
+@pytest.mark.asyncio
+async def test_scheduled_tasks_wait_for_their_time():
+    backend = InMemoryBackend()
+    future = await backend.create_task(
+        TaskCreate(
+            name="later",
+            payload={},
+            scheduled_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    due = await backend.create_task(
+        TaskCreate(
+            name="due",
+            payload={},
+            scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        )
+    )
+
+    claimed = await backend.claim_tasks("worker", limit=10)
+
+    assert [task.id for task in claimed] == [due.id]
+    assert future.status == TaskStatus.SCHEDULED
+
+
+@pytest.mark.asyncio
+async def test_paused_tasks_are_not_claimed_until_resumed():
+    backend = InMemoryBackend()
+    task = await backend.create_task(TaskCreate(name="pausable", payload={}))
+
+    await backend.pause_task(task.id)
+    assert await backend.claim_tasks("worker") == []
+    assert await backend.get_tasks_by_status(TaskStatus.PAUSED) == [task]
+
+    await backend.resume_task(task.id)
+    claimed = await backend.claim_tasks("worker", limit=10)
+    # The entry pushed before pausing is stale and must not claim it twice
+    assert claimed == [task]
+
+
+@pytest.mark.asyncio
+async def test_ack_tasks_only_acks_own_running_tasks():
+    backend = InMemoryBackend()
+    worker = await backend.create_worker(WorkerCreate(name="memory-worker"))
+    task = await backend.create_task(TaskCreate(name="ackable", payload={}))
+    other = await backend.create_task(TaskCreate(name="unclaimed", payload={}))
+    await backend.claim_tasks(worker.id, limit=1)
+
+    acked = await backend.ack_tasks(
+        worker.id,
+        [
+            TaskAck(task_id=task.id, result={"done": True}),
+            TaskAck(task_id=other.id),
+        ],
+    )
+
+    assert acked == [task]
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == {"done": True}
+    assert other.status == TaskStatus.PENDING
+    assert await backend.get_tasks_count() == 2
+
+
+@pytest.mark.asyncio
+async def test_ack_endpoint_rejects_unknown_worker():
+    backend = InMemoryBackend()
+    task = await backend.create_task(TaskCreate(name="ackable", payload={}))
+
+    with pytest.raises(HTTPException) as error:
+        await ack_tasks(
+            [TaskAck(task_id=task.id)], worker_id=uuid.uuid4(), backend=backend
+        )
+    assert error.value.status_code == 404
+    assert task.status == TaskStatus.PENDING
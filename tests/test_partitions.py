@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.task import TaskCreate
+from app.services.partitions import partition_of, preferred_partitions
+from app.services.task_queue import TaskQueueService
+
+
+@pytest.fixture
+def partitioned(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_PARTITIONS", 4)
+
+
+def test_unpartitioned_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_PARTITIONS", 1)
+    assert partition_of(uuid.uuid4()) == 0
+    assert preferred_partitions(uuid.uuid4()) is None
+
+
+def test_partition_is_stable(partitioned):
+    task_id = uuid.uuid4()
+    assert partition_of(task_id) == partition_of(str(task_id)) == task_id.int % 4
+    assert preferred_partitions(task_id) == [task_id.int % 4]
+
+
+@pytest.mark.asyncio
+async def test_worker_claims_own_partition_first(db_session, partitioned):
+    tasks = [
+        await TaskQueueService.create_task(
+            db_session, TaskCreate(name=f"task-{i}", payload={})
+        )
+        for i in range(20)
+    ]
+    assert all(task.partition == partition_of(task.id) for task in tasks)
+
+    worker_id = str(uuid.uuid4())
+    (own,) = preferred_partitions(worker_id)
+    own_count = sum(task.partition == own for task in tasks)
+
+    claimed = await TaskQueueService.claim_tasks(db_session, worker_id, limit=own_count)
+    assert len(claimed) == own_count
+    assert all(task.partition == own for task in claimed)
+
+
+@pytest.mark.asyncio
+async def test_worker_steals_when_own_partition_is_empty(db_session, partitioned):
+    worker_id = str(uuid.uuid4())
+    (own,) = preferred_partitions(worker_id)
+    created = 0
+    while created < 3:
+        task = await TaskQueueService.create_task(
+            db_session, TaskCreate(name="task", payload={})
+        )
+        if task.partition == own:
+            await TaskQueueService.delete_task(db_session, task.id)
+        else:
+            created += 1
+
+    claimed = await TaskQueueService.claim_tasks(db_session, worker_id, limit=5)
+    assert len(claimed) == 3
+    assert all(task.partition != own for task in claimed)
@@ -0,0 +1,29 @@
+import random
+
+from worker.polling import AdaptivePoller
+
+
+def test_full_batch_polls_again_immediately():
+    poller = AdaptivePoller(base=0.1, cap=5)
+    assert poller.record(claimed=10, requested=10) == 0.0
+    assert poller.record(claimed=3, requested=10) == 0.1
+
+
+def test_empty_polls_back_off_up_to_the_cap():
+    poller = AdaptivePoller(base=0.1, cap=5, rng=random.Random(1))
+    delays = [poller.record(claimed=0, requested=10) for _ in range(30)]
+
+    assert all(0.1 <= delay <= 5 for delay in delays)
+    assert max(delays) == 5
+    assert poller.state()["empty_polls"] == 30
+
+    # Any work resets the backoff
+    assert poller.record(claimed=1, requested=10) == 0.1
+    assert poller.state()["empty_polls"] == 0
+
+
+def test_jitter_spreads_replicas_apart():
+    pollers = [AdaptivePoller(0.1, 5, rng=random.Random(seed)) for seed in range(5)]
+    for _ in range(3):
+        delays = [poller.record(0, 10) for poller in pollers]
+    assert len(set(delays)) == len(pollers)
@@ -0,0 +1,43 @@
+import dataclasses
+
+import pytest
+
+from app.schemas.task import TaskCreate
+from app.services.backends import InMemoryBackend
+from worker.record import TaskRecord
+
+
+@pytest.mark.asyncio
+async def test_record_of_claimed_task_and_api_response():
+    backend = InMemoryBackend()
+    created = await backend.create_task(
+        TaskCreate(name="report", payload={"n": 1}, priority="HIGH", timeout_seconds=5)
+    )
+
+    record = TaskRecord.from_row(created)
+    assert record == TaskRecord(
+        id=str(created.id),
+        name="report",
+        queue="default",
+        priority="HIGH",
+        payload={"n": 1},
+        retries=0,
+        timeout_seconds=5,
+    )
+    assert (
+        TaskRecord.from_json(
+            {
+                "id": record.id,
+                "name": "report",
+                "priority": "HIGH",
+                "payload": {"n": 1},
+                "timeout_seconds": 5,
+                "status": "pending",
+            }
+        )
+        == record
+    )
+
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.name = "other"
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.models import MisfirePolicy, RecurringTask, TaskStatus
+from app.schemas.task import RecurringTaskCreate, RecurringTaskUpdate
+from app.services.backends import InMemoryBackend
+from app.services.cron import CronExpression
+from app.services.recurring import RecurringTaskService, plan_runs
+from app.services.task_queue import TaskQueueService
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_cron_next_after():
+    every_quarter = CronExpression("*/15 * * * *")
+    assert every_quarter.next_after(utc(2024, 1, 1, 10, 7)) == utc(2024, 1, 1, 10, 15)
+    assert every_quarter.next_after(utc(2024, 1, 1, 10, 45)) == utc(2024, 1, 1, 11, 0)
+
+    weekdays = CronExpression("30 9 * * 1-5")
+    # 2024-01-06 is a Saturday
+    assert weekdays.next_after(utc(2024, 1, 5, 10, 0)) == utc(2024, 1, 8, 9, 30)
+
+    assert CronExpression("@monthly").next_after(utc(2024, 1, 31, 12)) == utc(
+        2024, 2, 1
+    )
+    assert CronExpression("0 0 29 2 *").next_after(utc(2024, 3, 1)) == utc(2028, 2, 29)
+
+    with pytest.raises(ValueError):
+        CronExpression("61 * * * *")
+    with pytest.raises(ValueError):
+        CronExpression("* * *")
+
+
+@pytest.mark.parametrize(
+    "policy, expected_missed",
+    [
+        (MisfirePolicy.SKIP, 0),
+        (MisfirePolicy.FIRE_ONCE, 1),
+        (MisfirePolicy.CATCH_UP, 9),
+    ],
+)
+def test_plan_runs_misfire_policies(policy, expected_missed):
+    now = utc(2024, 1, 1, 12, 0)
+    recurring_task = RecurringTask(
+        interval_seconds=600,
+        cron=None,
+        misfire_policy=policy,
+        # Ten runs ago; the last one is still within the misfire grace time
+        next_fire_at=now - timedelta(minutes=90),
+    )
+
+    runs, next_fire_at = plan_runs(recurring_task, now)
+
+    missed = [run for run in runs if run < now - timedelta(seconds=60)]
+    assert len(missed) == expected_missed
+    assert next_fire_at > now + timedelta(seconds=60)
+    assert runs == sorted(set(runs))
+
+
+@pytest.mark.asyncio
+async def test_materialize_recurring_tasks(db_session):
+    start_at = datetime.now(timezone.utc) - timedelta(seconds=30)
+    recurring_task = await RecurringTaskService.create_recurring_task(
+        db_session,
+        RecurringTaskCreate(
+            name="report", payload={}, interval_seconds=3600, start_at=start_at
+        ),
+    )
+
+    # The first run was due and created straight away
+    runs = await TaskQueueService.get_tasks_by_status(db_session, TaskStatus.PENDING)
+    assert [task.recurring_task_id for task in runs] == [recurring_task.id]
+    assert recurring_task.next_fire_at > datetime.now(timezone.utc).replace(tzinfo=None)
+
+    # A second scheduler running into the same run doesn't create it again
+    recurring_task.next_fire_at = start_at
+    await db_session.commit()
+    assert await RecurringTaskService.materialize_recurring_tasks(db_session) == 1
+    assert await TaskQueueService.get_tasks_count(db_session) == 1
+
+    next_fire_at = await RecurringTaskService.get_next_fire_at(db_session)
+    assert next_fire_at > datetime.now(timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_recurring_tasks():
+    backend = InMemoryBackend()
+    recurring_task = await backend.create_recurring_task(
+        RecurringTaskCreate(
+            name="tick",
+            payload={},
+            interval_seconds=20,
+            start_at=datetime.now(timezone.utc) + timedelta(seconds=10),
+        )
+    )
+
+    # Runs within the lookahead are materialized ahead of time
+    scheduled = await backend.get_tasks_by_status(TaskStatus.SCHEDULED)
+    assert len(scheduled) == 3
+    assert await backend.materialize_recurring_tasks() == 0
+
+    await backend.update_recurring_task(
+        recurring_task.id, RecurringTaskUpdate(cron="0 0 1 1 *")
+    )
+    assert await backend.get_tasks_by_status(TaskStatus.SCHEDULED) == []
+
+    assert await backend.delete_recurring_task(recurring_task.id)
+    assert await backend.get_next_fire_at() is None
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.replica import ReplicaMonitor, parse_last_write, should_read_from_replica
+
+
+@pytest.fixture
+def max_lag(monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_MAX_LAG_SECONDS", 5.0)
+
+
+def test_reads_go_to_primary_while_replica_lags(max_lag):
+    now = 1_700_000_000.0
+    assert should_read_from_replica(0.5, None, now)
+    assert not should_read_from_replica(None, None, now)
+    assert not should_read_from_replica(6.0, None, now)
+
+
+def test_clients_read_their_own_writes(max_lag):
+    now = 1_700_000_000.0
+    # The replica has replayed a write made longer ago than its lag
+    assert should_read_from_replica(0.5, now - 1.0, now)
+    assert not should_read_from_replica(2.0, now - 1.0, now)
+
+
+def test_malformed_cookie_is_ignored():
+    assert parse_last_write("1700000000.5") == 1700000000.5
+    assert parse_last_write("yesterday") is None
+    assert parse_last_write(None) is None
+
+
+@pytest.mark.asyncio
+async def test_monitor_caches_lag(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    monitor = ReplicaMonitor(engine, check_interval=60)
+    assert await monitor.measure() == 0.0
+
+    calls = []
+
+    async def measure():
+        calls.append(1)
+        return 1.5
+
+    monkeypatch.setattr(monitor, "measure", measure)
+    assert await monitor.lag() == 1.5
+    assert await monitor.lag() == 1.5
+    assert len(calls) == 1
+    await engine.dispose()
@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.endpoints.workers import get_revoked_tasks
+from app.db.models import TaskStatus
+from app.schemas.task import TaskCreate, WorkerCreate
+from app.services.backends import InMemoryBackend
+from worker.main import Worker
+from worker.transport import BackendTransport
+
+
+class HangingWorker(Worker):
+    """Worker whose tasks never finish on their own."""
+
+    async def process_task(self, task):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_paused_and_deleted_tasks_are_cancelled_on_the_worker():
+    backend = InMemoryBackend()
+
+    @asynccontextmanager
+    async def open_backend():
+        yield backend
+
+    tasks = [
+        await backend.create_task(TaskCreate(name=f"task-{i}", payload={}))
+        for i in range(3)
+    ]
+    worker = HangingWorker(BackendTransport(open_backend))
+    worker.max_tasks = 3
+    worker.poll_interval = 0.01
+    worker.drain_timeout = 0.01
+    worker.revoke_check_interval = 0.01
+    run = asyncio.create_task(worker.run())
+    await asyncio.sleep(0.05)
+    assert len(worker.in_flight) == 3
+
+    await backend.pause_task(tasks[0].id)
+    await backend.delete_task(tasks[1].id)
+    await asyncio.sleep(0.1)
+    # Both slots are free without waiting for the handlers
+    assert list(worker.in_flight) == [tasks[2].id]
+
+    worker.handle_signal(15, None)
+    await asyncio.wait_for(run, 1)
+    assert backend._tasks[tasks[0].id].status == TaskStatus.PAUSED
+    assert tasks[1].id not in backend._tasks
+
+
+@pytest.mark.asyncio
+async def test_revoked_endpoint():
+    backend = InMemoryBackend()
+    worker = await backend.create_worker(WorkerCreate(name="worker"))
+    running = await backend.create_task(TaskCreate(name="running", payload={}))
+    paused = await backend.create_task(TaskCreate(name="paused", payload={}))
+    await backend.claim_tasks(worker.id, limit=2)
+    await backend.pause_task(paused.id)
+
+    revoked = await get_revoked_tasks(
+        [uuid.UUID(running.id), uuid.UUID(paused.id)],
+        worker_id=uuid.UUID(worker.id),
+        backend=backend,
+    )
+    assert revoked == [uuid.UUID(paused.id)]
+
+    with pytest.raises(HTTPException) as error:
+        await get_revoked_tasks([], worker_id=uuid.uuid4(), backend=backend)
+    assert error.value.status_code == 404
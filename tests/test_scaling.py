@@ -0,0 +1,110 @@
+import uuid
+
+import pytest
+
+from app.schemas.task import TaskAck, TaskCreate
+from app.services.backends import InMemoryBackend
+from app.services.scaling import TTLCache, recommend
+from app.services.task_queue import TaskQueueService
+
+
+def load(group, pending=0, running=0, arrivals=0, finished=0, service=None):
+    return {
+        "group": group,
+        "pending": pending,
+        "running": running,
+        "oldest_pending_wait_seconds": None,
+        "arrivals": arrivals,
+        "finished": finished,
+        "avg_service_seconds": service,
+    }
+
+
+def test_recommendation_follows_littles_law():
+    result = recommend(
+        [
+            # 2 tasks/s of 3s each keep 6 slots busy; 40 pending drained in 30s
+            # take 4 more
+            load("emails", pending=40, arrivals=120, finished=100, service=3.0),
+            # Nothing finished yet: keep the busy slots
+            load("reports", pending=5, running=3),
+            load("idle"),
+        ],
+        window_seconds=60,
+        target_wait=30,
+        worker_slots=4,
+    )
+
+    groups = {group["group"]: group for group in result["groups"]}
+    assert groups["emails"]["arrival_rate"] == 2.0
+    assert groups["emails"]["worker_service_rate"] == pytest.approx(4 / 3)
+    assert groups["emails"]["required_slots"] == pytest.approx(10.0)
+    assert groups["emails"]["recommended_workers"] == 3
+    assert groups["reports"]["recommended_workers"] == 1
+    assert groups["idle"]["recommended_workers"] == 0
+    # 13 slots over all groups fit in 4 workers, not 3 + 1
+    assert result["recommended_workers"] == 4
+
+
+async def finish_some(create_task, claim_tasks, ack_tasks):
+    for queue, priority in [("a", "HIGH"), ("a", "LOW"), ("b", "LOW")]:
+        await create_task(
+            TaskCreate(name="job", payload={}, queue=queue, priority=priority)
+        )
+    worker_id = str(uuid.uuid4())
+    claimed = await claim_tasks(worker_id, 2)
+    await ack_tasks(worker_id, [TaskAck(task_id=claimed[0].id, success=True)])
+
+
+@pytest.mark.asyncio
+async def test_load_stats(db_session):
+    await finish_some(
+        lambda t: TaskQueueService.create_task(db_session, t),
+        lambda w, limit: TaskQueueService.claim_tasks(db_session, w, limit=limit),
+        lambda w, acks: TaskQueueService.ack_tasks(db_session, w, acks),
+    )
+    backend = InMemoryBackend()
+    await finish_some(
+        backend.create_task,
+        lambda w, limit: backend.claim_tasks(w, limit=limit),
+        backend.ack_tasks,
+    )
+
+    for stats in [
+        await TaskQueueService.get_load_stats(db_session),
+        await backend.get_load_stats(),
+    ]:
+        by_queue = {entry["group"]: entry for entry in stats}
+        assert by_queue["a"]["arrivals"] == 2
+        assert by_queue["a"]["finished"] == 1
+        assert by_queue["a"]["running"] == 1
+        assert by_queue["a"]["avg_service_seconds"] >= 0
+        assert by_queue["b"]["pending"] == 1
+        assert by_queue["b"]["oldest_pending_wait_seconds"] >= 0
+        assert by_queue["b"]["avg_service_seconds"] is None
+
+    for stats in [
+        await TaskQueueService.get_load_stats(db_session, "priority"),
+        await backend.get_load_stats("priority"),
+    ]:
+        by_priority = {entry["group"]: entry for entry in stats}
+        assert set(by_priority) == {"HIGH", "LOW"}
+        assert by_priority["LOW"]["arrivals"] == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_serves_until_expiry():
+    now = [0.0]
+    cache = TTLCache(5, clock=lambda: now[0])
+    calls = []
+
+    async def compute():
+        calls.append(now[0])
+        return len(calls)
+
+    assert await cache.get_or_compute("queue", compute) == 1
+    now[0] = 4.9
+    assert await cache.get_or_compute("queue", compute) == 1
+    assert await cache.get_or_compute("priority", compute) == 2
+    now[0] = 5.0
+    assert await cache.get_or_compute("queue", compute) == 3
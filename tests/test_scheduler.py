@@ -0,0 +1,81 @@
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.models import TaskStatus
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.backends import InMemoryBackend
+from app.services.scheduler import Scheduler
+from app.services.task_queue import TaskQueueService
+
+
+async def create_scheduled(create, update, name, scheduled_at):
+    # Tasks are created SCHEDULED only for a future time, so move the time
+    # back afterwards to get a SCHEDULED task that is already due
+    task = await create(
+        TaskCreate(
+            name=name,
+            payload={},
+            scheduled_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    return await update(task.id, TaskUpdate(scheduled_at=scheduled_at))
+
+
+@pytest.mark.asyncio
+async def test_promote_due_tasks(db_session):
+    now = datetime.now(timezone.utc)
+    worker_id = str(uuid.uuid4())
+
+    async def create(task_in):
+        return await TaskQueueService.create_task(db_session, task_in)
+
+    async def update(task_id, task_in):
+        return await TaskQueueService.update_task(db_session, task_id, task_in)
+
+    due = await create_scheduled(create, update, "due", now - timedelta(seconds=1))
+    later = await create_scheduled(create, update, "later", now + timedelta(hours=2))
+
+    # Claims only look at PENDING tasks
+    assert await TaskQueueService.claim_tasks(db_session, worker_id) == []
+
+    promoted = await TaskQueueService.promote_due_tasks(db_session)
+
+    assert [task.id for task in promoted] == [due.id]
+    assert due.status == TaskStatus.PENDING
+    assert later.status == TaskStatus.SCHEDULED
+    next_due_at = await TaskQueueService.get_next_due_at(db_session)
+    assert abs((next_due_at - (now + timedelta(hours=2))).total_seconds()) < 1
+
+    claimed = await TaskQueueService.claim_tasks(db_session, worker_id)
+    assert [task.id for task in claimed] == [due.id]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_tick_promotes_in_batches():
+    backend = InMemoryBackend()
+    now = datetime.now(timezone.utc)
+    for i in range(5):
+        await create_scheduled(
+            backend.create_task, backend.update_task, f"due_{i}", now
+        )
+    later = await create_scheduled(
+        backend.create_task,
+        backend.update_task,
+        "later",
+        now + timedelta(minutes=5),
+    )
+
+    @asynccontextmanager
+    async def open_memory_backend():
+        yield backend
+
+    scheduler = Scheduler(open_memory_backend, batch_size=2, max_interval=60)
+    next_due_at = await scheduler.tick()
+
+    assert len(await backend.get_tasks_by_status(TaskStatus.PENDING)) == 5
+    assert next_due_at == later.scheduled_at
+    assert 0 < scheduler._timeout(next_due_at) <= 60
+    assert scheduler._timeout(None) == 60
@@ -0,0 +1,72 @@
+import ast
+import pathlib
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app.db.models import Base
+from app.db.schema import SCHEMA_REVISION, SchemaVersionError, prepare_schema
+from app.db.sqlite import create_sqlite_engine
+
+VERSIONS = pathlib.Path(__file__).parent.parent / "alembic" / "versions"
+
+
+def migration_revisions():
+    revisions = {}
+    for path in VERSIONS.glob("*.py"):
+        assignments = {
+            node.targets[0].id: node.value.value
+            for node in ast.parse(path.read_text()).body
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+        }
+        if "revision" in assignments:
+            revisions[assignments["revision"]] = assignments["down_revision"]
+    return revisions
+
+
+def test_schema_revision_is_migration_head():
+    revisions = migration_revisions()
+    heads = set(revisions) - set(revisions.values())
+    assert heads == {SCHEMA_REVISION}
+
+
+@pytest.mark.asyncio
+async def test_prepare_schema_creates_then_checks(tmp_path):
+    engine = create_sqlite_engine(str(tmp_path / "queue.db"))
+    await prepare_schema(engine, Base.metadata)
+    await prepare_schema(engine, Base.metadata)
+    async with engine.connect() as conn:
+        version = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        tasks = await conn.scalar(text("SELECT count(*) FROM tasks"))
+    await engine.dispose()
+
+    assert version == SCHEMA_REVISION
+    assert tasks == 0
+
+
+@pytest.mark.asyncio
+async def test_prepare_schema_refuses_outdated_databases(tmp_path):
+    engine = create_sqlite_engine(str(tmp_path / "queue.db"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    with pytest.raises(SchemaVersionError, match="alembic stamp 0001"):
+        await prepare_schema(engine, Base.metadata)
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE alembic_version (version_num TEXT)"))
+        await conn.execute(text("INSERT INTO alembic_version VALUES ('0001')"))
+    with pytest.raises(SchemaVersionError, match="alembic upgrade head"):
+        await prepare_schema(engine, Base.metadata)
+    await engine.dispose()
+
+
+def test_http_worker_imports_no_database_stack():
+    probe = (
+        "import sys, worker.main; "
+        "print([m for m in ('fastapi', 'sqlalchemy', 'asyncpg', 'httpx') "
+        "if m in sys.modules])"
+    )
+    output = subprocess.check_output([sys.executable, "-c", probe], text=True)
+    assert output.strip() == "[]"
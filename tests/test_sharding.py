@@ -0,0 +1,143 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.models import Base, Task, TaskStatus
+from app.db.sharding import HashRing, ShardMap
+from app.schemas.task import TaskAck, TaskCreate, WorkerCreate
+from app.services.backends import ShardedBackend
+
+
+@pytest_asyncio.fixture
+async def shard_map(tmp_path):
+    shards = ShardMap.from_urls(
+        [f"sqlite+aiosqlite:///{tmp_path}/shard-{i}.db" for i in range(3)]
+    )
+    await shards.create_all(Base.metadata)
+    yield shards
+    await shards.dispose()
+
+
+@pytest_asyncio.fixture
+async def backend(shard_map):
+    sharded = ShardedBackend(shard_map)
+    yield sharded
+    await sharded.close()
+
+
+async def tasks_per_shard(backend):
+    return [
+        await backend.shard(index).get_tasks_count()
+        for index in range(len(backend.shard_map))
+    ]
+
+
+def test_ring_moves_few_keys_when_a_shard_is_added():
+    keys = [str(uuid.uuid4()) for _ in range(3000)]
+    before = HashRing(3)
+    after = HashRing(4)
+    moved = [key for key in keys if before.lookup(key) != after.lookup(key)]
+
+    # Only keys taken over by the new shard move, about a quarter of them
+    assert all(after.lookup(key) == 3 for key in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.35
+
+
+@pytest.mark.asyncio
+async def test_tasks_are_routed_by_id(backend):
+    tasks = [
+        await backend.create_task(TaskCreate(name=f"task-{i}", payload={}))
+        for i in range(30)
+    ]
+    for task in tasks:
+        owner = backend.shard_map.shard_for(task.id)
+        assert await backend.shard(owner).get_task(task.id) is not None
+        assert (await backend.get_task(task.id)).name == task.name
+
+    counts = await tasks_per_shard(backend)
+    assert sum(counts) == 30 and all(counts)
+    assert await backend.get_tasks_count() == 30
+    listed = await backend.get_tasks(skip=5, limit=10)
+    assert [t.id for t in listed] == [t.id for t in tasks[5:15]]
+
+
+@pytest.mark.asyncio
+async def test_queue_key_keeps_a_queue_on_one_shard(backend, monkeypatch):
+    monkeypatch.setattr(settings, "SHARD_KEY", "queue")
+    for i in range(10):
+        task = await backend.create_task(
+            TaskCreate(name=f"task-{i}", queue="billing", payload={})
+        )
+        assert backend.shard_map.shard_for(task.id) == backend.shard_map.shard_for(
+            "billing"
+        )
+
+    counts = await tasks_per_shard(backend)
+    assert sorted(counts) == [0, 0, 10]
+
+
+@pytest.mark.asyncio
+async def test_dependents_live_with_their_dependency(backend):
+    parent = await backend.create_task(TaskCreate(name="parent", payload={}))
+    child = await backend.create_task(
+        TaskCreate(name="child", payload={}, depends_on=[parent.id])
+    )
+    assert backend.shard_map.shard_for(child.id) == backend.shard_map.shard_for(
+        parent.id
+    )
+    assert child.status.value == "blocked"
+
+    worker = await backend.create_worker(WorkerCreate(name="worker"))
+    (claimed,) = await backend.claim_tasks(worker.id)
+    assert claimed.id == parent.id
+    await backend.complete_task(parent.id)
+    assert (await backend.get_task(child.id)).status.value == "pending"
+
+
+@pytest.mark.asyncio
+async def test_workers_claim_and_ack_across_shards(backend):
+    for i in range(12):
+        await backend.create_task(TaskCreate(name=f"task-{i}", payload={}))
+    worker = await backend.create_worker(WorkerCreate(name="worker"))
+    for index in range(len(backend.shard_map)):
+        assert await backend.shard(index).get_worker(worker.id) is not None
+
+    claimed = await backend.claim_tasks(worker.id, limit=12)
+    assert len(claimed) == 12
+    assert await backend.claim_tasks(worker.id, limit=1) == []
+
+    acked = await backend.ack_tasks(
+        worker.id, [TaskAck(task_id=task.id, success=True) for task in claimed]
+    )
+    assert len(acked) == 12
+    stats = await backend.get_queue_stats()
+    assert stats[0]["queue"] == "default" and stats[0]["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_creation_order_across_shards(backend):
+    tasks = [
+        await backend.create_task(TaskCreate(name=f"task-{i}", payload={}))
+        for i in range(12)
+    ]
+    # Creation times run against insertion order, so a shard that returned
+    # its rows in storage order would hand back the wrong ones
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for offset, task in enumerate(reversed(tasks)):
+        db = backend.shard(backend.shard_map.shard_for(task.id)).db
+        await db.execute(
+            update(Task)
+            .where(Task.id == task.id)
+            .values(created_at=start + timedelta(seconds=offset))
+        )
+        await db.commit()
+    expected = [task.id for task in reversed(tasks)]
+
+    pages = [await backend.get_tasks(skip=skip, limit=5) for skip in (0, 5, 10)]
+    assert [task.id for page in pages for task in page] == expected
+    pending = await backend.get_tasks_by_status(TaskStatus.PENDING, skip=5, limit=5)
+    assert [task.id for task in pending] == expected[5:10]
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import Base
+from app.db.sqlite import create_sqlite_engine
+from app.schemas.task import TaskCreate, WorkerCreate
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+
+@pytest.mark.asyncio
+async def test_sqlite_engine_uses_wal(tmp_path):
+    engine = create_sqlite_engine(str(tmp_path / "queue.db"))
+    async with engine.connect() as conn:
+        journal_mode = await conn.scalar(text("PRAGMA journal_mode"))
+        synchronous = await conn.scalar(text("PRAGMA synchronous"))
+    await engine.dispose()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_never_share_a_task(tmp_path):
+    path = str(tmp_path / "queue.db")
+    # One engine per simulated worker process, all on the same file
+    engines = [create_sqlite_engine(path) for _ in range(4)]
+    async with engines[0].begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    sessions = [
+        async_sessionmaker(bind=engine, expire_on_commit=False) for engine in engines
+    ]
+    async with sessions[0]() as db:
+        worker = await WorkerService.create_worker(
+            db=db, worker_in=WorkerCreate(name="sqlite-worker")
+        )
+        for i in range(40):
+            await TaskQueueService.create_task(
+                db=db, task_in=TaskCreate(name=f"task_{i}", payload={})
+            )
+
+    async def claim_all(session_factory):
+        claimed = []
+        while True:
+            async with session_factory() as db:
+                tasks = await TaskQueueService.claim_tasks(
+                    db=db, worker_id=worker.id, limit=3
+                )
+            if not tasks:
+                return claimed
+            claimed.extend(task.id for task in tasks)
+
+    results = await asyncio.gather(*(claim_all(factory) for factory in sessions))
+    for engine in engines:
+        await engine.dispose()
+
+    claimed_ids = [task_id for result in results for task_id in result]
+    assert len(claimed_ids) == 40
+    assert len(set(claimed_ids)) == 40
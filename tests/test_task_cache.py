@@ -0,0 +1,163 @@
+import copy
+import uuid
+
+import pytest
+
+from app.api.endpoints.tasks import get_task
+from app.core.config import settings
+from app.schemas.task import TaskAck, TaskCreate, TaskUpdate, WorkerCreate
+from app.services.backends import InMemoryBackend
+from app.services.events import TaskEvent, TaskEventType, broker
+from app.services.task_cache import TaskResponseCache, etag_matches, task_cache
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    cache = TaskResponseCache(max_bytes=10)
+    cache.put("a", '"a"', "no-cache", b"1234")
+    cache.put("b", '"b"', "no-cache", b"1234")
+    cache.get("a")
+    cache.put("c", '"c"', "no-cache", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size == 8
+
+    cache.put("huge", '"h"', "no-cache", b"x" * 11)
+    assert cache.get("huge") is None
+
+
+def test_etag_matching():
+    assert etag_matches('"v1"', '"v1"')
+    assert etag_matches('"v0", W/"v1"', '"v1"')
+    assert etag_matches("*", '"v1"')
+    assert not etag_matches('"v0"', '"v1"')
+    assert not etag_matches(None, '"v1"')
+
+
+@pytest.fixture
+def memory_mode(monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_BACKEND", "memory")
+    task_cache.clear()
+    yield
+    task_cache.clear()
+
+
+async def finished_task(backend):
+    task = await backend.create_task(TaskCreate(name="task", payload={"n": 1}))
+    worker = await backend.create_worker(WorkerCreate(name="worker"))
+    await backend.claim_tasks(worker.id)
+    await backend.ack_tasks(
+        worker.id, [TaskAck(task_id=task.id, success=True, result={"ok": True})]
+    )
+    return task
+
+
+@pytest.mark.asyncio
+async def test_finished_tasks_are_cached_and_revalidated(memory_mode):
+    backend = InMemoryBackend()
+    task = await finished_task(backend)
+
+    response = await get_task(
+        task_id=uuid.UUID(task.id), if_none_match=None, backend=backend
+    )
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"].endswith(
+        f"max-age={settings.TASK_CACHE_MAX_AGE}"
+    )
+    assert task_cache.get(task.id) is not None
+
+    etag = response.headers["ETag"]
+    not_modified = await get_task(
+        task_id=uuid.UUID(task.id), if_none_match=etag, backend=backend
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+
+
+@pytest.mark.asyncio
+async def test_changes_invalidate_cached_tasks(memory_mode):
+    backend = InMemoryBackend()
+    task = await finished_task(backend)
+    await get_task(task_id=uuid.UUID(task.id), if_none_match=None, backend=backend)
+
+    await backend.update_task(task.id, TaskUpdate(name="renamed"))
+    assert task_cache.get(task.id) is None
+
+    response = await get_task(
+        task_id=uuid.UUID(task.id), if_none_match=None, backend=backend
+    )
+    assert b'"renamed"' in response.body
+
+    broker.publish(TaskEvent.from_task(TaskEventType.DELETED, task))
+    assert task_cache.get(task.id) is None
+
+
+@pytest.mark.asyncio
+async def test_running_tasks_are_not_cached(memory_mode):
+    backend = InMemoryBackend()
+    task = await backend.create_task(TaskCreate(name="task", payload={}))
+
+    response = await get_task(
+        task_id=uuid.UUID(task.id), if_none_match=None, backend=backend
+    )
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert task_cache.get(task.id) is None
+
+
+class UpdatedWhileReading(InMemoryBackend):
+    """Backend whose task is updated between reading it and caching it."""
+
+    async def get_task(self, task_id):
+        task = copy.copy(await super().get_task(task_id))
+        await self.update_task(task_id, TaskUpdate(name="renamed"))
+        return task
+
+
+@pytest.mark.asyncio
+async def test_update_between_read_and_put_is_not_cached(memory_mode):
+    backend = UpdatedWhileReading()
+    task = await finished_task(backend)
+
+    response = await get_task(
+        task_id=uuid.UUID(task.id), if_none_match=None, backend=backend
+    )
+    assert b'"task"' in response.body
+    assert task_cache.get(task.id) is None
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_are_not_cached(memory_mode):
+    backend = InMemoryBackend()
+    backend.replica = True
+    task = await finished_task(backend)
+
+    response = await get_task(
+        task_id=uuid.UUID(task.id), if_none_match=None, backend=backend
+    )
+    assert response.status_code == 200
+    assert task_cache.get(task.id) is None
+
+
+def test_put_refuses_responses_read_before_forgotten_invalidations():
+    cache = TaskResponseCache(max_bytes=100)
+    cache.MAX_INVALIDATIONS = 1
+    generation = cache.generation()
+    for task_id in ["a", "b"]:
+        cache.on_event(
+            TaskEvent(
+                event=TaskEventType.UPDATED,
+                task_id=task_id,
+                name="task",
+                queue="default",
+                status="completed",
+                priority="MEDIUM",
+                worker_id=None,
+                timestamp="",
+            )
+        )
+
+    cache.put("a", '"a"', "no-cache", b"1", generation=generation)
+    cache.put("c", '"c"', "no-cache", b"1", generation=generation)
+    assert cache.get("a") is None and cache.get("c") is None
+    cache.put("a", '"a"', "no-cache", b"1", generation=cache.generation())
+    assert cache.get("a") is not None
@@ -2,34 +2,11 @@ import asyncio
 from datetime import datetime, timedelta
 
 import pytest
-import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
 
-from app.db.database import Base
 from app.db.models import Task, TaskStatus
-from app.schemas.task import TaskCreate
+from app.schemas.task import TaskAck, TaskCreate, TaskPriorityEnum, WorkerCreate
 from app.services.task_queue import TaskQueueService
-
-
-@pytest_asyncio.fixture
-async def db_session():
-    # Create an in-memory SQLite database for testing
-    # Using SQLite for simplicity, although it has limited async support
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    TestingSessionLocal = sessionmaker(
-        class_=AsyncSession, expire_on_commit=False, bind=engine
-    )
-
-    async with TestingSessionLocal() as session:
-        yield session
-        # Clean up
-        await session.close()
-
-    await engine.dispose()
+from app.services.worker import WorkerService
 
 
 @pytest.mark.asyncio
@@ -107,3 +84,46 @@ async def test_pause_and_resume_task(db_session):
         db=db_session, task_id=created_task.id
     )
     assert resumed_task.status == TaskStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_claim_and_ack_tasks(db_session):
+    worker = await WorkerService.create_worker(
+        db=db_session, worker_in=WorkerCreate(name="batch-worker")
+    )
+    created = [
+        await TaskQueueService.create_task(
+            db=db_session,
+            task_in=TaskCreate(
+                name=f"batch_{i}", payload={}, priority=TaskPriorityEnum.MEDIUM
+            ),
+        )
+        for i in range(3)
+    ]
+
+    claimed = await TaskQueueService.claim_tasks(
+        db=db_session, worker_id=worker.id, limit=2
+    )
+    assert len(claimed) == 2
+    assert all(task.status == TaskStatus.RUNNING for task in claimed)
+    assert all(task.worker_id == worker.id for task in claimed)
+
+    acks = [
+        TaskAck(task_id=claimed[0].id, success=True, result={"ok": True}),
+        TaskAck(task_id=claimed[1].id, success=False, error="boom"),
+        # Not running on this worker, so the ack is ignored
+        TaskAck(task_id=created[2].id, success=True),
+    ]
+    acked = await TaskQueueService.ack_tasks(
+        db=db_session, worker_id=worker.id, acks=acks
+    )
+    assert {task.id for task in acked} == {claimed[0].id, claimed[1].id}
+
+    completed = await TaskQueueService.get_task(db=db_session, task_id=claimed[0].id)
+    failed = await TaskQueueService.get_task(db=db_session, task_id=claimed[1].id)
+    untouched = await TaskQueueService.get_task(db=db_session, task_id=created[2].id)
+    assert completed.status == TaskStatus.COMPLETED
+    assert completed.result == {"ok": True}
+    assert failed.status == TaskStatus.FAILED
+    assert failed.error == "boom"
+    assert untouched.status == TaskStatus.PENDING
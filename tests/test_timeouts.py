@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.models import TaskStatus
+from app.core.instrumentation import instrumentation
+from app.schemas.task import TaskAck, TaskCreate
+from app.services.backends import InMemoryBackend
+from worker.main import Worker
+from worker.record import TaskRecord
+from worker.timeouts import parse_timeouts, run_with_timeout, timeout_for
+from worker.transport import BackendTransport
+
+
+def test_task_timeout_overrides_name_and_default():
+    by_name = parse_timeouts("report=300, email=30")
+    assert by_name == {"report": 300.0, "email": 30.0}
+
+    def task(name, timeout_seconds=None):
+        return type("T", (), {"name": name, "timeout_seconds": timeout_seconds})
+
+    assert timeout_for(task("report", 5), by_name, 60) == 5
+    assert timeout_for(task("report"), by_name, 60) == 300
+    assert timeout_for(task("other"), by_name, 60) == 60
+
+    with pytest.raises(ValueError):
+        parse_timeouts("report")
+
+
+@pytest.mark.asyncio
+async def test_handlers_ignoring_cancellation_are_abandoned():
+    async def stubborn():
+        # Ignores the first cancellation
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(run_with_timeout(stubborn(), 0.01, grace=0.01), 1)
+    assert await run_with_timeout(asyncio.sleep(0, result="done"), 1) == "done"
+
+
+class HangingWorker(Worker):
+    """Worker whose "hang" tasks never finish."""
+
+    async def process_task(self, task):
+        if task.name == "hang":
+            await asyncio.Event().wait()
+        return TaskAck(task_id=task.id, success=True, result={})
+
+
+@pytest.mark.asyncio
+async def test_timed_out_tasks_fail_and_free_their_slot():
+    backend = InMemoryBackend()
+
+    @asynccontextmanager
+    async def open_backend():
+        yield backend
+
+    hung = await backend.create_task(
+        TaskCreate(name="hang", payload={}, timeout_seconds=0.05)
+    )
+    quick = await backend.create_task(TaskCreate(name="quick", payload={}))
+    # Keeps the worker busy until it is stopped
+    blocker = await backend.create_task(TaskCreate(name="hang", payload={}))
+    worker = HangingWorker(BackendTransport(open_backend))
+    worker.max_tasks = 1
+    worker.poll_interval = 0.01
+    worker.drain_timeout = 0.01
+    run = asyncio.create_task(worker.run())
+    await asyncio.sleep(0.3)
+    worker.handle_signal(15, None)
+    await asyncio.wait_for(run, 1)
+
+    assert backend._tasks[hung.id].status == TaskStatus.FAILED
+    assert backend._tasks[hung.id].error == "Timed out after 0.05 seconds"
+    # The slot was freed for the next task
+    assert backend._tasks[quick.id].status == TaskStatus.COMPLETED
+    assert backend._tasks[blocker.id].status == TaskStatus.PENDING
+    assert worker.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_timed_out_tasks_can_be_retried_with_backoff():
+    backend = InMemoryBackend()
+    task = await backend.create_task(
+        TaskCreate(name="hang", payload={}, timeout_seconds=0.01)
+    )
+    worker_id = str(uuid.uuid4())
+    (claimed,) = await backend.claim_tasks(worker_id, limit=1)
+    worker = HangingWorker(BackendTransport())
+    worker.timeout_retries = 1
+    worker.timeout_retry_delay = 30
+
+    events = []
+    instrumentation.add_hook(events.append)
+    try:
+        ack = await worker.execute(TaskRecord.from_row(claimed))
+    finally:
+        instrumentation.remove_hook(events.append)
+    await backend.ack_tasks(worker_id, [ack])
+
+    assert ack.retry_in == 30
+    assert backend._tasks[task.id].status == TaskStatus.SCHEDULED
+    assert backend._tasks[task.id].retries == 1
+    assert backend._tasks[task.id].worker_id is None
+    timeout_events = [span for span in events if span.name == "worker.timeout"]
+    assert timeout_events[0].attributes["retried"] is True
+
+    # Out of retries, the next timeout fails the task
+    assert worker.timed_out(TaskRecord.from_row(task), 0.01).retry_in is None
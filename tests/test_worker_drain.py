@@ -0,0 +1,145 @@
+import asyncio
+import signal
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.models import TaskStatus
+from app.schemas.task import TaskAck, TaskCreate, WorkerCreate
+from app.services.backends import InMemoryBackend
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+from worker.main import Worker
+from worker.transport import BackendTransport
+
+
+class BlockingWorker(Worker):
+    """Worker whose tasks run until released by the test."""
+
+    def __init__(self, transport, slots, prefetch, drain_timeout):
+        super().__init__(transport=transport)
+        self.max_tasks = slots
+        self.prefetch = prefetch
+        self.drain_timeout = drain_timeout
+        self.poll_interval = 0.01
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def process_task(self, task):
+        self.started.set()
+        await self.finish.wait()
+        return TaskAck(task_id=task.id, success=True, result={})
+
+
+async def start_worker(backend, **options):
+    @asynccontextmanager
+    async def open_backend():
+        yield backend
+
+    worker = BlockingWorker(BackendTransport(open_backend), **options)
+    run = asyncio.create_task(worker.run())
+    await asyncio.wait_for(worker.started.wait(), 1)
+    # Let every slot and the prefetch buffer fill up
+    await asyncio.sleep(0.05)
+    return worker, run
+
+
+def statuses(backend, tasks):
+    return sorted(backend._tasks[task.id].status.value for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_drain_finishes_in_flight_and_releases_prefetched():
+    backend = InMemoryBackend()
+    tasks = [
+        await backend.create_task(TaskCreate(name=f"task-{i}", payload={}))
+        for i in range(5)
+    ]
+    worker, run = await start_worker(backend, slots=2, prefetch=2, drain_timeout=5)
+    assert len(worker.in_flight) == 2 and len(worker.prefetched) == 2
+
+    worker.handle_signal(15, None)
+    await asyncio.sleep(0.05)
+    # Prefetched tasks are back in the queue before in-flight ones finish
+    assert statuses(backend, tasks) == ["pending"] * 3 + ["running"] * 2
+
+    worker.finish.set()
+    await asyncio.wait_for(run, 1)
+    assert statuses(backend, tasks) == ["completed"] * 2 + ["pending"] * 3
+    assert (await backend.get_worker(worker.worker_id)).status == "inactive"
+    released = [t for t in tasks if backend._tasks[t.id].status.value == "pending"]
+    assert all(backend._tasks[t.id].worker_id is None for t in released)
+
+
+@pytest.mark.asyncio
+async def test_drain_releases_tasks_still_running_at_the_deadline():
+    backend = InMemoryBackend()
+    tasks = [
+        await backend.create_task(TaskCreate(name=f"task-{i}", payload={}))
+        for i in range(2)
+    ]
+    worker, run = await start_worker(backend, slots=2, prefetch=0, drain_timeout=0.05)
+
+    worker.handle_signal(15, None)
+    await asyncio.wait_for(run, 1)
+    assert statuses(backend, tasks) == ["pending"] * 2
+
+
+@pytest.mark.asyncio
+async def test_worker_leaves_signal_handlers_to_the_entry_point():
+    handlers = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+    backend = InMemoryBackend()
+    await backend.create_task(TaskCreate(name="task", payload={}))
+    worker, run = await start_worker(backend, slots=1, prefetch=0, drain_timeout=1)
+    assert (signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)) == (
+        handlers
+    )
+
+    worker.finish.set()
+    worker.handle_signal(signal.SIGTERM, None)
+    await asyncio.wait_for(run, 1)
+
+
+@pytest.mark.asyncio
+async def test_transport_wakes_for_tasks_created_right_after_its_first_claim():
+    backend = InMemoryBackend()
+
+    @asynccontextmanager
+    async def open_backend():
+        yield backend
+
+    transport = BackendTransport(open_backend)
+    try:
+        assert await transport.claim(str(uuid.uuid4()), 1) == []
+        await backend.create_task(TaskCreate(name="late", payload={}))
+
+        # The event was published before the worker started waiting
+        await asyncio.wait_for(transport.wait_for_work(5), 1)
+    finally:
+        await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_release_tasks_in_database(db_session):
+    worker = await WorkerService.create_worker(db_session, WorkerCreate(name="w"))
+    other = str(uuid.uuid4())
+    for i in range(3):
+        await TaskQueueService.create_task(
+            db_session, TaskCreate(name=f"t{i}", payload={})
+        )
+    claimed = await TaskQueueService.claim_tasks(db_session, worker.id, limit=3)
+
+    released = await TaskQueueService.release_tasks(
+        db_session, worker.id, [task.id for task in claimed[:2]] + [other]
+    )
+    assert len(released) == 2
+    assert all(task.status == TaskStatus.PENDING for task in released)
+    assert all(task.worker_id is None for task in released)
+
+    # Another worker can't release tasks it doesn't hold
+    assert (
+        await TaskQueueService.release_tasks(db_session, other, [claimed[2].id]) == []
+    )
+    again = await TaskQueueService.claim_tasks(db_session, worker.id, limit=3)
+    assert {t.id for t in again} == {t.id for t in claimed[:2]}
@@ -0,0 +1,67 @@
+import pytest
+
+from app.api.endpoints.workers import list_workers
+from app.schemas.task import TaskAck, TaskCreate, WorkerCreate
+from app.services.backends import InMemoryBackend
+from app.services.task_queue import TaskQueueService
+from app.services.worker import WorkerService
+
+
+async def busy_fleet(create_worker, create_task, claim_tasks, ack_tasks):
+    workers = [await create_worker(WorkerCreate(name=f"w{i}")) for i in range(3)]
+    for _ in range(3):
+        await create_task(TaskCreate(name="job", payload={}))
+    busy = workers[1]
+    claimed = await claim_tasks(busy.id, limit=3)
+    await ack_tasks(busy.id, [TaskAck(task_id=claimed[0].id, success=True)])
+    return workers, busy
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_with_load(db_session):
+    workers, busy = await busy_fleet(
+        lambda w: WorkerService.create_worker(db_session, w),
+        lambda t: TaskQueueService.create_task(db_session, t),
+        lambda w, limit: TaskQueueService.claim_tasks(db_session, w, limit=limit),
+        lambda w, acks: TaskQueueService.ack_tasks(db_session, w, acks),
+    )
+
+    first = await WorkerService.list_workers(db_session, limit=2, with_stats=True)
+    second = await WorkerService.list_workers(
+        db_session, after=first[-1][0].id, limit=2, with_stats=True
+    )
+    listed = first + second
+    assert [worker.id for worker, _ in listed] == sorted(w.id for w in workers)
+
+    stats = {worker.id: load for worker, load in listed}
+    assert stats[busy.id]["running"] == 2
+    assert stats[busy.id]["completed_last_minute"] == 1
+    idle = [load for worker_id, load in stats.items() if worker_id != busy.id]
+    assert all(load["running"] == 0 for load in idle)
+    assert all(load["heartbeat_age_seconds"] >= 0 for load in stats.values())
+
+    plain = await WorkerService.list_workers(db_session)
+    assert all(load is None for _, load in plain)
+
+
+@pytest.mark.asyncio
+async def test_list_workers_endpoint():
+    backend = InMemoryBackend()
+    workers, busy = await busy_fleet(
+        backend.create_worker,
+        backend.create_task,
+        lambda w, limit: backend.claim_tasks(w, limit=limit),
+        backend.ack_tasks,
+    )
+
+    page = await list_workers(after=None, limit=2, stats=True, backend=backend)
+    assert len(page["items"]) == 2
+    rest = await list_workers(
+        after=page["next_after"], limit=2, stats=True, backend=backend
+    )
+    assert rest["next_after"] is None
+
+    items = {str(item.id): item for item in page["items"] + rest["items"]}
+    assert set(items) == {worker.id for worker in workers}
+    assert items[busy.id].stats.running == 2
+    assert items[busy.id].stats.completed_last_minute == 1
@@ -4,17 +4,18 @@ import logging
 import os
 import signal
 import socket
-from contextlib import asynccontextmanager
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional
-from uuid import UUID
-
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from typing import Deque, Dict, List, Optional
 
 from app.core.config import settings
-from app.schemas.task import Task
-from app.services.task_queue import TaskQueueService
-from app.services.worker import WorkerCreate, WorkerService
+from app.core.instrumentation import SamplingProfiler, instrumentation
+from app.schemas.task import TaskAck
+from worker.polling import AdaptivePoller
+from worker.record import TaskRecord
+from worker.timeouts import parse_timeouts, run_with_timeout, timeout_for
+from worker.transport import Transport, create_transport
 
 # Configure logging
 logging.basicConfig(
@@ -23,67 +24,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger("worker")
 
-# Create database connection
-# Convert PostgreSQL URL to AsyncPG format
-SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL).replace(
-    "postgresql://", "postgresql+asyncpg://"
-)
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False)
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
-
-
-@asynccontextmanager
-async def get_db():
-    """Get a database session."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
-
 
 class Worker:
     """Worker class that processes tasks from the queue."""
 
-    def __init__(self):
-        """Initialize worker with default settings and set up signal handlers."""
+    def __init__(self, transport: Optional[Transport] = None):
+        """Initialize worker with default settings."""
         self.running = True
-        self.worker_id: Optional[UUID] = None
+        self.worker_id: Optional[str] = None
         self.worker_name = f"worker-{socket.gethostname()}-{os.getpid()}"
         self.poll_interval = settings.WORKER_POLL_INTERVAL
+        self.poller = AdaptivePoller(
+            settings.WORKER_POLL_MIN_INTERVAL, settings.WORKER_POLL_INTERVAL
+        )
         self.max_tasks = settings.WORKER_MAX_TASKS
+        self.prefetch = settings.WORKER_PREFETCH
+        self.drain_timeout = settings.WORKER_DRAIN_TIMEOUT
+        self.task_timeout = settings.WORKER_TASK_TIMEOUT
+        self.task_timeouts = parse_timeouts(settings.TASK_TIMEOUTS)
+        self.revoke_check_interval = settings.WORKER_REVOKE_CHECK_INTERVAL
+        self.timeout_retries = settings.WORKER_TIMEOUT_RETRIES
+        self.timeout_retry_delay = settings.WORKER_TIMEOUT_RETRY_DELAY
+        # Number of tasks cancelled for running past their timeout
+        self.timeouts = 0
+        self.transport = transport or create_transport(settings.WORKER_TRANSPORT)
+        # Opt-in sampling profiler for tasks slower than slow_task_seconds
+        self.slow_task_seconds = settings.WORKER_SLOW_TASK_SECONDS
+        self.profiler: Optional[SamplingProfiler] = None
+        if self.slow_task_seconds > 0:
+            self.profiler = SamplingProfiler(settings.WORKER_PROFILE_INTERVAL)
+        # Tasks being processed, one per slot, and claimed tasks waiting for a
+        # free slot
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.prefetched: Deque[TaskRecord] = deque()
+
+        logger.info(f"Worker {self.worker_name} starting up")
 
-        # Set up signal handlers
+    def install_signal_handlers(self) -> None:
+        """Drain the worker on SIGTERM and SIGINT.
+
+        Left to the process entry point, so that building or running a worker
+        elsewhere (in tests, say) keeps the host's own handlers.
+        """
         signal.signal(signal.SIGTERM, self.handle_signal)
         signal.signal(signal.SIGINT, self.handle_signal)
 
-        logger.info(f"Worker {self.worker_name} starting up")
-
     def handle_signal(self, signum, frame):  # noqa
-        """Handle termination signals."""
-        logger.info(f"Received signal {signum}, shutting down...")
+        """Handle termination signals by draining the worker."""
+        logger.info(f"Received signal {signum}, draining...")
         self.running = False
 
     async def register_worker(self):
-        """Register worker in the database."""
-        async with get_db() as db:
-            worker = await WorkerService.create_worker(
-                db=db, worker_in=WorkerCreate(name=self.worker_name)
-            )
-            self.worker_id = worker.id  # type: ignore
-            logger.info(f"Worker registered with ID: {self.worker_id}")
+        """Register worker with the task queue."""
+        self.worker_id = await self.transport.register(self.worker_name)
+        logger.info(f"Worker registered with ID: {self.worker_id}")
 
     async def update_heartbeat(self):
-        """Update the worker's heartbeat in the database."""
+        """Update the worker's heartbeat."""
         if self.worker_id is None:
             logger.error("Worker ID is None, cannot update heartbeat")
             return None
 
-        async with get_db() as db:
-            await WorkerService.update_heartbeat(db=db, worker_id=self.worker_id)
+        with instrumentation.span("worker.heartbeat", worker_id=self.worker_id):
+            await self.transport.heartbeat(self.worker_id)
 
-    async def process_task(self, task: Task):
-        """Process a task."""
+    async def process_task(self, task: TaskRecord) -> TaskAck:
+        """Process a task and return its outcome."""
         logger.info(f"Processing task {task.id}: {task.name}")
 
         try:
@@ -100,30 +106,172 @@ class Worker:
             # Sleep to simulate processing time - use asyncio.sleep for async operation
             await asyncio.sleep(2)
 
-            # Mark the task as completed
-            async with get_db() as db:
-                await TaskQueueService.complete_task(
-                    db=db, task_id=task.id, result=result
-                )
-                logger.info(f"Task {task.id} completed successfully")
-
-            return True
+            logger.info(f"Task {task.id} completed successfully")
+            return TaskAck(task_id=task.id, success=True, result=result)
         except Exception as e:
-            # If an error occurs, mark the task as failed
+            # If an error occurs, report the task as failed
             error_message = str(e)
             logger.error(f"Error processing task {task.id}: {error_message}")
-
-            async with get_db() as db:
-                await TaskQueueService.fail_task(
-                    db=db, task_id=task.id, error=error_message
+            return TaskAck(task_id=task.id, success=False, error=error_message)
+
+    async def execute(self, task: TaskRecord) -> TaskAck:
+        """Process a task in a span, failing it if it runs past its timeout.
+
+        Hot stacks are logged for tasks that ran slow.
+        """
+        timeout = timeout_for(task, self.task_timeouts, self.task_timeout)
+        handler = self.process_task(task)
+        if self.profiler is not None:
+            # Sampled inside the handler's own asyncio task
+            handler = self.profiler.profile(str(task.id), handler)
+        started = time.monotonic()
+        try:
+            with instrumentation.span(
+                "worker.execute", task_id=str(task.id), task_name=task.name
+            ):
+                ack = await run_with_timeout(handler, timeout)
+        except asyncio.TimeoutError:
+            ack = self.timed_out(task, timeout)
+        finally:
+            finished = time.monotonic()
+            if self.profiler is not None:
+                if finished - started >= self.slow_task_seconds:
+                    self.log_hot_stacks(task, finished - started)
+                self.profiler.forget(str(task.id))
+        return ack
+
+    def timed_out(self, task: TaskRecord, timeout: float) -> TaskAck:
+        """Count a timeout and fail the task, or retry it with backoff."""
+        self.timeouts += 1
+        retry_in = None
+        if task.retries < self.timeout_retries:
+            retry_in = self.timeout_retry_delay * 2**task.retries
+        instrumentation.event(
+            "worker.timeout",
+            task_id=str(task.id),
+            task_name=task.name,
+            timeout=timeout,
+            retried=retry_in is not None,
+        )
+        logger.warning(
+            f"Task {task.id} timed out after {timeout:g} seconds"
+            + (f", retrying in {retry_in:g} seconds" if retry_in is not None else "")
+        )
+        return TaskAck(
+            task_id=task.id,
+            success=False,
+            error=f"Timed out after {timeout:g} seconds",
+            retry_in=retry_in,
+        )
+
+    def log_hot_stacks(self, task: TaskRecord, duration: float) -> None:
+        """Log the stacks sampled most often from a slow task."""
+        stacks = self.profiler.task_stacks(str(task.id))
+        lines = [f"{count} samples: {stack}" for stack, count in stacks]
+        logger.warning(
+            f"Task {task.id} ({task.name}) took {duration:.2f} seconds, "
+            "hottest stacks:\n" + "\n".join(lines)
+        )
+
+    async def fill_slots(self) -> None:
+        """Claim tasks for free slots and the prefetch buffer and start them."""
+        wanted = (
+            self.max_tasks + self.prefetch - len(self.in_flight) - len(self.prefetched)
+        )
+        claimed = []
+        if wanted > 0:
+            # Don't hold a claim open while running tasks need acknowledging
+            with instrumentation.span("worker.claim", requested=wanted):
+                claimed = await self.transport.claim(
+                    self.worker_id, wanted, wait=not self.in_flight
                 )
-
-            return False
+            self.prefetched.extend(claimed)
+            self.poller.record(len(claimed), wanted)
+            logger.debug(f"Poller state: {self.poller.state()}")
+        while self.prefetched and len(self.in_flight) < self.max_tasks:
+            task = self.prefetched.popleft()
+            self.in_flight[str(task.id)] = asyncio.create_task(self.execute(task))
+
+    async def ack_finished(
+        self, timeout: Optional[float], return_when: str = asyncio.FIRST_COMPLETED
+    ) -> None:
+        """Wait up to ``timeout`` seconds for in-flight tasks and ack those done."""
+        if not self.in_flight:
+            return
+        done, _ = await asyncio.wait(
+            self.in_flight.values(), timeout=timeout, return_when=return_when
+        )
+        acks = []
+        for task_id, future in list(self.in_flight.items()):
+            if future in done:
+                del self.in_flight[task_id]
+                acks.append(future.result())
+        if acks:
+            with instrumentation.span("worker.ack", count=len(acks)):
+                await self.transport.ack(self.worker_id, acks)
+
+    async def release(self, task_ids: List[str]) -> None:
+        """Hand claimed tasks back to the queue in one call."""
+        if task_ids:
+            with instrumentation.span("worker.release", count=len(task_ids)):
+                await self.transport.release(self.worker_id, task_ids)
+            logger.info(f"Released {len(task_ids)} tasks back to the queue")
+
+    async def cancel_revoked(self) -> None:
+        """Cancel in-flight tasks that were paused or deleted meanwhile.
+
+        Their results would be discarded, so their slots are freed right away
+        and no acknowledgement is sent for them.
+        """
+        if not self.in_flight:
+            return
+        revoked = await self.transport.revoked(self.worker_id, list(self.in_flight))
+        for task_id in revoked:
+            future = self.in_flight.pop(task_id, None)
+            if future is not None:
+                future.cancel()
+                logger.info(f"Cancelled task {task_id}, it was paused or deleted")
+
+    async def watch_revoked(self) -> None:
+        """Check for revoked tasks every ``revoke_check_interval`` seconds."""
+        while True:
+            await asyncio.sleep(self.revoke_check_interval)
+            try:
+                await self.cancel_revoked()
+            except Exception as e:
+                logger.error(f"Error checking for revoked tasks: {str(e)}")
+
+    async def drain(self):
+        """Stop claiming, release unstarted tasks and finish in-flight ones.
+
+        Prefetched tasks that never started are released straight away so
+        other workers can pick them up. In-flight tasks get up to
+        ``drain_timeout`` seconds to finish and are acknowledged as usual;
+        any still running after that are cancelled and released as well.
+        """
+        await self.transport.set_status(self.worker_id, "draining")
+        await self.release([str(task.id) for task in self.prefetched])
+        self.prefetched.clear()
+
+        await self.ack_finished(self.drain_timeout, return_when=asyncio.ALL_COMPLETED)
+        if self.in_flight:
+            logger.warning(
+                f"{len(self.in_flight)} tasks did not finish within "
+                f"{self.drain_timeout} seconds, releasing them"
+            )
+            for future in self.in_flight.values():
+                future.cancel()
+            await asyncio.gather(*self.in_flight.values(), return_exceptions=True)
+            await self.release(list(self.in_flight))
+            self.in_flight.clear()
 
     async def run(self):
         """Run the worker loop."""
         await self.register_worker()
         logger.info(f"Worker {self.worker_id} ({self.worker_name}) started")
+        if self.profiler is not None:
+            self.profiler.start()
+        watcher = asyncio.create_task(self.watch_revoked())
 
         last_heartbeat_time = datetime.utcnow()
         heartbeat_interval = 30  # seconds
@@ -144,41 +292,47 @@ class Worker:
                     await asyncio.sleep(5)  # Wait before retrying
                     continue
 
-                async with get_db() as db:
-                    task = await TaskQueueService.get_next_task(
-                        db=db, worker_id=self.worker_id
-                    )
-
-                if task:
-                    # Process the task
-                    await self.process_task(task)
-                else:
-                    # No tasks available, sleep for poll_interval seconds
+                # Keep every slot busy; each task is acknowledged as soon as
+                # it finishes, together with any others finished by then
+                await self.fill_slots()
+                if len(self.in_flight) >= self.max_tasks:
+                    # Every slot is busy, so wait for one to free up
+                    await self.ack_finished(self.poll_interval)
+                elif self.in_flight:
+                    await self.ack_finished(self.poller.delay)
+                elif self.poller.delay:
+                    # No tasks available, wait until one becomes PENDING or
+                    # the poller's delay has passed
                     logger.debug(
-                        f"No tasks available, sleeping for {self.poll_interval} seconds"
+                        f"No tasks available, waiting up to {self.poller.delay:.2f} "
+                        "seconds"
                     )
-                    # Use asyncio.sleep for async operation
-                    for _ in range(self.poll_interval):
-                        if not self.running:
-                            break
-                        await asyncio.sleep(1)
+                    await self.transport.wait_for_work(self.poller.delay)
         except Exception as e:
             logger.error(f"Worker error: {str(e)}")
         finally:
-            # Mark worker as inactive when shutting down
+            watcher.cancel()
             if self.worker_id is not None:
-                async with get_db() as db:
-                    await WorkerService.set_worker_status(
-                        db=db, worker_id=self.worker_id, status="inactive"
-                    )
+                try:
+                    await self.drain()
+                except Exception as e:
+                    logger.error(f"Error while draining: {str(e)}")
+                # Mark worker as inactive when shutting down
+                await self.transport.set_status(self.worker_id, "inactive")
                 logger.info(f"Worker {self.worker_id} ({self.worker_name}) shut down")
             else:
                 logger.info(f"Worker ({self.worker_name}) shut down (no ID registered)")
+            if self.profiler is not None:
+                self.profiler.stop()
+            await self.transport.close()
 
 
 async def main():
     """Entry point for the worker process."""
+    if settings.OTEL_ENABLED:
+        instrumentation.enable_opentelemetry()
     worker = Worker()
+    worker.install_signal_handlers()
     await worker.run()
 
 
@@ -0,0 +1,53 @@
+"""Adaptive polling of the task queue.
+
+After a claim that filled every requested slot there is probably more work
+waiting, so the worker claims again straight away. After a partial claim it
+waits the base interval. Every empty claim in a row backs off further, up to
+the cap, using decorrelated jitter: the next delay is drawn uniformly between
+the base and three times the previous delay. Replicas that were started
+together, or that drained the queue at the same moment, drift apart after a
+few empty polls instead of hitting the database in synchronized bursts.
+"""
+import random
+from typing import Any, Dict, Optional
+
+
+class AdaptivePoller:
+    """Decides how long a worker waits before its next claim."""
+
+    def __init__(self, base: float, cap: float, rng: Optional[random.Random] = None):
+        """Initialize the poller with the shortest and longest delay."""
+        self.base = base
+        self.cap = max(cap, base)
+        self.rng = rng or random.Random()
+        self.delay = 0.0
+        self.empty_polls = 0
+        self.last_claimed = 0
+        self.last_requested = 0
+
+    def record(self, claimed: int, requested: int) -> float:
+        """Update the delay after a claim and return it."""
+        self.last_claimed = claimed
+        self.last_requested = requested
+        if claimed >= requested:
+            self.empty_polls = 0
+            self.delay = 0.0
+        elif claimed:
+            self.empty_polls = 0
+            self.delay = self.base
+        else:
+            self.empty_polls += 1
+            previous = max(self.delay, self.base)
+            self.delay = min(self.cap, self.rng.uniform(self.base, previous * 3))
+        return self.delay
+
+    def state(self) -> Dict[str, Any]:
+        """Current state of the poller, for logging and tuning."""
+        return {
+            "delay": self.delay,
+            "empty_polls": self.empty_polls,
+            "last_claimed": self.last_claimed,
+            "last_requested": self.last_requested,
+            "base": self.base,
+            "cap": self.cap,
+        }
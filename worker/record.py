@@ -0,0 +1,51 @@
+"""Compact representation of a claimed task.
+
+A worker may hold thousands of claimed tasks at once, in flight or
+prefetched, and only needs a handful of their fields. ``TaskRecord`` keeps just
+those, in a frozen slotted dataclass: no per-instance ``__dict__``, no
+validation, no ORM state or session references. Transports build records as
+soon as tasks are claimed, so the database objects and API responses they
+came from are released right away.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class TaskRecord:
+    """The fields of a claimed task that handlers and the worker loop use."""
+
+    id: str
+    name: str
+    queue: str
+    priority: str
+    payload: Dict[str, Any]
+    retries: int = 0
+    timeout_seconds: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, task: Any) -> "TaskRecord":
+        """Record of a task model instance (or anything with its attributes)."""
+        priority = task.priority
+        return cls(
+            id=str(task.id),
+            name=task.name,
+            queue=task.queue,
+            priority=getattr(priority, "value", priority),
+            payload=task.payload,
+            retries=task.retries or 0,
+            timeout_seconds=task.timeout_seconds,
+        )
+
+    @classmethod
+    def from_json(cls, item: Dict[str, Any]) -> "TaskRecord":
+        """Record of a task as returned by the API."""
+        return cls(
+            id=item["id"],
+            name=item["name"],
+            queue=item.get("queue", "default"),
+            priority=item.get("priority", "MEDIUM"),
+            payload=item["payload"],
+            retries=item.get("retries", 0),
+            timeout_seconds=item.get("timeout_seconds"),
+        )
@@ -0,0 +1,58 @@
+"""Execution timeouts for task handlers.
+
+A task's timeout is its own ``timeout_seconds``, else the timeout configured
+for its name in ``TASK_TIMEOUTS``, else ``WORKER_TASK_TIMEOUT``. A handler that
+runs past its timeout is cancelled. Cancellation is cooperative, so a handler
+that ignores it gets a short grace period and is then abandoned, freeing its
+slot either way.
+"""
+import asyncio
+from typing import Any, Awaitable, Dict, Optional
+
+from worker.record import TaskRecord
+
+# Seconds a cancelled handler gets to unwind before its slot is freed anyway
+CANCEL_GRACE = 1.0
+
+
+def parse_timeouts(value: str) -> Dict[str, float]:
+    """Parse ``name=seconds`` pairs separated by commas."""
+    timeouts = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, seconds = item.partition("=")
+        if not seconds:
+            raise ValueError(f"Invalid task timeout {item!r}, expected name=seconds")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+def timeout_for(task: TaskRecord, by_name: Dict[str, float], default: float) -> float:
+    """Seconds ``task`` may run for, or 0 for no limit."""
+    if task.timeout_seconds:
+        return task.timeout_seconds
+    return by_name.get(task.name, default)
+
+
+async def run_with_timeout(
+    handler: Awaitable[Any], timeout: Optional[float], grace: float = CANCEL_GRACE
+) -> Any:
+    """Await ``handler``, cancelling it after ``timeout`` seconds.
+
+    Raises ``asyncio.TimeoutError`` when the handler is cancelled. The handler
+    is also cancelled when the caller is, e.g. while the worker drains.
+    """
+    if not timeout:
+        return await handler
+    running = asyncio.ensure_future(handler)
+    try:
+        done, _ = await asyncio.wait({running}, timeout=timeout)
+        if running in done:
+            return running.result()
+        running.cancel()
+        await asyncio.wait({running}, timeout=grace)
+        raise asyncio.TimeoutError
+    finally:
+        if not running.done():
+            running.cancel()
@@ -0,0 +1,277 @@
+"""Transports connecting a worker to the task queue.
+
+A worker either runs queue operations in-process against the configured
+backend (usually the database) or leases tasks through the API's worker
+endpoints, sharing the API's connection pool with every other worker.
+
+Idle workers don't poll on a fixed interval: they wait for a task to become
+PENDING, either on the task event stream or in a long-polling lease request.
+
+The queue backends (SQLAlchemy and the database driver) and the HTTP client
+are imported by the transport that uses them, so a worker only pays at start
+up for the stack it talks to.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING,
+    AsyncContextManager,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.task import TaskAck, WorkerCreate
+from worker.record import TaskRecord
+
+if TYPE_CHECKING:
+    from app.services.backends import TaskQueueBackend
+    from app.services.events import Subscription
+
+
+class Transport(ABC):
+    """Operations a worker needs from the task queue."""
+
+    @abstractmethod
+    async def register(self, name: str) -> str:
+        """Register the worker and return its ID."""
+
+    @abstractmethod
+    async def heartbeat(self, worker_id: Union[str, UUID]) -> None:
+        """Update the worker's heartbeat."""
+
+    @abstractmethod
+    async def set_status(self, worker_id: Union[str, UUID], status: str) -> None:
+        """Set the worker's status."""
+
+    @abstractmethod
+    async def claim(
+        self, worker_id: Union[str, UUID], limit: int, wait: bool = True
+    ) -> List[TaskRecord]:
+        """Claim up to ``limit`` ready tasks.
+
+        ``wait=False`` asks for an immediate answer from transports that would
+        otherwise hold an empty claim open until a task arrives.
+        """
+
+    @abstractmethod
+    async def ack(self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]) -> None:
+        """Report the outcome of finished tasks."""
+
+    @abstractmethod
+    async def release(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> None:
+        """Put claimed tasks that were never started back to PENDING."""
+
+    @abstractmethod
+    async def revoked(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[str]
+    ) -> List[str]:
+        """Which of the worker's running tasks were paused or deleted."""
+
+    async def wait_for_work(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for tasks to become claimable."""
+        await asyncio.sleep(timeout)
+
+    async def close(self) -> None:
+        """Release any resources held by the transport."""
+
+
+class BackendTransport(Transport):
+    """Transport that runs queue operations in-process against a backend."""
+
+    def __init__(
+        self,
+        backend_opener: Optional[
+            Callable[[], AsyncContextManager["TaskQueueBackend"]]
+        ] = None,
+        listener_starter: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        """Initialize the transport with a function opening the backend.
+
+        Defaults to the configured backend, see ``open_backend``, whose task
+        events reach this process through ``start_listener``. A backend given
+        here is expected to publish to the process's broker itself, as the
+        in-memory backend does, unless ``listener_starter`` is given too.
+        """
+        if backend_opener is None:
+            from app.services.backends import open_backend
+            from app.services.events import start_listener
+
+            backend_opener = open_backend
+            listener_starter = listener_starter or start_listener
+        self.open_backend = backend_opener
+        self.start_listener = listener_starter
+        self._subscription: Optional["Subscription"] = None
+
+    async def _subscribe(self) -> "Subscription":
+        """Subscription to tasks becoming PENDING, renewed if it was evicted."""
+        from app.services.events import broker
+
+        if self._subscription is None or self._subscription.evicted:
+            if self.start_listener is not None:
+                await self.start_listener()
+            self._subscription = broker.subscribe(statuses=["pending"])
+        return self._subscription
+
+    async def register(self, name: str) -> str:
+        """Register the worker and return its ID."""
+        async with self.open_backend() as backend:
+            worker = await backend.create_worker(WorkerCreate(name=name))
+            return str(worker.id)
+
+    async def heartbeat(self, worker_id: Union[str, UUID]) -> None:
+        """Update the worker's heartbeat."""
+        async with self.open_backend() as backend:
+            await backend.update_heartbeat(worker_id)
+
+    async def set_status(self, worker_id: Union[str, UUID], status: str) -> None:
+        """Set the worker's status."""
+        async with self.open_backend() as backend:
+            await backend.set_worker_status(worker_id, status)
+
+    async def claim(
+        self, worker_id: Union[str, UUID], limit: int, wait: bool = True
+    ) -> List[TaskRecord]:
+        """Claim up to ``limit`` ready tasks."""
+        # Subscribe before claiming, so that no task becoming PENDING after
+        # the claim is missed. Tasks that became PENDING before it are seen by
+        # the claim, so only later events should wake the worker
+        subscription = await self._subscribe()
+        subscription.clear()
+        async with self.open_backend() as backend:
+            tasks = await backend.claim_tasks(worker_id, limit=limit)
+            return [TaskRecord.from_row(task) for task in tasks]
+
+    async def ack(self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]) -> None:
+        """Report the outcome of finished tasks."""
+        async with self.open_backend() as backend:
+            await backend.ack_tasks(worker_id, acks)
+
+    async def release(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> None:
+        """Put claimed tasks that were never started back to PENDING."""
+        async with self.open_backend() as backend:
+            await backend.release_tasks(worker_id, task_ids)
+
+    async def revoked(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[str]
+    ) -> List[str]:
+        """Which of the worker's running tasks were paused or deleted."""
+        async with self.open_backend() as backend:
+            running = set(await backend.get_running_task_ids(worker_id, task_ids))
+        return [task_id for task_id in task_ids if task_id not in running]
+
+    async def wait_for_work(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for a task to become PENDING."""
+        subscription = await self._subscribe()
+        await subscription.get(timeout=timeout)
+
+    async def close(self) -> None:
+        """Stop listening for task events."""
+        if self._subscription is not None:
+            from app.services.events import broker
+
+            broker.unsubscribe(self._subscription)
+            self._subscription = None
+
+
+class HttpTransport(Transport):
+    """Transport that leases and acknowledges tasks through the API."""
+
+    def __init__(self, base_url: str, timeout: float, lease_wait: float = 0):
+        """Initialize the HTTP client for the API at ``base_url``.
+
+        Lease requests that find no tasks are held by the API for up to
+        ``lease_wait`` seconds, until a task becomes PENDING.
+        """
+        import httpx
+
+        self.client = httpx.AsyncClient(base_url=base_url, timeout=timeout)
+        self.lease_wait = lease_wait
+
+    async def register(self, name: str) -> str:
+        """Register the worker and return its ID."""
+        response = await self.client.post("/workers/", json={"name": name})
+        response.raise_for_status()
+        return response.json()["id"]
+
+    async def heartbeat(self, worker_id: Union[str, UUID]) -> None:
+        """Update the worker's heartbeat."""
+        response = await self.client.patch(f"/workers/{worker_id}/heartbeat")
+        response.raise_for_status()
+
+    async def set_status(self, worker_id: Union[str, UUID], status: str) -> None:
+        """Set the worker's status."""
+        response = await self.client.patch(
+            f"/workers/{worker_id}/status", json={"status": status}
+        )
+        response.raise_for_status()
+
+    async def claim(
+        self, worker_id: Union[str, UUID], limit: int, wait: bool = True
+    ) -> List[TaskRecord]:
+        """Claim up to ``limit`` ready tasks."""
+        response = await self.client.post(
+            f"/workers/{worker_id}/lease",
+            params={"n": limit, "wait": self.lease_wait if wait else 0},
+        )
+        response.raise_for_status()
+        return [TaskRecord.from_json(item) for item in response.json()]
+
+    async def ack(self, worker_id: Union[str, UUID], acks: Sequence[TaskAck]) -> None:
+        """Report the outcome of finished tasks."""
+        response = await self.client.post(
+            f"/workers/{worker_id}/ack",
+            json=[ack.model_dump(mode="json") for ack in acks],
+        )
+        response.raise_for_status()
+
+    async def release(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[UUID]
+    ) -> None:
+        """Put claimed tasks that were never started back to PENDING."""
+        response = await self.client.post(
+            f"/workers/{worker_id}/release",
+            json=[str(task_id) for task_id in task_ids],
+        )
+        response.raise_for_status()
+
+    async def revoked(
+        self, worker_id: Union[str, UUID], task_ids: Sequence[str]
+    ) -> List[str]:
+        """Which of the worker's running tasks were paused or deleted."""
+        response = await self.client.post(
+            f"/workers/{worker_id}/revoked", json=list(task_ids)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def wait_for_work(self, timeout: float) -> None:
+        """Return straight away, as the empty lease has already waited."""
+        if not self.lease_wait:
+            await asyncio.sleep(timeout)
+
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        await self.client.aclose()
+
+
+def create_transport(mode: str) -> Transport:
+    """Create the transport for the configured mode."""
+    if mode == "database":
+        return BackendTransport()
+    if mode == "http":
+        return HttpTransport(
+            settings.WORKER_API_URL,
+            settings.WORKER_HTTP_TIMEOUT,
+            lease_wait=min(settings.WORKER_POLL_INTERVAL, settings.WORKER_LEASE_WAIT),
+        )
+    raise ValueError(f"Unknown worker transport: {mode}")